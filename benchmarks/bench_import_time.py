@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_import_time.py
+
+Время запуска командной строки tech_survey.
+
+Для каждой команды измеряется время процесса целиком (медиана из N запусков)
+и по `python -X importtime` - какие модули загружены сверх голого
+интерпретатора. Легкие команды (--help, cache) не должны загружать pandas,
+numpy, pyarrow и google-cloud: если это происходит или время сверх
+голого интерпретатора (python -c pass) превышает бюджет, скрипт завершается
+с кодом 1.
+
+Использование:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 20 --budget-ms 30
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Команды, которые должны запускаться за миллисекунды
+LIGHT_COMMANDS = [
+    ['--help'],
+    ['upload', '--help'],
+    ['export', '--help'],
+    ['pipeline', '--help'],
+    ['cache'],
+]
+
+# Для сравнения: импорт модулей с тяжелыми зависимостями
+HEAVY_IMPORTS = [
+    'tech_survey.prepare',
+    'tech_survey.upload',
+    'tech_survey.export',
+]
+
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'google.cloud.bigquery', 'google.api_core']
+
+DEFAULT_RUNS = 10
+DEFAULT_BUDGET_MS = 50
+
+# ============================================================================
+# ИЗМЕРЕНИЯ
+# ============================================================================
+
+def run_process(args):
+    """Время выполнения процесса (мс) и его stderr"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *args], cwd=REPO_ROOT,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)}: код {result.returncode}\n{result.stderr[-2000:]}")
+    return elapsed, result.stderr
+
+def parse_importtime(stderr):
+    """{модуль: собственное время импорта в мкс} из вывода -X importtime"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(self_us)
+    return modules
+
+def measure(args, runs, baseline_modules):
+    """Медиана времени процесса и модули, загруженные сверх baseline"""
+    times = [run_process(args)[0] for _ in range(runs)]
+    _, stderr = run_process(['-X', 'importtime', *args])
+    modules = {
+        name: us for name, us in parse_importtime(stderr).items()
+        if name not in baseline_modules
+    }
+    heavy = [name for name in HEAVY_MODULES if name in modules]
+    return {
+        'median_ms': statistics.median(times),
+        'min_ms': min(times),
+        'import_ms': sum(modules.values()) / 1000,
+        'modules': len(modules),
+        'heavy': heavy,
+    }
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Время запуска python -m tech_survey")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS,
+                        help=f"запусков на команду (по умолчанию {DEFAULT_RUNS})")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"бюджет легкой команды сверх запуска интерпретатора (по умолчанию {DEFAULT_BUDGET_MS} мс)")
+    args = parser.parse_args(argv)
+
+    baseline_times = [run_process(['-c', 'pass'])[0] for _ in range(args.runs)]
+    _, stderr = run_process(['-X', 'importtime', '-c', 'pass'])
+    baseline_modules = set(parse_importtime(stderr))
+    baseline_ms = statistics.median(baseline_times)
+
+    print("="*88)
+    print("⏱️  ВРЕМЯ ЗАПУСКА КОМАНД TECH_SURVEY")
+    print("="*88)
+    print(f"Python {sys.version.split()[0]}, запусков на команду: {args.runs}")
+    print(f"Голый интерпретатор (python -c pass): {baseline_ms:.1f} мс\n")
+    print(f"  {'команда':<34} {'медиана':>9} {'мин':>8} {'импорт':>9} {'модулей':>8} {'сверх':>9}")
+    print("  " + "-"*82)
+
+    failures = []
+    for command in LIGHT_COMMANDS:
+        label = ' '.join(command)
+        stats = measure(['-m', 'tech_survey', *command], args.runs, baseline_modules)
+        overhead = stats['median_ms'] - baseline_ms
+        print(f"  {label:<34} {stats['median_ms']:>6.1f} мс {stats['min_ms']:>5.1f} мс "
+              f"{stats['import_ms']:>6.1f} мс {stats['modules']:>8} {overhead:>6.1f} мс")
+        if stats['heavy']:
+            failures.append(f"{label}: загружены {', '.join(stats['heavy'])}")
+        if overhead > args.budget_ms:
+            failures.append(f"{label}: +{overhead:.1f} мс > бюджета {args.budget_ms:.0f} мс")
+
+    print("\n  Для сравнения (import модуля с тяжелыми зависимостями):")
+    for module in HEAVY_IMPORTS:
+        stats = measure(['-c', f'import {module}'], max(1, args.runs // 2), baseline_modules)
+        print(f"  {module:<34} {stats['median_ms']:>6.1f} мс {stats['min_ms']:>5.1f} мс "
+              f"{stats['import_ms']:>6.1f} мс {stats['modules']:>8} "
+              f"{stats['median_ms'] - baseline_ms:>6.1f} мс")
+
+    print("\n" + "="*88)
+    if failures:
+        print("❌ БЮДЖЕТ ЗАПУСКА НАРУШЕН:")
+        for failure in failures:
+            print(f"  • {failure}")
+        return 1
+
+    print(f"✅ Легкие команды укладываются в +{args.budget_ms:.0f} мс и не загружают "
+          f"{', '.join(HEAVY_MODULES)}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
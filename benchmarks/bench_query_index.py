@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_query_index.py
+
+Задержка фильтрованных топ-N запросов tech_survey.query_index.
+
+Запросы генерируются из реальных значений демографии хранилища фактов:
+без фильтра, по одному измерению, по двум, по трем и со списком значений.
+Для сравнения тот же запрос выполняется через pandas (merge + groupby +
+sort_values) по CSV таблицам. Скрипт завершается с кодом 1, если медиана
+задержки индекса для какого-либо типа запроса не меньше 1 мс.
+
+Использование:
+    python -m tech_survey prepare
+    python benchmarks/bench_query_index.py
+    python benchmarks/bench_query_index.py --queries 5000 --no-pandas
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from tech_survey.fact_store import FACT_STORE_DIR
+from tech_survey.query_index import load_query_index
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+DATA_DIR = 'data/processed'
+DEFAULT_QUERIES = 2000
+PANDAS_QUERIES = 20
+TOP_N = 10
+BUDGET_MS = 1.0
+
+# Тип запроса -> измерения фильтра (число значений: 1, для 'multi' - 3)
+QUERY_TYPES = {
+    'no filter': [],
+    'Country': ['Country'],
+    'Country+Age': ['Country', 'Age'],
+    'Country+Age+EdLevel': ['Country', 'Age', 'EdLevel'],
+    'multi Country+Age': ['Country', 'Age'],
+}
+
+# ============================================================================
+# ГЕНЕРАЦИЯ ЗАПРОСОВ
+# ============================================================================
+
+def make_queries(index, query_type, count, rng):
+    """Список (category, status, filters) со значениями из данных"""
+    queries = []
+    for _ in range(count):
+        category, status = rng.choice(index.store.tables)
+        filters = {}
+        for dim in QUERY_TYPES[query_type]:
+            labels = index.dim_labels[dim]
+            if query_type.startswith('multi'):
+                filters[dim] = rng.sample(labels, min(3, len(labels)))
+            else:
+                filters[dim] = rng.choice(labels)
+        queries.append((category, status, filters))
+    return queries
+
+def pandas_top_n(tables, demo_df, category, status, filters):
+    """Тот же запрос через pandas (базовая линия)"""
+    merged = tables[(category, status)].merge(demo_df, on='ResponseId')
+    segment = demo_df
+    for dim, values in filters.items():
+        values = [values] if isinstance(values, str) else values
+        merged = merged[merged[dim].isin(values)]
+        segment = segment[segment[dim].isin(values)]
+    counts = merged.groupby('Technology')['ResponseId'].nunique().sort_values(ascending=False)
+    return (counts.head(TOP_N) / max(len(segment), 1) * 100).round(2)
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Задержка фильтрованных топ-N запросов")
+    parser.add_argument('--store', default=FACT_STORE_DIR, help=f"хранилище фактов ({FACT_STORE_DIR})")
+    parser.add_argument('--queries', type=int, default=DEFAULT_QUERIES,
+                        help=f"запросов каждого типа (по умолчанию {DEFAULT_QUERIES})")
+    parser.add_argument('--no-pandas', action='store_true', help="без сравнения с pandas")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(os.path.join(args.store, 'manifest.json')):
+        print(f"❌ Хранилище фактов не найдено: {args.store}")
+        print("   Запустите: python -m tech_survey prepare")
+        return 1
+
+    rng = random.Random(args.seed)
+
+    start = time.perf_counter()
+    index = load_query_index(args.store)
+    open_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    index.warm()
+    warm_ms = (time.perf_counter() - start) * 1000
+
+    print("="*78)
+    print("⚡ ФИЛЬТРОВАННЫЕ ТОП-N ЗАПРОСЫ ПО ИНДЕКСАМ")
+    print("="*78)
+    print(f"Респондентов: {index.n_respondents:,}, таблиц: {len(index.store.tables)}")
+    print(f"Открытие индекса: {open_ms:.1f} мс, построение счетчиков всех таблиц: {warm_ms:.1f} мс\n")
+
+    tables, demo_df = None, None
+    if not args.no_pandas:
+        import pandas as pd
+
+        demo_df = pd.read_csv(
+            os.path.join(DATA_DIR, 'demographics.csv'), keep_default_na=False,
+            usecols=['ResponseId', *index.dim_codes],
+        )
+        tables = {
+            (category, status): pd.read_csv(
+                os.path.join(DATA_DIR, f"{category}_{status}.csv"), keep_default_na=False
+            )
+            for category, status in index.store.tables
+        }
+
+    print(f"  {'запрос':<22} {'p50':>9} {'p99':>9} {'max':>9} {'запр/сек':>10} {'pandas p50':>12}")
+    print("  " + "-"*76)
+
+    failures = []
+    for query_type in QUERY_TYPES:
+        queries = make_queries(index, query_type, args.queries, rng)
+
+        latencies = np.empty(len(queries))
+        for i, (category, status, filters) in enumerate(queries):
+            start = time.perf_counter()
+            index.top_n(category, status, TOP_N, filters)
+            latencies[i] = time.perf_counter() - start
+        latencies *= 1000
+
+        pandas_column = '-'
+        if tables is not None:
+            pandas_latencies = []
+            for category, status, filters in queries[:PANDAS_QUERIES]:
+                start = time.perf_counter()
+                pandas_top_n(tables, demo_df, category, status, filters)
+                pandas_latencies.append(time.perf_counter() - start)
+            pandas_column = f"{np.median(pandas_latencies) * 1000:.1f} мс"
+
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"  {query_type:<22} {p50:>6.3f} мс {p99:>6.3f} мс {latencies.max():>6.3f} мс "
+              f"{len(latencies) / latencies.sum() * 1000:>10,.0f} {pandas_column:>12}")
+
+        if p50 >= BUDGET_MS:
+            failures.append(f"{query_type}: p50 {p50:.3f} мс")
+
+    print("\n" + "="*78)
+    if failures:
+        print(f"❌ МЕДИАНА НЕ МЕНЬШЕ {BUDGET_MS:.0f} МС: {', '.join(failures)}")
+        return 1
+
+    print(f"✅ Медиана всех типов запросов меньше {BUDGET_MS:.0f} мс")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_serve.py
+
+Нагрузочный тест сервиса агрегатов (python -m tech_survey serve).
+
+Запускает сервер в отдельном процессе (или использует --url), собирает
+набор URL из views с фильтрами по реальным странам и возрастам и
+нагружает его N keep-alive соединениями в течение заданного времени.
+Часть запросов отправляется с If-None-Match (повторная проверка
+дашбордом) и должна получать 304. Итог: запросов в секунду, p50/p90/p99
+задержки и коды ответов.
+
+Использование:
+    python benchmarks/bench_serve.py
+    python benchmarks/bench_serve.py --connections 64 --duration 20 --processes 4
+    python benchmarks/bench_serve.py --cache-size 1      # без кэша ответов
+    python benchmarks/bench_serve.py --url http://127.0.0.1:8765
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CONNECTIONS = 32
+DEFAULT_DURATION = 10.0
+DEFAULT_REVALIDATE = 0.3
+URL_POOL_SIZE = 500
+SERVER_START_TIMEOUT = 30
+
+# ============================================================================
+# HTTP КЛИЕНТ
+# ============================================================================
+
+async def http_get(reader, writer, host, path, etag=None):
+    """GET по открытому keep-alive соединению: (статус, ETag, тело)"""
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+    if etag:
+        request += f"If-None-Match: {etag}\r\n"
+    writer.write((request + "\r\n").encode('latin-1'))
+    await writer.drain()
+
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+    lines = head.split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    body = await reader.readexactly(int(headers.get('content-length') or 0))
+    return status, headers.get('etag'), body
+
+async def fetch_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        status, _, body = await http_get(reader, writer, host, path)
+        if status != 200:
+            raise RuntimeError(f"{path}: HTTP {status}")
+        return json.loads(body)
+    finally:
+        writer.close()
+
+async def build_url_pool(host, port, size, seed):
+    """URL views с фильтрами по значениям из самих данных"""
+    views = (await fetch_json(host, port, '/views'))['views']
+    countries = [r['Country'] for r in (await fetch_json(host, port, '/views/demographics_by_country'))['rows'][:30]]
+    ages = [r['Age'] for r in (await fetch_json(host, port, '/views/demographics_by_age'))['rows']]
+
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(size):
+        view = rng.choice(views)
+        params = []
+        if view == 'tech_by_segment':
+            params += [f"category={rng.choice(['language', 'database', 'platform', 'webframe'])}",
+                       f"status={rng.choice(['haveworked', 'wanttowork'])}", "limit=10"]
+        kind = rng.random()
+        if kind < 0.6:
+            params.append(f"country={quote(rng.choice(countries))}")
+        if 0.3 < kind < 0.9:
+            params.append(f"age={quote(rng.choice(ages))}")
+        pool.append(f"/views/{view}" + (f"?{'&'.join(params)}" if params else ''))
+    return pool
+
+async def run_connection(host, port, urls, deadline, revalidate, rng, latencies, statuses):
+    """Один клиент: последовательные запросы по keep-alive соединению до deadline"""
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        while time.perf_counter() < deadline:
+            path = rng.choice(urls)
+            etag = etags.get(path) if rng.random() < revalidate else None
+
+            start = time.perf_counter()
+            status, new_etag, _ = await http_get(reader, writer, host, path, etag)
+            latencies.append(time.perf_counter() - start)
+
+            statuses[status] = statuses.get(status, 0) + 1
+            if new_etag:
+                etags[path] = new_etag
+    finally:
+        writer.close()
+
+async def run_load(host, port, urls, connections, duration, revalidate, seed):
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*[
+        run_connection(host, port, urls, deadline, revalidate, random.Random(seed + i), latencies, statuses)
+        for i in range(connections)
+    ])
+    return latencies, statuses
+
+def load_worker(task):
+    """Процесс нагрузки (asyncio цикл с частью соединений)"""
+    return asyncio.run(run_load(*task))
+
+# ============================================================================
+# СЕРВЕР
+# ============================================================================
+
+def start_server(args):
+    """Запуск python -m tech_survey serve на свободном порту: (процесс, порт)"""
+    command = [sys.executable, '-u', '-m', 'tech_survey', 'serve', '--port', '0']
+    if args.store:
+        command += ['--store', args.store]
+    if args.cache_size:
+        command += ['--cache-size', str(args.cache_size)]
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.getenv('PYTHONPATH')])))
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env)
+
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        line = process.stdout.readline()
+        if not line:
+            break
+        match = re.search(r'http://[\w.]+:(\d+)/', line)
+        if match:
+            return process, int(match.group(1))
+
+    process.kill()
+    raise RuntimeError("Сервер не запустился (нужен data/processed/factstore: python -m tech_survey prepare)")
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сервиса агрегатов")
+    parser.add_argument('--url', help="адрес запущенного сервера (по умолчанию - запустить свой)")
+    parser.add_argument('--store', help="хранилище фактов для запускаемого сервера")
+    parser.add_argument('--cache-size', type=int, help="размер кэша ответов запускаемого сервера")
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS,
+                        help=f"одновременных соединений (по умолчанию {DEFAULT_CONNECTIONS})")
+    parser.add_argument('--processes', type=int, default=1,
+                        help="процессов-клиентов (соединения делятся между ними)")
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION,
+                        help=f"длительность, сек (по умолчанию {DEFAULT_DURATION:.0f})")
+    parser.add_argument('--revalidate', type=float, default=DEFAULT_REVALIDATE,
+                        help=f"доля запросов с If-None-Match (по умолчанию {DEFAULT_REVALIDATE})")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    process = None
+    try:
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            process, port = start_server(args)
+            host = '127.0.0.1'
+
+        urls = asyncio.run(build_url_pool(host, port, URL_POOL_SIZE, args.seed))
+
+        print("="*70)
+        print("🔥 НАГРУЗОЧНЫЙ ТЕСТ СЕРВИСА АГРЕГАТОВ")
+        print("="*70)
+        print(f"Сервер: http://{host}:{port}, URL в наборе: {len(urls)}")
+        print(f"Соединений: {args.connections} (процессов: {args.processes}), "
+              f"длительность: {args.duration:.0f} сек, If-None-Match: {args.revalidate:.0%}")
+
+        per_process = [args.connections // args.processes + (i < args.connections % args.processes)
+                       for i in range(args.processes)]
+        tasks = [
+            (host, port, urls, n, args.duration, args.revalidate, args.seed + 1000 * i)
+            for i, n in enumerate(per_process) if n
+        ]
+
+        start = time.perf_counter()
+        if len(tasks) == 1:
+            results = [load_worker(tasks[0])]
+        else:
+            with multiprocessing.Pool(len(tasks)) as pool:
+                results = pool.map(load_worker, tasks)
+        elapsed = time.perf_counter() - start
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies = np.array([value for result in results for value in result[0]]) * 1000
+    statuses = {}
+    for _, result_statuses in results:
+        for status, count in result_statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    print(f"\n  Запросов:        {len(latencies):,}")
+    print(f"  Запросов/сек:    {len(latencies) / elapsed:,.0f}")
+    print(f"  Задержка p50:    {p50:.2f} мс")
+    print(f"  Задержка p90:    {p90:.2f} мс")
+    print(f"  Задержка p99:    {p99:.2f} мс")
+    print(f"  Задержка max:    {latencies.max():.2f} мс")
+    print(f"  Коды ответов:    " + ", ".join(f"{s}: {c:,}" for s, c in sorted(statuses.items())))
+
+    errors = sum(count for status, count in statuses.items() if status not in (200, 304))
+    print("\n" + "="*70)
+    if errors:
+        print(f"❌ Ответов с ошибкой: {errors:,}")
+        return 1
+    print("✅ Все ответы 200/304")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
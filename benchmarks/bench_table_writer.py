@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_table_writer.py
+
+Сколько времени записи таблиц скрывает фоновая запись
+tech_survey.table_writer.TableWriter при подготовке данных.
+
+Каждый запуск повторяет вычисления prepare.main (demographics, bridge
+таблицы, 8 unpivot, technology_changes, tech_cube) по одному и тому же
+исходному файлу и отдает таблицы TableWriter с заданным числом потоков;
+файлы пишутся во временный каталог. workers=0 - синхронная
+запись (как до фоновой записи), базовая линия для сравнения.
+
+Вывод: общее время, процессорное время записи, ожидание основного потока
+(очередь + окончание записи), скрытое ожидание и размер файлов.
+
+Использование:
+    python benchmarks/bench_table_writer.py
+    python benchmarks/bench_table_writer.py --workers 0 2 --max-pending 2
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tech_survey import prepare
+from tech_survey.table_writer import DEFAULT_MAX_PENDING, TableWriter
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+DEFAULT_WORKERS = [0, 1, 2, 4]
+
+# ============================================================================
+# ЗАПУСК
+# ============================================================================
+
+def build_and_write(df, writer, output_dir):
+    """Вычисления prepare.main с записью через writer"""
+    demo_df = prepare.create_demographics_table(df)
+    writer.submit(demo_df, 'demographics.csv', output_dir)
+
+    for source_column, table_prefix in prepare.MULTISELECT_COLUMNS.items():
+        bridge_df, values_df = prepare.create_multiselect_tables(df, source_column, table_prefix)
+        writer.submit(bridge_df, f"{table_prefix}_bridge.csv", output_dir)
+        writer.submit(values_df, f"{table_prefix}_values.csv", output_dir)
+
+    tech_tables = {}
+    for source_column, (tech_type, status) in prepare.TECH_COLUMNS_MAP.items():
+        tech_df = prepare.create_technology_unpivot_table(df, source_column, tech_type, status)
+        if tech_df is not None:
+            tech_tables[(tech_type, status)] = tech_df
+            writer.submit(tech_df, f"{tech_type}_{status}.csv", output_dir)
+
+    writer.submit(prepare.create_technology_changes(tech_tables), f"{prepare.CHANGES_TABLE}.csv", output_dir)
+    writer.submit(prepare.create_technology_cube(demo_df, tech_tables), 'tech_cube.csv', output_dir)
+
+def run_config(df, workers, max_pending):
+    """Один запуск: (время, stats, размер файлов в байтах)"""
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, 'w') as devnull:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            with TableWriter(workers=workers, max_pending=max_pending) as writer:
+                build_and_write(df, writer, tmp_dir)
+        elapsed = time.perf_counter() - start
+        size = sum(result['size'] for result in writer.results.values())
+    return elapsed, writer.stats, size
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Фоновая запись таблиц подготовки: время и скрытое ожидание")
+    parser.add_argument('--workers', type=int, nargs='+', default=DEFAULT_WORKERS,
+                        help=f"потоков записи (0 - синхронно, по умолчанию {DEFAULT_WORKERS})")
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING,
+                        help=f"таблиц в очереди (по умолчанию {DEFAULT_MAX_PENDING})")
+    parser.add_argument('--input', default=prepare.INPUT_FILE,
+                        help=f"исходный файл (по умолчанию {prepare.INPUT_FILE})")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        print(f"❌ Нет исходного файла {args.input}")
+        return 1
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        df = prepare.load_data(args.input)
+
+    print("="*86)
+    print(f"💾 ФОНОВАЯ ЗАПИСЬ ТАБЛИЦ: {len(df):,} респондентов, CPU: {os.cpu_count()}, "
+          f"очередь: {args.max_pending}")
+    print("="*86)
+    print(f"  {'потоков':>7} {'время':>9} {'запись CPU':>11} {'ждали':>8} "
+          f"{'скрыто':>8} {'МБ':>7} {'vs синхр.':>10}")
+    print("  " + "-"*74)
+
+    baseline = None
+    for workers in args.workers:
+        elapsed, stats, size = run_config(df, workers, args.max_pending)
+        waited = stats['backpressure_seconds'] + stats['drain_seconds']
+        if workers == 0:
+            baseline = elapsed
+        speedup = f"{baseline / elapsed:>9.2f}x" if baseline else f"{'-':>10}"
+        print(f"  {workers:>7} {elapsed:>5.2f} сек {stats['write_cpu_seconds']:>7.2f} сек "
+              f"{waited:>4.2f} сек {stats['hidden_seconds']:>4.2f} сек {size / 1024 / 1024:>7.1f} {speedup}")
+
+    print("\n" + "="*86)
+    print("скрыто = процессорное время записи - ожидание основного потока; на одном ядре")
+    print("запись все равно конкурирует с вычислением, итог - столбец 'vs синхр.'")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
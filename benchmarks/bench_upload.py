@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_upload.py
+
+Время загрузки подготовленных таблиц в BigQuery от начала до проверки
+контрольных сумм для разных стратегий - без credentials, через
+tech_survey.fake_bigquery.FakeBigQueryClient с профилем задержек и
+случайными временными сбоями.
+
+Стратегии:
+    sequential             - upload.run_upload: таблицы по очереди (как `upload`)
+    parallel               - таблицы в пуле потоков (как этапы upload:* в `pipeline`)
+    consolidated           - run_upload с technology_responses вместо 8 таблиц
+    consolidated-parallel  - то же в пуле потоков
+
+Каждая стратегия запускается на новом клиенте с одним и тем же seed.
+Вывод загрузки скрыт; итог - время, вызовы API, сбои и повторы, объем
+отправленных данных и результат проверки контрольных сумм. Скрипт
+завершается с кодом 1, если какая-либо стратегия не загрузила все таблицы.
+
+Использование:
+    python -m tech_survey prepare [--consolidated]
+    python benchmarks/bench_upload.py
+    python benchmarks/bench_upload.py --latency wan --failure-rate 0.05 --workers 8
+    python benchmarks/bench_upload.py --strategies sequential parallel --no-validate
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Результаты фейкового клиента не должны попадать в кэш запросов
+os.environ['QUERY_CACHE_TTL'] = '0'
+
+from tech_survey import upload
+from tech_survey.fake_bigquery import LATENCY_PROFILES, FakeBigQueryClient
+from tech_survey.table_checksums import compute_file_checksum
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+DEFAULT_LATENCY = 'lan'
+DEFAULT_WORKERS = 4
+DEFAULT_SEED = 42
+
+# ============================================================================
+# СТРАТЕГИИ
+# ============================================================================
+
+def upload_sequential(client, files, args, checkpoint_path):
+    """Загрузка командой upload: таблица за таблицей, checkpoint, проверка"""
+    return upload.run_upload(
+        client, upload.DATASET_ID, files, checkpoint_path=checkpoint_path,
+        max_retries=args.max_retries, validate=args.validate,
+    )
+
+def upload_parallel(client, files, args, checkpoint_path):
+    """Загрузка таблиц в пуле потоков и одна проверка в конце (как pipeline)"""
+    if args.validate:
+        invalid = upload.validate_upload_files(files)
+        if invalid:
+            return [{'table_name': name, 'success': False, 'error': 'Schema validation failed'} for name in invalid]
+
+    def load(filename):
+        table_name = filename.replace('.csv', '')
+        csv_path = os.path.join(upload.DATA_DIR, filename)
+        result = upload.upload_csv_to_bigquery(
+            client, upload.DATASET_ID, table_name, csv_path, max_retries=args.max_retries, validate=False,
+        )
+        checksum = compute_file_checksum(csv_path, table_name) if result['success'] else None
+        return {'table_name': table_name, 'success': result['success'], 'error': result['error']}, checksum
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        loaded = list(pool.map(load, files))
+
+    results = [result for result, _ in loaded]
+    checksums = {result['table_name']: checksum for result, checksum in loaded if checksum}
+    mismatches = upload.verify_uploaded_tables(client, upload.DATASET_ID, checksums)
+    for result in results:
+        if mismatches.get(result['table_name']):
+            result['success'] = False
+            result['error'] = f"Checksum mismatch: {', '.join(mismatches[result['table_name']])}"
+    return results
+
+# Стратегия -> (функция, файлы)
+STRATEGIES = {
+    'sequential': (upload_sequential, upload.FILES_TO_UPLOAD),
+    'parallel': (upload_parallel, upload.FILES_TO_UPLOAD),
+    'consolidated': (upload_sequential, upload.CONSOLIDATED_FILES_TO_UPLOAD),
+    'consolidated-parallel': (upload_parallel, upload.CONSOLIDATED_FILES_TO_UPLOAD),
+}
+
+def run_strategy(name, args):
+    """Одна стратегия на новом клиенте: (время, результаты, статистика клиента)"""
+    func, files = STRATEGIES[name]
+    client = FakeBigQueryClient(
+        project=str(upload.PROJECT_ID), latency=args.latency, failure_rate=args.failure_rate,
+        seed=args.seed, check_types=False,
+    )
+    client.create_dataset(f"{upload.PROJECT_ID}.{upload.DATASET_ID}")
+    client.stats['calls'].clear()
+
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, 'w') as devnull:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            results = func(client, files, args, os.path.join(tmp_dir, 'checkpoint.json'))
+        elapsed = time.perf_counter() - start
+
+    return elapsed, results, client.stats
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Время загрузки в BigQuery по стратегиям (фейковый клиент)")
+    parser.add_argument('--strategies', nargs='+', choices=list(STRATEGIES), default=list(STRATEGIES),
+                        help="стратегии (по умолчанию все)")
+    parser.add_argument('--latency', choices=list(LATENCY_PROFILES), default=DEFAULT_LATENCY,
+                        help=f"профиль задержек (по умолчанию {DEFAULT_LATENCY})")
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help="вероятность временной ошибки на вызов API (по умолчанию 0)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"потоков параллельных стратегий (по умолчанию {DEFAULT_WORKERS})")
+    parser.add_argument('--max-retries', type=int, default=upload.UPLOAD_MAX_RETRIES,
+                        help=f"повторов при временных ошибках (по умолчанию {upload.UPLOAD_MAX_RETRIES})")
+    parser.add_argument('--no-validate', dest='validate', action='store_false',
+                        help="без проверки CSV по схемам перед загрузкой")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    missing = {
+        name: [f for f in files if not os.path.exists(os.path.join(upload.DATA_DIR, f))]
+        for name, (_, files) in STRATEGIES.items()
+    }
+
+    profile = LATENCY_PROFILES[args.latency]
+    print("="*86)
+    print("📤 ЗАГРУЗКА В BIGQUERY: СТРАТЕГИИ (ФЕЙКОВЫЙ КЛИЕНТ)")
+    print("="*86)
+    print(f"Профиль {args.latency}: вызов {profile['call'] * 1000:.0f} мс, load job {profile['load']:.1f} сек, "
+          f"запрос {profile['query']:.1f} сек, отправка "
+          f"{str(profile['upload_mbps']) + ' МБ/сек' if profile['upload_mbps'] else 'без ограничения'}")
+    print(f"Сбоев на вызов: {args.failure_rate:.0%}, проверка по схеме: {'да' if args.validate else 'нет'}, "
+          f"потоков: {args.workers}\n")
+
+    print(f"  {'стратегия':<24} {'время':>9} {'таблиц':>7} {'вызовов':>8} {'сбоев':>6} {'МБ':>7}  результат")
+    print("  " + "-"*82)
+
+    failed = []
+    for name in args.strategies:
+        if missing[name]:
+            print(f"  {name:<24} {'-':>9}  пропущена: нет {', '.join(missing[name])}")
+            continue
+
+        elapsed, results, stats = run_strategy(name, args)
+        errors = [r for r in results if not r['success']]
+        calls = sum(count for method, count in stats['calls'].items() if not method.endswith('_job'))
+        status = "✅" if not errors else f"❌ {errors[0]['table_name']}: {errors[0]['error']}"
+        print(f"  {name:<24} {elapsed:>5.2f} сек {len(results):>7} {calls:>8} {stats['failures']:>6} "
+              f"{stats['bytes_uploaded'] / 1024 / 1024:>7.1f}  {status}")
+        if errors:
+            failed.append(name)
+
+    print("\n" + "="*86)
+    if failed:
+        print(f"❌ Не все таблицы загружены: {', '.join(failed)}")
+        return 1
+    print("✅ Все стратегии загрузили и проверили таблицы")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -258,6 +258,42 @@ SELECT
   COUNT(DISTINCT ResponseId) as UniqueRespondents
 FROM `surveydata-478616.tech_survey_data.webframe_wanttowork`;
 
+-- ============================================================================
+-- КУБ АГРЕГАТОВ (ФИЛЬТРЫ COUNTRY / AGE / EDLEVEL)
+-- ============================================================================
+-- Таблица tech_cube создается tech_survey/prepare.py и содержит
+-- предвычисленные RespondentCount для всех 8 уровней rollup.
+-- Свернутое измерение имеет значение 'ALL', поэтому любой фильтр дашборда
+-- превращается в выборку строк без JOIN с demographics:
+--   без фильтра        -> Country = 'ALL' AND Age = 'ALL' AND EdLevel = 'ALL'
+--   фильтр по стране   -> Country = 'Germany' AND Age = 'ALL' AND EdLevel = 'ALL'
+
+-- VIEW 14: Технологии по сегментам (источник данных с фильтрами для Looker Studio)
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.tech_by_segment` AS
+SELECT 
+  Category,
+  Status,
+  Technology,
+  Country,
+  Age,
+  EdLevel,
+  RespondentCount,
+  SegmentRespondents,
+  Percentage,
+  RANK() OVER (
+    PARTITION BY Category, Status, Country, Age, EdLevel
+    ORDER BY RespondentCount DESC
+  ) as TechRank
+FROM `surveydata-478616.tech_survey_data.tech_cube`;
+
+-- Пример: Топ-10 языков (Have Worked) в Германии среди 25-34 лет
+-- SELECT Technology, RespondentCount, Percentage
+-- FROM `surveydata-478616.tech_survey_data.tech_by_segment`
+-- WHERE Category = 'language' AND Status = 'haveworked'
+--   AND Country = 'Germany' AND Age = '25-34 years old' AND EdLevel = 'ALL'
+--   AND TechRank <= 10
+-- ORDER BY RespondentCount DESC;
+
 -- ============================================================================
 -- ПРОВЕРКА СОЗДАННЫХ VIEWS
 -- ============================================================================
@@ -0,0 +1,273 @@
+-- ============================================================================
+-- SQL VIEWS ДЛЯ LOOKER STUDIO DASHBOARD (ЕДИНАЯ ТАБЛИЦА ФАКТОВ)
+-- Проект: surveydata-478616
+-- Dataset: tech_survey_data
+-- ============================================================================
+-- Вариант create_views.sql для загрузки с --consolidated: вместо 8 таблиц
+-- {category}_{status} все ответы лежат в technology_responses
+-- (ResponseId, Category, Status, Technology), кластеризованной по
+-- Category, Status, Technology. Фильтр WHERE Category/Status читает только
+-- нужные блоки таблицы. Имена и колонки views те же, что в create_views.sql.
+
+-- ============================================================================
+-- СТРАНИЦА 1: ТЕКУЩЕЕ ИСПОЛЬЗОВАНИЕ ТЕХНОЛОГИЙ (HAVE WORKED WITH)
+-- ============================================================================
+
+-- VIEW 1: Топ-10 языков программирования (Have Worked)
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.top10_languages_haveworked` AS
+SELECT 
+  Technology,
+  COUNT(DISTINCT ResponseId) as RespondentCount,
+  ROUND(COUNT(DISTINCT ResponseId) / (SELECT COUNT(*) FROM `surveydata-478616.tech_survey_data.demographics`) * 100, 2) as Percentage
+FROM `surveydata-478616.tech_survey_data.technology_responses`
+WHERE Category = 'language' AND Status = 'haveworked'
+GROUP BY Technology
+ORDER BY RespondentCount DESC
+LIMIT 10;
+
+-- VIEW 2: Топ-10 баз данных (Have Worked)
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.top10_databases_haveworked` AS
+SELECT 
+  Technology,
+  COUNT(DISTINCT ResponseId) as RespondentCount,
+  ROUND(COUNT(DISTINCT ResponseId) / (SELECT COUNT(*) FROM `surveydata-478616.tech_survey_data.demographics`) * 100, 2) as Percentage
+FROM `surveydata-478616.tech_survey_data.technology_responses`
+WHERE Category = 'database' AND Status = 'haveworked'
+GROUP BY Technology
+ORDER BY RespondentCount DESC
+LIMIT 10;
+
+-- VIEW 3: Все платформы (Have Worked) - без лимита, для Tree Map
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.all_platforms_haveworked` AS
+SELECT 
+  Technology,
+  COUNT(DISTINCT ResponseId) as RespondentCount,
+  ROUND(COUNT(DISTINCT ResponseId) / (SELECT COUNT(*) FROM `surveydata-478616.tech_survey_data.demographics`) * 100, 2) as Percentage
+FROM `surveydata-478616.tech_survey_data.technology_responses`
+WHERE Category = 'platform' AND Status = 'haveworked'
+GROUP BY Technology
+ORDER BY RespondentCount DESC;
+
+-- VIEW 4: Топ-10 веб-фреймворков (Have Worked)
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.top10_webframes_haveworked` AS
+SELECT 
+  Technology,
+  COUNT(DISTINCT ResponseId) as RespondentCount,
+  ROUND(COUNT(DISTINCT ResponseId) / (SELECT COUNT(*) FROM `surveydata-478616.tech_survey_data.demographics`) * 100, 2) as Percentage
+FROM `surveydata-478616.tech_survey_data.technology_responses`
+WHERE Category = 'webframe' AND Status = 'haveworked'
+GROUP BY Technology
+ORDER BY RespondentCount DESC
+LIMIT 10;
+
+-- ============================================================================
+-- СТРАНИЦА 2: БУДУЩИЕ ТЕХНОЛОГИЧЕСКИЕ ТРЕНДЫ (WANT TO WORK WITH)
+-- ============================================================================
+
+-- VIEW 5: Топ-10 языков программирования (Want to Work)
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.top10_languages_wanttowork` AS
+SELECT 
+  Technology,
+  COUNT(DISTINCT ResponseId) as RespondentCount,
+  ROUND(COUNT(DISTINCT ResponseId) / (SELECT COUNT(*) FROM `surveydata-478616.tech_survey_data.demographics`) * 100, 2) as Percentage
+FROM `surveydata-478616.tech_survey_data.technology_responses`
+WHERE Category = 'language' AND Status = 'wanttowork'
+GROUP BY Technology
+ORDER BY RespondentCount DESC
+LIMIT 10;
+
+-- VIEW 6: Топ-10 баз данных (Want to Work)
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.top10_databases_wanttowork` AS
+SELECT 
+  Technology,
+  COUNT(DISTINCT ResponseId) as RespondentCount,
+  ROUND(COUNT(DISTINCT ResponseId) / (SELECT COUNT(*) FROM `surveydata-478616.tech_survey_data.demographics`) * 100, 2) as Percentage
+FROM `surveydata-478616.tech_survey_data.technology_responses`
+WHERE Category = 'database' AND Status = 'wanttowork'
+GROUP BY Technology
+ORDER BY RespondentCount DESC
+LIMIT 10;
+
+-- VIEW 7: Все платформы (Want to Work)
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.all_platforms_wanttowork` AS
+SELECT 
+  Technology,
+  COUNT(DISTINCT ResponseId) as RespondentCount,
+  ROUND(COUNT(DISTINCT ResponseId) / (SELECT COUNT(*) FROM `surveydata-478616.tech_survey_data.demographics`) * 100, 2) as Percentage
+FROM `surveydata-478616.tech_survey_data.technology_responses`
+WHERE Category = 'platform' AND Status = 'wanttowork'
+GROUP BY Technology
+ORDER BY RespondentCount DESC;
+
+-- VIEW 8: Топ-10 веб-фреймворков (Want to Work)
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.top10_webframes_wanttowork` AS
+SELECT 
+  Technology,
+  COUNT(DISTINCT ResponseId) as RespondentCount,
+  ROUND(COUNT(DISTINCT ResponseId) / (SELECT COUNT(*) FROM `surveydata-478616.tech_survey_data.demographics`) * 100, 2) as Percentage
+FROM `surveydata-478616.tech_survey_data.technology_responses`
+WHERE Category = 'webframe' AND Status = 'wanttowork'
+GROUP BY Technology
+ORDER BY RespondentCount DESC
+LIMIT 10;
+
+-- ============================================================================
+-- СРАВНИТЕЛЬНЫЕ VIEWS (HAVE VS WANT)
+-- ============================================================================
+
+-- VIEW 9: Сравнение языков (Have vs Want) - для Combo Chart
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.languages_have_vs_want` AS
+WITH have AS (
+  SELECT 
+    Technology,
+    COUNT(DISTINCT ResponseId) as HaveCount
+  FROM `surveydata-478616.tech_survey_data.technology_responses`
+  WHERE Category = 'language' AND Status = 'haveworked'
+  GROUP BY Technology
+),
+want AS (
+  SELECT 
+    Technology,
+    COUNT(DISTINCT ResponseId) as WantCount
+  FROM `surveydata-478616.tech_survey_data.technology_responses`
+  WHERE Category = 'language' AND Status = 'wanttowork'
+  GROUP BY Technology
+),
+top_have AS (
+  SELECT Technology
+  FROM have
+  ORDER BY HaveCount DESC
+  LIMIT 10
+)
+SELECT 
+  h.Technology,
+  COALESCE(h.HaveCount, 0) as HaveWorkedCount,
+  COALESCE(w.WantCount, 0) as WantToWorkCount,
+  COALESCE(w.WantCount, 0) - COALESCE(h.HaveCount, 0) as Difference,
+  CASE 
+    WHEN h.HaveCount > 0 THEN ROUND((COALESCE(w.WantCount, 0) - COALESCE(h.HaveCount, 0)) / h.HaveCount * 100, 1)
+    ELSE 0
+  END as GrowthPercent
+FROM have h
+LEFT JOIN want w USING (Technology)
+WHERE h.Technology IN (SELECT Technology FROM top_have)
+ORDER BY h.HaveCount DESC;
+
+-- ============================================================================
+-- СТРАНИЦА 3: ДЕМОГРАФИЯ
+-- ============================================================================
+
+-- VIEW 10: Респонденты по странам
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.demographics_by_country` AS
+SELECT 
+  Country,
+  COUNT(*) as RespondentCount,
+  ROUND(COUNT(*) / (SELECT COUNT(*) FROM `surveydata-478616.tech_survey_data.demographics`) * 100, 2) as Percentage
+FROM `surveydata-478616.tech_survey_data.demographics`
+WHERE Country != 'Not Specified'
+  AND Country_IsValid = TRUE
+GROUP BY Country
+ORDER BY RespondentCount DESC;
+
+-- VIEW 11: Респонденты по возрасту
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.demographics_by_age` AS
+SELECT 
+  Age,
+  COUNT(*) as RespondentCount,
+  ROUND(COUNT(*) / (SELECT COUNT(*) FROM `surveydata-478616.tech_survey_data.demographics`) * 100, 2) as Percentage
+FROM `surveydata-478616.tech_survey_data.demographics`
+WHERE Age != 'Not Specified'
+  AND Age_IsValid = TRUE
+GROUP BY Age
+ORDER BY 
+  CASE Age
+    WHEN 'Under 18 years old' THEN 1
+    WHEN '18-24 years old' THEN 2
+    WHEN '25-34 years old' THEN 3
+    WHEN '35-44 years old' THEN 4
+    WHEN '45-54 years old' THEN 5
+    WHEN '55-64 years old' THEN 6
+    WHEN '65 years or older' THEN 7
+    ELSE 8
+  END;
+
+-- VIEW 12: Респонденты по уровню образования
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.demographics_by_education` AS
+SELECT 
+  EdLevel,
+  COUNT(*) as RespondentCount,
+  ROUND(COUNT(*) / (SELECT COUNT(*) FROM `surveydata-478616.tech_survey_data.demographics`) * 100, 2) as Percentage
+FROM `surveydata-478616.tech_survey_data.demographics`
+WHERE EdLevel != 'Not Specified'
+  AND EdLevel_IsValid = TRUE
+GROUP BY EdLevel
+ORDER BY RespondentCount DESC;
+
+-- ============================================================================
+-- ВСПОМОГАТЕЛЬНЫЕ VIEWS
+-- ============================================================================
+
+-- VIEW 13: Общая статистика по всем технологиям
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.overall_tech_stats` AS
+SELECT 
+  CASE Category
+    WHEN 'language' THEN 'Languages'
+    WHEN 'database' THEN 'Databases'
+    WHEN 'platform' THEN 'Platforms'
+    WHEN 'webframe' THEN 'Web Frameworks'
+  END as TechCategory,
+  CASE Status
+    WHEN 'haveworked' THEN 'Have Worked'
+    WHEN 'wanttowork' THEN 'Want to Work'
+  END as Status,
+  COUNT(DISTINCT Technology) as UniqueTechnologies,
+  COUNT(*) as TotalMentions,
+  COUNT(DISTINCT ResponseId) as UniqueRespondents
+FROM `surveydata-478616.tech_survey_data.technology_responses`
+GROUP BY 1, 2;
+
+-- ============================================================================
+-- КУБ АГРЕГАТОВ (ФИЛЬТРЫ COUNTRY / AGE / EDLEVEL)
+-- ============================================================================
+-- Таблица tech_cube создается tech_survey/prepare.py и содержит
+-- предвычисленные RespondentCount для всех 8 уровней rollup.
+-- Свернутое измерение имеет значение 'ALL', поэтому любой фильтр дашборда
+-- превращается в выборку строк без JOIN с demographics:
+--   без фильтра        -> Country = 'ALL' AND Age = 'ALL' AND EdLevel = 'ALL'
+--   фильтр по стране   -> Country = 'Germany' AND Age = 'ALL' AND EdLevel = 'ALL'
+
+-- VIEW 14: Технологии по сегментам (источник данных с фильтрами для Looker Studio)
+CREATE OR REPLACE VIEW `surveydata-478616.tech_survey_data.tech_by_segment` AS
+SELECT 
+  Category,
+  Status,
+  Technology,
+  Country,
+  Age,
+  EdLevel,
+  RespondentCount,
+  SegmentRespondents,
+  Percentage,
+  RANK() OVER (
+    PARTITION BY Category, Status, Country, Age, EdLevel
+    ORDER BY RespondentCount DESC
+  ) as TechRank
+FROM `surveydata-478616.tech_survey_data.tech_cube`;
+
+-- Пример: Топ-10 языков (Have Worked) в Германии среди 25-34 лет
+-- SELECT Technology, RespondentCount, Percentage
+-- FROM `surveydata-478616.tech_survey_data.tech_by_segment`
+-- WHERE Category = 'language' AND Status = 'haveworked'
+--   AND Country = 'Germany' AND Age = '25-34 years old' AND EdLevel = 'ALL'
+--   AND TechRank <= 10
+-- ORDER BY RespondentCount DESC;
+
+-- ============================================================================
+-- ПРОВЕРКА СОЗДАННЫХ VIEWS
+-- ============================================================================
+
+-- Проверьте, что все views созданы успешно:
+-- SELECT table_name 
+-- FROM `surveydata-478616.tech_survey_data.INFORMATION_SCHEMA.TABLES`
+-- WHERE table_type = 'VIEW'
+-- ORDER BY table_name;
\ No newline at end of file
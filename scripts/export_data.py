@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+scripts/export_data.py
+
+Экспорт таблиц/views BigQuery в Parquet или Arrow.
+Обертка для совместимости: код находится в пакете tech_survey,
+то же самое выполняет python -m tech_survey export
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tech_survey.cli import run_command
+
+if __name__ == "__main__":
+    exit(run_command('export'))
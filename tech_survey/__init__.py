@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+tech_survey - подготовка данных Stack Overflow Developer Survey 2024 и загрузка в BigQuery
+
+Модули:
+    analyze           - первичный анализ исходного CSV
+    prepare           - demographics, unpivot таблицы, куб агрегатов, хранилище фактов
+    upload            - загрузка в BigQuery с повторами, checkpoint и проверкой
+    export            - экспорт таблиц/views через Storage Read API
+    report            - отчетные запросы через кэш
+    pipeline          - граф этапов с пропуском неизмененных
+    bq_query          - кэширующий слой запросов BigQuery
+    table_checksums   - контрольные суммы таблиц
+    fact_store        - memory-mapped CSR хранилище респондент → технологии
+    sketches          - скетчи HyperLogLog для объединяемых оценок числа респондентов
+    query_index       - фильтрованные топ-N запросы по индексам хранилища фактов
+    serve             - локальный HTTP сервис агрегатов (замена views BigQuery)
+    confidence        - доверительные интервалы долей технологий (Вильсон, bootstrap)
+    incremental       - дозагрузка новых ответов (prepare --append)
+    schema_validation - проверка CSV по схемам BigQuery до загрузки
+    fake_bigquery     - bigquery.Client в памяти (тесты и замеры без credentials)
+    table_writer      - фоновая запись таблиц подготовки (prepare --writers)
+    cli               - командная строка (python -m tech_survey)
+
+Пакет ничего не импортирует при загрузке: тяжелые зависимости подключает
+только модуль, который их использует.
+"""
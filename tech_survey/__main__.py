@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""python -m tech_survey COMMAND [аргументы]"""
+
+from tech_survey.cli import main
+
+exit(main())
@@ -0,0 +1,274 @@
+# tech_survey/analyze.py
+"""
+Скрипт для первичного анализа данных опроса
+"""
+import pandas as pd
+import os
+from pathlib import Path
+
+# ============================================================================
+# КОНСТАНТЫ И НАСТРОЙКИ
+# ============================================================================
+
+# Путь к исходному файлу
+INPUT_FILE = 'data/raw/survey_results.csv'
+REPORT_PATH = 'data/processed/data_analysis_report.txt'
+
+TECH_COLUMNS_PATTERNS = [
+    'Language', 'Database', 'Platform', 'Webframe', 'WebFrame'
+]
+
+DEMO_PATTERNS = ['Country', 'Age', 'Ed', 'Gender', 'Employment', 'YearsCode']
+
+ID_COLUMNS = ['ResponseId', 'RespondentId', 'Respondent', 'ID', 'id']
+
+# ============================================================================
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ============================================================================
+
+def print_header(text):
+    """Печать заголовка"""
+    print("\n" + "="*70)
+    print(text)
+    print("="*70)
+
+def find_columns(df, patterns):
+    """Столбцы, в названии которых встречается один из шаблонов"""
+    found_columns = []
+    for col in df.columns:
+        for pattern in patterns:
+            if pattern.lower() in col.lower():
+                found_columns.append(col)
+                break
+    return found_columns
+
+# ============================================================================
+# ОСНОВНЫЕ ФУНКЦИИ
+# ============================================================================
+
+def load_data(filepath):
+    """Загрузка исходных данных (None - файл не найден или не читается)"""
+    # Проверка существования файла
+    if not os.path.exists(filepath):
+        print(f"\n❌ ОШИБКА: Файл '{filepath}' не найден!")
+        print("\nПожалуйста:")
+        print("1. Поместите ваш CSV файл в папку data/raw/")
+        print("2. Переименуйте его в 'survey_results.csv'")
+        print("3. Или измените переменную INPUT_FILE в этом скрипте")
+        return None
+
+    print(f"\n✓ Файл найден: {filepath}")
+
+    # Загрузка данных
+    print("\n🔄 Загрузка данных...")
+    try:
+        df = pd.read_csv(filepath, low_memory=False)
+        print(f"✓ Данные загружены успешно")
+    except Exception as e:
+        print(f"❌ Ошибка при загрузке: {e}")
+        return None
+
+    return df
+
+def print_basic_info(df):
+    """Основная информация и список столбцов"""
+    print_header("📊 ОСНОВНАЯ ИНФОРМАЦИЯ")
+    print(f"Строк (респондентов): {len(df):,}")
+    print(f"Столбцов: {len(df.columns):,}")
+    print(f"Размер в памяти: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+
+    # Список всех столбцов
+    print_header("📋 СПИСОК ВСЕХ СТОЛБЦОВ")
+    for idx, col in enumerate(df.columns, 1):
+        print(f"{idx:3d}. {col}")
+
+def analyze_tech_columns(df):
+    """Поиск технологических столбцов"""
+    print_header("🔍 ПОИСК ТЕХНОЛОГИЧЕСКИХ СТОЛБЦОВ")
+
+    found_tech_columns = find_columns(df, TECH_COLUMNS_PATTERNS)
+
+    print(f"\nНайдено технологических столбцов: {len(found_tech_columns)}")
+    for col in found_tech_columns:
+        non_null = df[col].notna().sum()
+        null_percent = (df[col].isna().sum() / len(df) * 100)
+        print(f"\n  • {col}")
+        print(f"    Заполнено: {non_null:,} ({100-null_percent:.1f}%)")
+        print(f"    Пропусков: {df[col].isna().sum():,} ({null_percent:.1f}%)")
+
+        # Пример данных
+        sample = df[col].dropna().iloc[0] if non_null > 0 else "Нет данных"
+        if len(str(sample)) > 100:
+            sample = str(sample)[:100] + "..."
+        print(f"    Пример: {sample}")
+
+    return found_tech_columns
+
+def analyze_demo_columns(df):
+    """Поиск демографических столбцов"""
+    print_header("👥 ПОИСК ДЕМОГРАФИЧЕСКИХ СТОЛБЦОВ")
+
+    found_demo_columns = find_columns(df, DEMO_PATTERNS)
+
+    print(f"\nНайдено демографических столбцов: {len(found_demo_columns)}")
+    for col in found_demo_columns:
+        unique_vals = df[col].nunique()
+        non_null = df[col].notna().sum()
+        null_percent = (df[col].isna().sum() / len(df) * 100)
+
+        print(f"\n  • {col}")
+        print(f"    Уникальных значений: {unique_vals:,}")
+        print(f"    Заполнено: {non_null:,} ({100-null_percent:.1f}%)")
+        print(f"    Пропусков: {df[col].isna().sum():,} ({null_percent:.1f}%)")
+
+        # Показываем первые 5 уникальных значений
+        if unique_vals <= 20:
+            top_values = df[col].value_counts().head(5)
+            print(f"    Топ-5 значений:")
+            for val, count in top_values.items():
+                print(f"      - {val}: {count:,} ({count/len(df)*100:.1f}%)")
+
+    return found_demo_columns
+
+def analyze_missing_values(df):
+    """Анализ пропущенных значений"""
+    print_header("🔍 АНАЛИЗ ПРОПУЩЕННЫХ ЗНАЧЕНИЙ")
+
+    missing_data = pd.DataFrame({
+        'Column': df.columns,
+        'Missing_Count': df.isnull().sum(),
+        'Missing_Percent': (df.isnull().sum() / len(df) * 100).round(2)
+    })
+
+    missing_data = missing_data[missing_data['Missing_Count'] > 0].sort_values(
+        'Missing_Percent', ascending=False
+    )
+
+    if len(missing_data) > 0:
+        print(f"\nСтолбцов с пропусками: {len(missing_data)}")
+        print("\nТоп-10 столбцов с наибольшим количеством пропусков:")
+        print(missing_data.head(10).to_string(index=False))
+    else:
+        print("\n✓ Пропущенных значений не обнаружено!")
+
+    return missing_data
+
+def check_response_id(df):
+    """Проверка наличия идентификатора респондента"""
+    print_header("🔑 ПРОВЕРКА ИДЕНТИФИКАТОРА РЕСПОНДЕНТА")
+
+    found_id = None
+    for col in ID_COLUMNS:
+        if col in df.columns:
+            found_id = col
+            break
+
+    if found_id:
+        print(f"✓ Найден столбец ID: '{found_id}'")
+        print(f"  Уникальных значений: {df[found_id].nunique():,}")
+        print(f"  Дубликатов: {df[found_id].duplicated().sum():,}")
+
+        if df[found_id].nunique() == len(df):
+            print(f"  ✓ Все ID уникальны")
+        else:
+            print(f"  ⚠️ Есть дубликаты ID!")
+    else:
+        print("⚠️ Столбец с ID респондента не найден")
+        print("   Будет создан автоматически")
+
+    return found_id
+
+def save_report(df, input_file, report_path, found_tech_columns, found_demo_columns, missing_data):
+    """Сохранение отчета"""
+    print_header("💾 СОХРАНЕНИЕ ОТЧЕТА")
+
+    Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write("="*70 + "\n")
+        f.write("ОТЧЕТ ПО АНАЛИЗУ ДАННЫХ\n")
+        f.write("="*70 + "\n\n")
+        f.write(f"Файл: {input_file}\n")
+        f.write(f"Строк: {len(df):,}\n")
+        f.write(f"Столбцов: {len(df.columns):,}\n\n")
+
+        f.write("ТЕХНОЛОГИЧЕСКИЕ СТОЛБЦЫ:\n")
+        f.write("-"*70 + "\n")
+        for col in found_tech_columns:
+            f.write(f"  • {col}\n")
+
+        f.write("\n\nДЕМОГРАФИЧЕСКИЕ СТОЛБЦЫ:\n")
+        f.write("-"*70 + "\n")
+        for col in found_demo_columns:
+            f.write(f"  • {col}\n")
+
+        if len(missing_data) > 0:
+            f.write("\n\nПРОПУЩЕННЫЕ ЗНАЧЕНИЯ:\n")
+            f.write("-"*70 + "\n")
+            f.write(missing_data.head(20).to_string(index=False))
+
+    print(f"✓ Отчет сохранен: {report_path}")
+
+def analyze_dataframe(df, input_file=INPUT_FILE, report_path=REPORT_PATH):
+    """
+    Полный анализ загруженных данных с сохранением отчета
+
+    Returns:
+        dict с найденными столбцами и сводкой
+    """
+    print_basic_info(df)
+    found_tech_columns = analyze_tech_columns(df)
+    found_demo_columns = analyze_demo_columns(df)
+    missing_data = analyze_missing_values(df)
+    found_id = check_response_id(df)
+    save_report(df, input_file, report_path, found_tech_columns, found_demo_columns, missing_data)
+
+    return {
+        'rows': len(df),
+        'tech_columns': found_tech_columns,
+        'demo_columns': found_demo_columns,
+        'missing_columns': len(missing_data),
+        'id_column': found_id,
+    }
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def main():
+    """Основная функция выполнения"""
+    print("="*70)
+    print("АНАЛИЗ ИСХОДНЫХ ДАННЫХ")
+    print("="*70)
+
+    df = load_data(INPUT_FILE)
+    if df is None:
+        return 1
+
+    summary = analyze_dataframe(df)
+
+    # Итоговая сводка
+    print_header("✅ АНАЛИЗ ЗАВЕРШЕН")
+    print(f"\n📊 Краткая сводка:")
+    print(f"  • Респондентов: {summary['rows']:,}")
+    print(f"  • Технологических столбцов: {len(summary['tech_columns'])}")
+    print(f"  • Демографических столбцов: {len(summary['demo_columns'])}")
+    print(f"  • Столбцов с пропусками: {summary['missing_columns']}")
+    print(f"  • ID столбец: {summary['id_column'] if summary['id_column'] else 'Будет создан'}")
+
+    print("\n📝 Следующий шаг:")
+    print("   Запустите: python -m tech_survey prepare")
+    print("="*70)
+
+    return 0
+
+def run(args):
+    """Команда `analyze` (tech_survey.cli)"""
+    return main()
+
+# ============================================================================
+# ТОЧКА ВХОДА
+# ============================================================================
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/bq_query.py
+
+Общий слой запросов к BigQuery для скриптов проекта.
+Результаты запросов кэшируются на диске в формате Arrow (Feather):
+- ключ = нормализованный SQL + время изменения всех таблиц запроса
+  (для views учитываются таблицы, на которые они ссылаются); время
+  изменения всех таблиц dataset приходит одним запросом к __TABLES__,
+  а не отдельным get_table на каждую таблицу;
+- записи старше TTL считаются устаревшими;
+- при превышении лимита размера удаляются давно не использованные записи (LRU).
+
+Настройки (.env):
+    QUERY_CACHE_DIR     - каталог кэша (по умолчанию .cache/bigquery)
+    QUERY_CACHE_TTL     - время жизни записи в секундах (0 - кэш выключен)
+    QUERY_CACHE_MAX_MB  - максимальный размер кэша в MB
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+DEFAULT_CACHE_DIR = '.cache/bigquery'
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MAX_MB = 256
+
+INDEX_FILENAME = 'index.json'
+
+# Ссылки на таблицы вида `project.dataset.table` или `dataset.table`
+TABLE_REF_PATTERN = re.compile(r'`([\w\-]+(?:\.[\w\-]+){1,2})`')
+
+# ============================================================================
+# НОРМАЛИЗАЦИЯ SQL
+# ============================================================================
+
+def normalize_sql(sql):
+    """
+    Нормализация SQL для ключа кэша: без комментариев, лишних пробелов
+    и завершающей точки с запятой. Регистр не меняется (строковые литералы).
+    """
+    sql = re.sub(r'/\*.*?\*/', ' ', sql, flags=re.DOTALL)
+    sql = re.sub(r'--[^\n]*', ' ', sql)
+    sql = re.sub(r'\s+', ' ', sql).strip()
+    return sql.rstrip(';').strip()
+
+def extract_table_refs(sql):
+    """Список таблиц/views, на которые ссылается запрос"""
+    return sorted(set(TABLE_REF_PATTERN.findall(normalize_sql(sql))))
+
+# Время изменения (мс) и определение view для всех таблиц dataset - один запрос
+DATASET_TABLES_SQL = """
+SELECT t.table_id, t.last_modified_time, v.view_definition
+FROM `{dataset}.__TABLES__` AS t
+LEFT JOIN `{dataset}.INFORMATION_SCHEMA.VIEWS` AS v ON v.table_name = t.table_id
+"""
+
+def split_table_ref(table_ref, default_project):
+    """`dataset.table` или `project.dataset.table` → (project.dataset, table)"""
+    parts = table_ref.split('.')
+    if len(parts) == 2:
+        parts.insert(0, default_project)
+    return f"{parts[0]}.{parts[1]}", parts[2]
+
+def get_dataset_tables(client, dataset_id):
+    """
+    Таблицы dataset одним запросом
+
+    Returns:
+        dict {table: (время изменения в мс, определение view или None)}
+    """
+    rows = client.query(DATASET_TABLES_SQL.format(dataset=dataset_id)).result()
+    return {
+        row['table_id']: (str(row['last_modified_time']), row['view_definition'] or None)
+        for row in rows
+    }
+
+def get_table_versions(client, sql):
+    """
+    Время последнего изменения каждой таблицы запроса.
+
+    Для view время изменения самого view не отражает изменения данных,
+    поэтому рекурсивно учитываются таблицы из его определения. Метаданные
+    запрашиваются один раз на dataset (обычно один запрос на весь SQL).
+    Отсутствующая таблица получает пустую версию - ошибку вернет сам запрос.
+
+    Returns:
+        dict {table_ref: время изменения}
+    """
+    versions = {}
+    datasets = {}
+    pending = extract_table_refs(sql)
+
+    while pending:
+        table_ref = pending.pop()
+        if table_ref in versions:
+            continue
+
+        dataset_id, table_name = split_table_ref(table_ref, client.project)
+        if dataset_id not in datasets:
+            datasets[dataset_id] = get_dataset_tables(client, dataset_id)
+
+        modified, view_query = datasets[dataset_id].get(table_name, ('', None))
+        versions[table_ref] = modified
+        if view_query:
+            pending.extend(extract_table_refs(view_query))
+
+    return versions
+
+# ============================================================================
+# КЭШ РЕЗУЛЬТАТОВ
+# ============================================================================
+
+class QueryCache:
+    """
+    Дисковый кэш результатов запросов (Arrow/Feather) с TTL и LRU вытеснением.
+
+    Индекс записей хранится в index.json рядом с файлами результатов.
+    """
+
+    def __init__(self, cache_dir=None, ttl_seconds=None, max_bytes=None):
+        self.cache_dir = Path(cache_dir or os.getenv('QUERY_CACHE_DIR', DEFAULT_CACHE_DIR))
+
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv('QUERY_CACHE_TTL', DEFAULT_TTL_SECONDS))
+        self.ttl_seconds = ttl_seconds
+
+        if max_bytes is None:
+            max_bytes = float(os.getenv('QUERY_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = int(max_bytes)
+
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl_seconds > 0
+
+    @staticmethod
+    def make_key(sql, table_versions=None):
+        """Ключ записи: хэш нормализованного SQL и версий таблиц"""
+        payload = json.dumps(
+            {'sql': normalize_sql(sql), 'tables': table_versions or {}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Arrow-таблица из кэша или None (нет записи или истек TTL)"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            index = self._load_index()
+            entry = index.get(key)
+            path = self.cache_dir / f"{key}.arrow"
+
+            if entry is None or not path.exists():
+                self.stats['misses'] += 1
+                return None
+
+            if time.time() - entry['created'] > self.ttl_seconds:
+                self._remove(index, key)
+                self._save_index(index)
+                self.stats['misses'] += 1
+                return None
+
+            entry['last_access'] = time.time()
+            self._save_index(index)
+            self.stats['hits'] += 1
+
+        # pyarrow импортируется при первом обращении: команда cache и --help
+        # не должны платить за его загрузку
+        import pyarrow.feather as feather
+
+        return feather.read_table(path, memory_map=True)
+
+    def put(self, key, table, sql=''):
+        """Сохранение Arrow-таблицы в кэш с последующим вытеснением"""
+        if not self.enabled:
+            return
+
+        import pyarrow.feather as feather
+
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{key}.arrow"
+            tmp_path = path.with_suffix('.arrow.tmp')
+            feather.write_feather(table, tmp_path)
+            os.replace(tmp_path, path)
+
+            now = time.time()
+            index = self._load_index()
+            index[key] = {
+                'size': path.stat().st_size,
+                'created': now,
+                'last_access': now,
+                'sql': normalize_sql(sql)[:200],
+            }
+            self._evict(index)
+            self._save_index(index)
+
+    def info(self):
+        """Сводка по кэшу: число записей, размер, время самой старой записи"""
+        with self._lock:
+            index = self._load_index()
+        return {
+            'entries': len(index),
+            'bytes': sum(e['size'] for e in index.values()),
+            'oldest': min((e['created'] for e in index.values()), default=None),
+        }
+
+    def clear(self):
+        """Полная очистка кэша"""
+        with self._lock:
+            index = self._load_index()
+            for key in list(index):
+                self._remove(index, key)
+            self._save_index(index)
+
+    def _evict(self, index):
+        """Удаление устаревших записей и LRU вытеснение до лимита размера"""
+        now = time.time()
+        for key in [k for k, e in index.items() if now - e['created'] > self.ttl_seconds]:
+            self._remove(index, key)
+            self.stats['evictions'] += 1
+
+        total = sum(e['size'] for e in index.values())
+        for key in sorted(index, key=lambda k: index[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= index[key]['size']
+            self._remove(index, key)
+            self.stats['evictions'] += 1
+
+    def _remove(self, index, key):
+        index.pop(key, None)
+        try:
+            (self.cache_dir / f"{key}.arrow").unlink()
+        except FileNotFoundError:
+            pass
+
+    def _load_index(self):
+        index_path = self.cache_dir / INDEX_FILENAME
+        if not index_path.exists():
+            return {}
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Поврежденный индекс - начинаем с пустого
+            return {}
+
+    def _save_index(self, index):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        index_path = self.cache_dir / INDEX_FILENAME
+        tmp_path = index_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+
+_default_cache = None
+
+def get_default_cache():
+    """Общий экземпляр кэша с настройками из окружения"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = QueryCache()
+    return _default_cache
+
+# ============================================================================
+# ВЫПОЛНЕНИЕ ЗАПРОСОВ
+# ============================================================================
+
+def run_query(client, sql, cache=None, use_cache=True):
+    """
+    Выполнение запроса через кэш.
+
+    Args:
+        client: bigquery.Client
+        sql: текст запроса
+        cache: QueryCache (по умолчанию - общий кэш из окружения)
+        use_cache: False - выполнить запрос напрямую, без запроса версий
+            таблиц и без чтения/записи кэша (проверки, которым нужны
+            актуальные данные)
+
+    Returns:
+        pyarrow.Table с результатом
+    """
+    cache = cache or get_default_cache()
+
+    if not use_cache or not cache.enabled:
+        return client.query(sql).result().to_arrow()
+
+    key = cache.make_key(sql, get_table_versions(client, sql))
+
+    table = cache.get(key)
+    if table is not None:
+        return table
+
+    table = client.query(sql).result().to_arrow()
+    cache.put(key, table, sql)
+    return table
+
+def query_dataframe(client, sql, cache=None, use_cache=True):
+    """Выполнение запроса через кэш с результатом в виде pandas DataFrame"""
+    return run_query(client, sql, cache=cache, use_cache=use_cache).to_pandas()
+
+def split_sql_script(sql_text):
+    """
+    Разбиение SQL файла на отдельные запросы.
+
+    Returns:
+        список (заголовок, запрос) - заголовок берется из комментария перед запросом
+    """
+    statements = []
+    for chunk in sql_text.split(';'):
+        title = None
+        for line in chunk.strip().splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if not line.startswith('--'):
+                break
+            text = line.lstrip('-').strip()
+            if text.strip('=─'):
+                title = text
+        if normalize_sql(chunk):
+            statements.append((title, chunk.strip()))
+    return statements
+
+# ============================================================================
+# КОМАНДА CACHE
+# ============================================================================
+
+def run_cache(args):
+    """Команда `cache` (tech_survey.cli): состояние и очистка кэша запросов"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    cache = get_default_cache()
+    info = cache.info()
+
+    print(f"📁 Каталог кэша: {cache.cache_dir}")
+    print(f"   TTL: {cache.ttl_seconds:.0f} сек{' (кэш выключен)' if not cache.enabled else ''}")
+    print(f"   Записей: {info['entries']}, размер: {info['bytes'] / 1024 / 1024:.1f} / "
+          f"{cache.max_bytes / 1024 / 1024:.0f} MB")
+    if info['oldest'] is not None:
+        print(f"   Самая старая запись: {time.time() - info['oldest']:.0f} сек назад")
+
+    if args.clear:
+        cache.clear()
+        print(f"🗑️  Кэш очищен: удалено записей {info['entries']}")
+
+    return 0
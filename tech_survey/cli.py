@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/cli.py
+
+Единая командная строка проекта:
+    python -m tech_survey analyze | prepare | upload | verify | export | report | top | confidence | serve | pipeline | cache
+
+Модуль намеренно импортирует только стандартную библиотеку: pandas, numpy,
+pyarrow и google-cloud загружаются модулем команды уже после разбора
+аргументов. Поэтому --help, ошибки в аргументах и легкие команды (cache)
+запускаются за миллисекунды. Время импорта проверяет
+benchmarks/bench_import_time.py.
+"""
+
+import argparse
+import importlib
+import sys
+
+# ============================================================================
+# КОМАНДЫ
+# ============================================================================
+
+# Команда -> (обработчик "модуль:функция", описание)
+# Обработчик принимает argparse.Namespace и возвращает код выхода
+COMMANDS = {
+    'analyze': ('tech_survey.analyze:run', "Первичный анализ исходных данных опроса"),
+    'prepare': ('tech_survey.prepare:run', "Подготовка таблиц, куба и хранилища фактов"),
+    'upload': ('tech_survey.upload:run', "Загрузка подготовленных таблиц в BigQuery"),
+    'validate': ('tech_survey.upload:run_validate', "Проверка CSV по схемам BigQuery до загрузки"),
+    'verify': ('tech_survey.upload:run_verify', "Проверка контрольных сумм загруженных таблиц"),
+    'export': ('tech_survey.export:run', "Экспорт таблиц/views в Parquet или Arrow"),
+    'report': ('tech_survey.report:run', "Отчетные SQL запросы через кэш"),
+    'top': ('tech_survey.query_index:run_top', "Топ-N технологий сегмента по локальным индексам"),
+    'confidence': ('tech_survey.confidence:run', "Доверительные интервалы долей технологий (Вильсон, bootstrap)"),
+    'serve': ('tech_survey.serve:run', "Локальный HTTP сервис агрегатов (замена views)"),
+    'pipeline': ('tech_survey.pipeline:run', "Конвейер этапов с пропуском неизмененных"),
+    'cache': ('tech_survey.bq_query:run_cache', "Состояние и очистка кэша запросов BigQuery"),
+}
+
+def add_consolidated_argument(parser):
+    parser.add_argument('--consolidated', action='store_true',
+                        help="единая таблица technology_responses вместо 8 технологических таблиц")
+
+def add_prepare_arguments(parser):
+    add_consolidated_argument(parser)
+    parser.add_argument('--append', action='store_true',
+                        help="добавить только новые ResponseId к подготовленным данным")
+    parser.add_argument('--writers', type=int,
+                        help="потоков фоновой записи таблиц (0 - синхронно; по умолчанию 2, на одном ядре 0)")
+
+def add_upload_arguments(parser):
+    add_consolidated_argument(parser)
+    parser.add_argument('--append', action='store_true',
+                        help="дописать строки prepare --append (WRITE_APPEND) вместо перезаписи таблиц")
+    parser.add_argument('--resume', action='store_true',
+                        help="продолжить прошлый запуск: пропустить уже загруженные таблицы")
+    parser.add_argument('--max-retries', type=int,
+                        help="повторов при временных ошибках (по умолчанию 5)")
+
+def add_validate_arguments(parser):
+    add_consolidated_argument(parser)
+    parser.add_argument('tables', nargs='*',
+                        help="таблицы для проверки (по умолчанию все загружаемые CSV)")
+
+def add_verify_arguments(parser):
+    add_consolidated_argument(parser)
+    parser.add_argument('tables', nargs='*',
+                        help="таблицы для проверки (по умолчанию все подготовленные CSV)")
+
+def add_export_arguments(parser):
+    parser.add_argument('tables', nargs='+', help="имена таблиц/views dataset или полные table_id")
+    parser.add_argument('--format', choices=['arrow', 'parquet'], default='parquet',
+                        help="формат файла (по умолчанию parquet)")
+    parser.add_argument('--streams', type=int,
+                        help="максимум параллельных потоков чтения (по умолчанию 4)")
+    parser.add_argument('--output-dir',
+                        help="каталог для файлов (по умолчанию data/exports)")
+    parser.add_argument('--local', metavar='DIR',
+                        help="читать из локального каталога вместо BigQuery (офлайн режим)")
+
+def add_report_arguments(parser):
+    parser.add_argument('sql_file', nargs='?',
+                        help="SQL файл (по умолчанию bigquery/sql_queries/sql report.sql)")
+
+def add_top_arguments(parser):
+    parser.add_argument('category', help="категория: language, database, platform, webframe")
+    parser.add_argument('status', help="статус: haveworked или wanttowork")
+    parser.add_argument('-n', '--limit', type=int, default=10,
+                        help="число технологий (0 - все, по умолчанию 10)")
+    for dim in ('Country', 'Age', 'EdLevel', 'DevType', 'Employment'):
+        parser.add_argument(f"--{dim.lower()}", dest=dim, action='append', metavar='VALUE',
+                            help=f"фильтр {dim} (можно указать несколько раз)")
+    parser.add_argument('--store', help="каталог хранилища фактов (по умолчанию data/processed/factstore)")
+
+def add_confidence_arguments(parser):
+    parser.add_argument('--resamples', type=int,
+                        help="bootstrap повторов на сегмент (0 - только Вильсон, по умолчанию 1000)")
+    parser.add_argument('--level', type=float, help="уровень доверия (по умолчанию 0.95)")
+    parser.add_argument('--workers', type=int, help="потоков (по умолчанию - число CPU)")
+    parser.add_argument('--seed', type=int, default=42, help="seed bootstrap (по умолчанию 42)")
+    parser.add_argument('--store', help="каталог хранилища фактов (по умолчанию data/processed/factstore)")
+    parser.add_argument('--output-dir', help="каталог результата (по умолчанию data/processed)")
+
+def add_serve_arguments(parser):
+    parser.add_argument('--host', help="адрес (по умолчанию 127.0.0.1)")
+    parser.add_argument('--port', type=int, help="порт (по умолчанию 8765, 0 - свободный)")
+    parser.add_argument('--store', help="каталог хранилища фактов (по умолчанию data/processed/factstore)")
+    parser.add_argument('--cache-size', type=int, help="ответов в LRU кэше (по умолчанию 4096)")
+
+def add_pipeline_arguments(parser):
+    add_consolidated_argument(parser)
+    parser.add_argument('--no-upload', action='store_true',
+                        help="только локальные этапы (без BigQuery)")
+    parser.add_argument('--only', metavar='PATTERNS',
+                        help="выполнить только этапы по шаблонам через запятую, например 'cube,upload:*'")
+    parser.add_argument('--force', action='store_true',
+                        help="выполнить этапы, даже если входы не изменились")
+    parser.add_argument('--workers', type=int,
+                        help="параллельных этапов (по умолчанию 4)")
+
+def add_cache_arguments(parser):
+    parser.add_argument('--clear', action='store_true', help="удалить все записи кэша")
+
+ARGUMENTS = {
+    'prepare': add_prepare_arguments,
+    'upload': add_upload_arguments,
+    'validate': add_validate_arguments,
+    'verify': add_verify_arguments,
+    'export': add_export_arguments,
+    'report': add_report_arguments,
+    'top': add_top_arguments,
+    'confidence': add_confidence_arguments,
+    'serve': add_serve_arguments,
+    'pipeline': add_pipeline_arguments,
+    'cache': add_cache_arguments,
+}
+
+# ============================================================================
+# РАЗБОР АРГУМЕНТОВ И ЗАПУСК
+# ============================================================================
+
+def build_parser():
+    """Парсер со всеми подкомандами (без импорта модулей команд)"""
+    parser = argparse.ArgumentParser(
+        prog='tech_survey',
+        description="Tech Survey 2024: подготовка данных опроса и загрузка в BigQuery",
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    subparsers.required = True
+
+    for name, (_, description) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=description, description=description)
+        if name in ARGUMENTS:
+            ARGUMENTS[name](subparser)
+
+    return parser
+
+def parse_command(command, argv=None):
+    """Аргументы одной команды (для main() модулей и скриптов-оберток)"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    return build_parser().parse_args([command, *argv])
+
+def load_handler(command):
+    """Импорт модуля команды и получение обработчика"""
+    module_name, function_name = COMMANDS[command][0].split(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+def run_command(command, argv=None):
+    """Запуск одной команды, например run_command('prepare')"""
+    args = parse_command(command, argv)
+    return load_handler(command)(args)
+
+def main(argv=None):
+    """Точка входа: python -m tech_survey COMMAND [аргументы]"""
+    args = build_parser().parse_args(argv)
+    return load_handler(args.command)(args)
+
+# ============================================================================
+# ТОЧКА ВХОДА
+# ============================================================================
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/confidence.py
+
+Доверительные интервалы долей технологий (Percentage в views и tech_cube)
+по хранилищу фактов (tech_survey/fact_store.py): итого и по каждому
+значению Country, Age, EdLevel.
+
+Для каждой строки считаются:
+- интервал Вильсона (аналитический, корректен и при малых сегментах
+  и нулевых/полных долях);
+- bootstrap интервал (перцентильный): респонденты сегмента выбираются
+  с возвращением, все технологии всех таблиц пересчитываются по одной
+  выборке.
+
+Bootstrap без циклов по респондентам и повторам:
+- технологии респондентов - плотная матрица 0/1 X (респондент × технология
+  всех 8 таблиц, порядок как в хранилище);
+- пачка из b повторов - матрица весов W (b × респондентов сегмента):
+  сколько раз респондент попал в выборку, т.е. мультиномиальные веса
+  (b × m случайных индексов + один bincount);
+- счетчики технологий всех повторов пачки - одно умножение W @ X.
+Сегменты обрабатываются параллельно в пуле потоков (NumPy и BLAS
+освобождают GIL), у каждого сегмента свой поток случайных чисел от
+общего seed, поэтому результат не зависит от числа потоков.
+
+Результат - data/processed/tech_confidence.csv в разметке tech_cube
+(свернутые измерения - 'ALL', GroupingId как в кубе).
+
+Использование:
+    python -m tech_survey confidence
+    python -m tech_survey confidence --resamples 5000 --level 0.9 --workers 8
+    python -m tech_survey confidence --resamples 0      # только интервалы Вильсона
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from tech_survey.fact_store import FACT_STORE_DIR, load_fact_store
+from tech_survey.prepare import CUBE_ALL_VALUE, CUBE_DIMENSIONS, OUTPUT_DIR
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+OUTPUT_FILE = 'tech_confidence.csv'
+
+DEFAULT_RESAMPLES = 1000
+DEFAULT_LEVEL = 0.95
+DEFAULT_SEED = 42
+
+# Элементов матрицы весов в одной пачке повторов (~16 МБ float32):
+# для всех респондентов это ~60 повторов за одно умножение
+BATCH_ELEMENTS = 4_000_000
+
+# ============================================================================
+# ИНТЕРВАЛЫ
+# ============================================================================
+
+def z_score(level):
+    """Квантиль нормального распределения для двустороннего интервала"""
+    return NormalDist().inv_cdf(0.5 + level / 2)
+
+def wilson_interval(counts, sizes, level=DEFAULT_LEVEL):
+    """
+    Интервал Вильсона для долей counts / sizes (векторно).
+
+    Returns:
+        (нижняя граница, верхняя граница) - доли от 0 до 1;
+        для sizes == 0 - NaN
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.float64)
+    z2 = z_score(level) ** 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = counts / sizes
+        denominator = 1 + z2 / sizes
+        center = (p + z2 / (2 * sizes)) / denominator
+        half = np.sqrt(z2) / denominator * np.sqrt(p * (1 - p) / sizes + z2 / (4 * sizes ** 2))
+    # Доля всегда внутри интервала (при p = 0 или 1 ошибка округления
+    # иначе дает границу чуть выше 0 / ниже 1)
+    return np.clip(center - half, 0, p), np.clip(center + half, p, 1)
+
+def bootstrap_counts(indicator, resamples, rng, batch_elements=BATCH_ELEMENTS):
+    """
+    Счетчики технологий в bootstrap выборках одного сегмента.
+
+    Args:
+        indicator: матрица 0/1 float32 (респонденты сегмента × технологии)
+        resamples: число повторов
+        rng: np.random.Generator
+
+    Returns:
+        матрица float32 (повторы × технологии)
+    """
+    m, n_columns = indicator.shape
+    result = np.empty((resamples, n_columns), dtype=np.float32)
+    if m == 0:
+        result[:] = 0
+        return result
+
+    batch = max(1, min(resamples, batch_elements // m))
+    for start in range(0, resamples, batch):
+        b = min(batch, resamples - start)
+        # Мультиномиальные веса: b выборок по m индексов, один bincount на пачку
+        draws = rng.integers(0, m, size=(b, m))
+        draws += np.arange(b)[:, None] * m
+        weights = np.bincount(draws.ravel(), minlength=b * m).reshape(b, m).astype(np.float32)
+        np.matmul(weights, indicator, out=result[start:start + b])
+    return result
+
+def bootstrap_interval(indicator, resamples, level, rng):
+    """
+    Перцентильный bootstrap интервал долей всех столбцов indicator.
+
+    Returns:
+        (нижняя граница, верхняя граница) - доли от 0 до 1
+    """
+    m = len(indicator)
+    if m == 0:
+        nan = np.full(indicator.shape[1], np.nan)
+        return nan, nan
+    counts = bootstrap_counts(indicator, resamples, rng)
+    alpha = (1 - level) / 2
+    lower, upper = np.quantile(counts, [alpha, 1 - alpha], axis=0)
+    return lower / m, upper / m
+
+# ============================================================================
+# СЕГМЕНТЫ
+# ============================================================================
+
+def build_indicator(store):
+    """
+    Матрица 0/1 респондент × технология по всем таблицам хранилища.
+
+    Returns:
+        (матрица float32, список столбцов (category, status, technology))
+    """
+    columns = [
+        (category, status, technology)
+        for category, status in store.tables
+        for technology in store.technologies[category]
+    ]
+    indicator = np.zeros((store.n_respondents, len(columns)), dtype=np.float32)
+
+    offset = 0
+    for category, status in store.tables:
+        offsets, codes = store.table(category, status)
+        rows = store.row_respondents(category, status)
+        indicator[rows, offset + np.asarray(codes, dtype=np.int64)] = 1
+        offset += len(store.technologies[category])
+    return indicator, columns
+
+def list_segments(store, dimensions=None):
+    """
+    Сегменты: итого и каждое значение каждого измерения.
+
+    Returns:
+        список (значения измерений dict, GroupingId, номера респондентов или None)
+    """
+    dimensions = [dim for dim in (dimensions or CUBE_DIMENSIONS) if dim in store.dims]
+    all_rolled_up = (1 << len(CUBE_DIMENSIONS)) - 1
+
+    segments = [({}, all_rolled_up, None)]
+    for dim in dimensions:
+        codes, labels = store.dims[dim]
+        codes = np.asarray(codes)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.zeros(len(labels) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(labels)), out=bounds[1:])
+        grouping_id = all_rolled_up & ~(1 << (len(CUBE_DIMENSIONS) - 1 - CUBE_DIMENSIONS.index(dim)))
+
+        for code, label in enumerate(labels):
+            if bounds[code + 1] > bounds[code]:
+                segments.append(({dim: label}, grouping_id, order[bounds[code]:bounds[code + 1]]))
+    return segments
+
+# ============================================================================
+# РАСЧЕТ
+# ============================================================================
+
+def compute_confidence(store, resamples=DEFAULT_RESAMPLES, level=DEFAULT_LEVEL,
+                       seed=DEFAULT_SEED, workers=None, dimensions=None):
+    """
+    Доли технологий с интервалами Вильсона и bootstrap для всех сегментов.
+
+    Args:
+        store: FactStore
+        resamples: bootstrap повторов на сегмент (0 - только Вильсон)
+        level: уровень доверия
+        workers: потоков (по умолчанию - число CPU)
+
+    Returns:
+        DataFrame в разметке tech_cube + WilsonLower, WilsonUpper,
+        BootstrapLower, BootstrapUpper (в процентах); только технологии
+        с RespondentCount > 0
+    """
+    indicator, columns = build_indicator(store)
+    segments = list_segments(store, dimensions)
+    # Независимые потоки случайных чисел сегментов от одного seed
+    streams = np.random.SeedSequence(seed).spawn(len(segments))
+
+    def process(i):
+        _, _, rows = segments[i]
+        segment = indicator if rows is None else indicator[rows]
+        counts = segment.sum(axis=0, dtype=np.float64)
+        if resamples > 0:
+            lower, upper = bootstrap_interval(segment, resamples, level, np.random.default_rng(streams[i]))
+        else:
+            lower = upper = np.full(len(columns), np.nan)
+        return counts, len(segment), lower, upper
+
+    # Крупные сегменты первыми - равномерная загрузка потоков
+    order = sorted(range(len(segments)), key=lambda i: -(store.n_respondents if segments[i][2] is None
+                                                         else len(segments[i][2])))
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        results = dict(zip(order, pool.map(process, order)))
+
+    frames = []
+    for i, (values, grouping_id, _) in enumerate(segments):
+        counts, size, boot_lower, boot_upper = results[i]
+        present = np.flatnonzero(counts > 0)
+        wilson_lower, wilson_upper = wilson_interval(counts[present], size, level)
+
+        frame = pd.DataFrame(
+            [columns[c] for c in present], columns=['Category', 'Status', 'Technology']
+        )
+        for dim in CUBE_DIMENSIONS:
+            frame[dim] = values.get(dim, CUBE_ALL_VALUE)
+        frame['GroupingId'] = grouping_id
+        frame['RespondentCount'] = counts[present].astype(np.int64)
+        frame['SegmentRespondents'] = size
+        frame['Percentage'] = (counts[present] / size * 100).round(2)
+        frame['WilsonLower'] = (wilson_lower * 100).round(2)
+        frame['WilsonUpper'] = (wilson_upper * 100).round(2)
+        frame['BootstrapLower'] = (boot_lower[present] * 100).round(2)
+        frame['BootstrapUpper'] = (boot_upper[present] * 100).round(2)
+        frames.append(frame)
+
+    return pd.concat(frames, ignore_index=True)
+
+# ============================================================================
+# КОМАНДА CONFIDENCE
+# ============================================================================
+
+def run(args):
+    """Команда `confidence` (tech_survey.cli)"""
+    store_path = args.store or FACT_STORE_DIR
+    resamples = DEFAULT_RESAMPLES if args.resamples is None else args.resamples
+    level = args.level or DEFAULT_LEVEL
+    workers = args.workers or os.cpu_count() or 1
+    output_path = os.path.join(args.output_dir or OUTPUT_DIR, OUTPUT_FILE)
+
+    if not 0 < level < 1:
+        print(f"❌ Уровень доверия должен быть между 0 и 1: {level}")
+        return 1
+
+    print("\n" + "="*70)
+    print("📏 ДОВЕРИТЕЛЬНЫЕ ИНТЕРВАЛЫ ДОЛЕЙ ТЕХНОЛОГИЙ")
+    print("="*70)
+    print(f"Время начала: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    try:
+        store = load_fact_store(store_path)
+    except OSError as e:
+        print(f"\n❌ Хранилище фактов не найдено: {e}")
+        print("   Запустите: python -m tech_survey prepare")
+        return 1
+
+    print(f"Хранилище: {store_path} ({store.n_respondents:,} респондентов, таблиц: {len(store.tables)})")
+    print(f"Уровень доверия: {level:.0%}, bootstrap повторов: {resamples:,}, потоков: {workers}")
+
+    start = time.perf_counter()
+    try:
+        result = compute_confidence(store, resamples, level, args.seed, workers)
+    except Exception as e:
+        print(f"\n❌ Ошибка расчета: {type(e).__name__}: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    result.to_csv(output_path, index=False, encoding='utf-8')
+
+    n_segments = len(result[['GroupingId'] + CUBE_DIMENSIONS].drop_duplicates())
+    print(f"\n  Сегментов: {n_segments:,}, строк: {len(result):,}")
+    if resamples:
+        # Сегменты одного уровня делят всех респондентов: повтор уровня = повтор по всем
+        resampled = resamples * result['GroupingId'].nunique()
+        print(f"  Время: {elapsed:.2f} сек ({resampled / elapsed:,.0f} повторов по всем респондентам/сек)")
+    else:
+        print(f"  Время: {elapsed:.2f} сек")
+
+    widths = result['WilsonUpper'] - result['WilsonLower']
+    small = result['SegmentRespondents'] < 100
+    print(f"  Ширина интервала Вильсона, медиана: {widths.median():.2f} п.п.")
+    if small.any():
+        print(f"    в сегментах меньше 100 респондентов: {widths[small].median():.2f} п.п.")
+
+    print("\n" + "="*70)
+    print(f"✅ Сохранено: {output_path}")
+    print("="*70)
+    return 0
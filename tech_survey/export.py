@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/export.py
+
+Экспорт таблиц и views BigQuery в локальные Parquet / Arrow файлы
+через BigQuery Storage Read API (колоночный Arrow формат, параллельные потоки).
+
+Источник данных подключаемый:
+- StorageReadApiReader - BigQuery Storage Read API (views материализуются запросом);
+- LocalArrowReader     - локальная замена, читает файлы из каталога (CSV/Parquet/Arrow),
+                         позволяет проверить экспорт без доступа к BigQuery.
+
+Использование:
+    python -m tech_survey export top10_languages_haveworked tech_cube
+    python -m tech_survey export demographics --format arrow --streams 8
+    python -m tech_survey export language_haveworked --local data/processed
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from tech_survey.cli import parse_command
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+OUTPUT_DIR = 'data/exports'
+DEFAULT_STREAMS = 4
+# RecordBatch в очереди от потоков чтения к записи (backpressure: чтение
+# ждет записи, в памяти не больше MAX_PENDING_BATCHES + потоков batch)
+MAX_PENDING_BATCHES = 8
+EXPORT_FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+# ============================================================================
+# ИСТОЧНИКИ ДАННЫХ
+# ============================================================================
+
+class StorageReadApiReader:
+    """
+    Чтение таблиц через BigQuery Storage Read API в формате Arrow.
+
+    Views не читаются Storage API напрямую, поэтому сначала выполняется
+    SELECT * и читается временная таблица с результатом запроса.
+    """
+
+    def __init__(self, client, read_client=None):
+        from google.cloud import bigquery_storage
+
+        self.client = client
+        self.read_client = read_client or bigquery_storage.BigQueryReadClient()
+        self._sessions = {}
+
+    def resolve_source(self, table_id):
+        """Таблица, из которой можно читать (для view - результат запроса)"""
+        table = self.client.get_table(table_id)
+        if table.table_type in ('VIEW', 'MATERIALIZED_VIEW'):
+            job = self.client.query(f"SELECT * FROM `{table_id}`")
+            job.result()
+            table = self.client.get_table(job.destination)
+        return table
+
+    def open_streams(self, table_id, max_streams):
+        """
+        Создание read session.
+
+        Returns:
+            (pyarrow.Schema, список имен потоков)
+        """
+        from google.cloud.bigquery_storage import types
+
+        table = self.resolve_source(table_id)
+        requested_session = types.ReadSession(
+            table=f"projects/{table.project}/datasets/{table.dataset_id}/tables/{table.table_id}",
+            data_format=types.DataFormat.ARROW,
+        )
+        session = self.read_client.create_read_session(
+            parent=f"projects/{self.client.project}",
+            read_session=requested_session,
+            max_stream_count=max_streams,
+        )
+
+        schema = pa.ipc.read_schema(pa.py_buffer(session.arrow_schema.serialized_schema))
+        streams = [stream.name for stream in session.streams]
+        for stream_name in streams:
+            self._sessions[stream_name] = session
+        return schema, streams
+
+    def read_stream(self, stream_name):
+        """Итератор Arrow RecordBatch одного потока"""
+        session = self._sessions[stream_name]
+        rows = self.read_client.read_rows(stream_name).rows(session)
+        for page in rows.pages:
+            yield page.to_arrow()
+
+class LocalArrowReader:
+    """
+    Локальная замена Storage Read API.
+
+    Таблица `<project>.<dataset>.<name>` читается из файла <name>.parquet,
+    <name>.arrow или <name>.csv в каталоге data_dir и делится на потоки
+    по диапазонам строк.
+    """
+
+    def __init__(self, data_dir, batch_size=65536):
+        self.data_dir = Path(data_dir)
+        self.batch_size = batch_size
+        self._streams = {}
+
+    def _load_table(self, name):
+        for suffix in ('.parquet', '.arrow', '.csv'):
+            path = self.data_dir / f"{name}{suffix}"
+            if not path.exists():
+                continue
+            if suffix == '.parquet':
+                return pq.read_table(path)
+            if suffix == '.arrow':
+                import pyarrow.feather as feather
+                return feather.read_table(path)
+            import pyarrow.csv as pa_csv
+            return pa_csv.read_csv(path)
+        raise FileNotFoundError(f"Таблица '{name}' не найдена в {self.data_dir}")
+
+    def open_streams(self, table_id, max_streams):
+        name = table_id.split('.')[-1]
+        table = self._load_table(name)
+
+        stream_count = max(1, min(max_streams, table.num_rows))
+        chunk = -(-table.num_rows // stream_count) if table.num_rows else 0
+
+        streams = []
+        for i in range(stream_count):
+            stream_name = f"local/{name}/streams/{i}"
+            self._streams[stream_name] = table.slice(i * chunk, chunk)
+            streams.append(stream_name)
+        return table.schema, streams
+
+    def read_stream(self, stream_name):
+        yield from self._streams.pop(stream_name).to_batches(max_chunksize=self.batch_size)
+
+# ============================================================================
+# ЭКСПОРТ
+# ============================================================================
+
+def _open_writer(output_path, schema, fmt):
+    if fmt == 'parquet':
+        return pq.ParquetWriter(output_path, schema, compression='zstd')
+    return pa.ipc.new_file(output_path, schema)
+
+def _put(batches, item, stop):
+    """Постановка в очередь с ожиданием места; False - запись остановлена"""
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _write_streams(reader, streams, schema, writer, max_pending=MAX_PENDING_BATCHES):
+    """
+    Чтение потоков в пуле и запись RecordBatch по мере поступления
+
+    Потоки чтения передают batch через ограниченную очередь единственному
+    писателю (вызывающий поток). Ошибка чтения поднимается здесь; при
+    ошибке чтения или записи потоки чтения останавливаются.
+
+    Returns:
+        число записанных строк
+    """
+    batches = queue.Queue(maxsize=max(max_pending, 1))
+    stop = threading.Event()
+
+    def read_stream(stream_name):
+        try:
+            for batch in reader.read_stream(stream_name):
+                if batch.num_rows and not _put(batches, ('batch', batch), stop):
+                    return
+            _put(batches, ('done', None), stop)
+        except Exception as e:
+            _put(batches, ('error', e), stop)
+
+    rows = 0
+    with ThreadPoolExecutor(max_workers=len(streams)) as pool:
+        try:
+            for stream_name in streams:
+                pool.submit(read_stream, stream_name)
+
+            remaining = len(streams)
+            while remaining:
+                kind, value = batches.get()
+                if kind == 'error':
+                    raise value
+                if kind == 'done':
+                    remaining -= 1
+                    continue
+                writer.write_table(pa.Table.from_batches([value], schema=schema))
+                rows += value.num_rows
+        finally:
+            stop.set()
+    return rows
+
+def export_table(reader, table_id, output_path, fmt='parquet', max_streams=DEFAULT_STREAMS):
+    """
+    Экспорт таблицы в файл с параллельным чтением потоков.
+
+    Потоки читаются в пуле потоков, запись выполняется в вызывающем потоке
+    по мере поступления batch (порядок строк между потоками не сохраняется).
+    Файл пишется во временный <output_path>.tmp и заменяет прежний только
+    после успешной записи; при ошибке временный файл удаляется.
+
+    Returns:
+        dict со статистикой: rows, streams, bytes, seconds
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt} (доступно: {', '.join(EXPORT_FORMATS)})")
+
+    start_time = time.time()
+    schema, streams = reader.open_streams(table_id, max_streams)
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    rows = 0
+
+    try:
+        writer = _open_writer(tmp_path, schema, fmt)
+        try:
+            if streams:
+                rows = _write_streams(reader, streams, schema, writer)
+        finally:
+            writer.close()
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, output_path)
+
+    return {
+        'rows': rows,
+        'streams': len(streams),
+        'bytes': os.path.getsize(output_path),
+        'seconds': time.time() - start_time,
+    }
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def create_reader(args):
+    """Источник данных по аргументам командной строки"""
+    if args.local:
+        return LocalArrowReader(args.local), 'local', 'local'
+
+    from dotenv import load_dotenv
+    from google.cloud import bigquery
+
+    load_dotenv()
+    project_id = os.getenv('GCP_PROJECT_ID')
+    dataset_id = os.getenv('BIGQUERY_DATASET', 'tech_survey_data')
+    client = bigquery.Client(project=project_id)
+    return StorageReadApiReader(client), client.project, dataset_id
+
+def run(args):
+    """Команда `export` (tech_survey.cli)"""
+    max_streams = args.streams or DEFAULT_STREAMS
+    output_dir = args.output_dir or OUTPUT_DIR
+
+    print("\n" + "="*70)
+    print("📦 ЭКСПОРТ ДАННЫХ ИЗ BIGQUERY")
+    print("="*70)
+    print(f"Время начала: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    try:
+        reader, project_id, dataset_id = create_reader(args)
+        print(f"Источник: {'локальный каталог ' + args.local if args.local else 'Storage Read API'}")
+        print(f"Формат: {args.format}, потоков: {max_streams}")
+
+        for name in args.tables:
+            table_id = name if name.count('.') == 2 else f"{project_id}.{dataset_id}.{name}"
+            output_path = os.path.join(
+                output_dir, f"{table_id.split('.')[-1]}{EXPORT_FORMATS[args.format]}"
+            )
+
+            print("\n" + "─"*70)
+            print(f"📤 {table_id}")
+            print("─"*70)
+
+            stats = export_table(reader, table_id, output_path, args.format, max_streams)
+            rate = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0
+
+            print(f"  ✓ Сохранено: {output_path}")
+            print(f"    Строк: {stats['rows']:,} (потоков: {stats['streams']})")
+            print(f"    Размер: {stats['bytes'] / 1024:.1f} KB")
+            print(f"    Время: {stats['seconds']:.2f} сек ({rate:,.0f} строк/сек)")
+
+    except Exception as e:
+        print(f"\n❌ Ошибка экспорта: {type(e).__name__}: {e}")
+        return 1
+
+    print("\n" + "="*70)
+    print(f"✅ ЭКСПОРТ ЗАВЕРШЕН: {len(args.tables)} таблиц")
+    print("="*70)
+
+    return 0
+
+def main(argv=None):
+    """Основная функция"""
+    return run(parse_command('export', argv))
+
+# ============================================================================
+# ТОЧКА ВХОДА
+# ============================================================================
+
+if __name__ == "__main__":
+    exit(main())
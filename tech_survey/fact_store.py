@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/fact_store.py
+
+Компактное хранилище фактов "респондент → технологии" в формате CSR
+(memory-mapped NumPy файлы), создается tech_survey/prepare.py.
+
+Структура каталога data/processed/factstore/:
+    manifest.json                      - описание хранилища
+    respondents.npy                    - отсортированные ResponseId (ось всех массивов)
+    dims/<Dim>.codes.npy               - код значения демографии для каждого респондента
+    dims/<Dim>.labels.json             - словарь значений (код = индекс)
+    multi/<Dim>.bits.npy               - столбцы с множественным выбором (DevType, Employment):
+                                         битовая маска значений респондента, uint8
+                                         (респондентов × ceil(значений / 8)), бит кода c -
+                                         bits[i, c // 8] >> (c % 8) & 1
+    multi/<Dim>.labels.json            - словарь значений (код = номер бита, как ValueId
+                                         bridge таблицы)
+    <category>/technologies.json       - словарь технологий категории (общий для статусов)
+    <category>/<status>.offsets.npy    - CSR offsets (длина = респондентов + 1)
+    <category>/<status>.codes.npy      - коды технологий, отсортированы внутри респондента
+
+Технологии респондента i: codes[offsets[i]:offsets[i + 1]].
+Загрузка не копирует данные (np.load(..., mmap_mode='r')).
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+FACT_STORE_DIR = 'data/processed/factstore'
+FACT_STORE_VERSION = 1
+
+# Демографические измерения, сохраняемые как коды
+FACT_STORE_DIMENSIONS = ['Country', 'Age', 'EdLevel']
+
+CODE_DTYPE = np.int16
+OFFSET_DTYPE = np.int32
+
+# ============================================================================
+# ЗАПИСЬ
+# ============================================================================
+
+def _save_json(data, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def encode_values(values):
+    """
+    Кодирование значений в целые числа.
+
+    Returns:
+        (коды int16, список значений по кодам в алфавитном порядке)
+    """
+    labels = sorted(set(values))
+    lookup = {label: code for code, label in enumerate(labels)}
+    codes = np.fromiter((lookup[v] for v in values), dtype=CODE_DTYPE, count=len(values))
+    return codes, labels
+
+def build_csr(respondents, response_ids, tech_codes):
+    """
+    CSR представление пар (респондент, технология).
+
+    Args:
+        respondents: отсортированный массив ResponseId (ось)
+        response_ids: ResponseId каждой пары
+        tech_codes: код технологии каждой пары
+
+    Returns:
+        (offsets, codes, число пар без респондента в оси)
+    """
+    response_ids = np.asarray(response_ids, dtype=np.int64)
+    tech_codes = np.asarray(tech_codes, dtype=CODE_DTYPE)
+
+    if len(respondents):
+        positions = np.minimum(np.searchsorted(respondents, response_ids), len(respondents) - 1)
+        valid = respondents[positions] == response_ids
+    else:
+        positions = np.zeros(len(response_ids), dtype=np.int64)
+        valid = np.zeros(len(response_ids), dtype=bool)
+
+    positions = positions[valid]
+    tech_codes = tech_codes[valid]
+
+    order = np.lexsort((tech_codes, positions))
+    counts = np.bincount(positions, minlength=len(respondents))
+    offsets = np.zeros(len(respondents) + 1, dtype=OFFSET_DTYPE)
+    np.cumsum(counts, out=offsets[1:])
+
+    return offsets, tech_codes[order], int((~valid).sum())
+
+def build_bitset(respondents, response_ids, value_codes, n_values):
+    """
+    Битовые маски значений с множественным выбором по оси респондентов.
+
+    Returns:
+        uint8 массив (респондентов × ceil(n_values / 8)), биты little-endian
+    """
+    response_ids = np.asarray(response_ids, dtype=np.int64)
+    value_codes = np.asarray(value_codes, dtype=np.int64)
+
+    flags = np.zeros((len(respondents), max(n_values, 1)), dtype=bool)
+    if len(respondents) and len(response_ids):
+        positions = np.minimum(np.searchsorted(respondents, response_ids), len(respondents) - 1)
+        valid = respondents[positions] == response_ids
+        flags[positions[valid], value_codes[valid]] = True
+
+    return np.packbits(flags, axis=1, bitorder='little')
+
+def bitset_pairs(bits, n_values):
+    """Обратное к build_bitset: (позиции респондентов, коды значений) всех установленных битов"""
+    flags = np.unpackbits(np.asarray(bits), axis=1, count=n_values, bitorder='little')
+    return np.nonzero(flags)
+
+def _write_store(output_dir, respondents, dims, technologies, tables, multiselect=None):
+    """
+    Запись массивов хранилища и manifest.
+
+    Все файлы сначала пишутся во временные (*.tmp) и заменяют прежние
+    (os.replace) только после того, как записаны все: ошибка при записи
+    оставляет прежнее хранилище целым. respondents.npy и manifest.json
+    заменяются последними - по manifest определяется число респондентов
+    хранилища (incremental), FactStore проверяет длины массивов по нему.
+    Уже открытые через memory-mapping массивы прежней версии остаются читаемыми.
+
+    Args:
+        dims: dict {dim: (коды по оси респондентов, словарь значений)}
+        technologies: dict {tech_type: словарь технологий}
+        tables: dict {(tech_type, status): (offsets, codes, dropped)}
+        multiselect: dict {dim: (битовые маски по оси респондентов, словарь значений)}
+    """
+    multiselect = multiselect or {}
+    output_dir = Path(output_dir)
+    (output_dir / 'dims').mkdir(parents=True, exist_ok=True)
+    written = []
+
+    def temp_path(path):
+        tmp_path = path.with_name(path.name + '.tmp')
+        written.append((tmp_path, path))
+        return tmp_path
+
+    def save(array, path):
+        with open(temp_path(path), 'wb') as f:
+            np.save(f, array)
+
+    def save_json(data, path):
+        _save_json(data, temp_path(path))
+
+    manifest = {
+        'version': FACT_STORE_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'respondents': len(respondents),
+        'dimensions': {dim: len(labels) for dim, (_, labels) in dims.items()},
+        'multiselect': {dim: len(labels) for dim, (_, labels) in multiselect.items()},
+        'technologies': {tech_type: len(labels) for tech_type, labels in technologies.items()},
+        'tables': {
+            f"{tech_type}/{status}": {'pairs': len(codes), 'dropped': dropped}
+            for (tech_type, status), (_, codes, dropped) in tables.items()
+        },
+    }
+
+    try:
+        for dim, (codes, labels) in dims.items():
+            save(codes, output_dir / 'dims' / f"{dim}.codes.npy")
+            save_json(labels, output_dir / 'dims' / f"{dim}.labels.json")
+
+        if multiselect:
+            (output_dir / 'multi').mkdir(parents=True, exist_ok=True)
+        for dim, (bits, labels) in multiselect.items():
+            save(bits, output_dir / 'multi' / f"{dim}.bits.npy")
+            save_json(labels, output_dir / 'multi' / f"{dim}.labels.json")
+
+        for tech_type, labels in technologies.items():
+            (output_dir / tech_type).mkdir(parents=True, exist_ok=True)
+            save_json(labels, output_dir / tech_type / 'technologies.json')
+
+        for (tech_type, status), (offsets, codes, _) in tables.items():
+            save(offsets, output_dir / tech_type / f"{status}.offsets.npy")
+            save(codes, output_dir / tech_type / f"{status}.codes.npy")
+
+        save(respondents, output_dir / 'respondents.npy')
+        save_json(manifest, output_dir / 'manifest.json')
+    except BaseException:
+        for tmp_path, _ in written:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        raise
+
+    for tmp_path, path in written:
+        os.replace(tmp_path, path)
+
+    return manifest
+
+def write_fact_store(demo_df, tech_tables, output_dir=FACT_STORE_DIR, multiselect=None):
+    """
+    Запись хранилища фактов.
+
+    Args:
+        demo_df: таблица demographics (ось респондентов)
+        tech_tables: dict {(tech_type, status): unpivot DataFrame}
+        multiselect: dict {dim: (bridge DataFrame (ResponseId, ValueId), словарь значений)}
+
+    Returns:
+        dict manifest
+    """
+    respondents = np.sort(demo_df['ResponseId'].to_numpy(dtype=np.int64))
+
+    # Демография в порядке оси респондентов
+    demo_sorted = demo_df.set_index('ResponseId').loc[respondents]
+    dims = {
+        dim: encode_values(demo_sorted[dim].astype(str).tolist())
+        for dim in FACT_STORE_DIMENSIONS
+        if dim in demo_sorted.columns
+    }
+
+    # Общий словарь технологий для всех статусов категории
+    vocabularies = {}
+    for (tech_type, status), tech_df in tech_tables.items():
+        if tech_df is not None:
+            vocabularies.setdefault(tech_type, set()).update(tech_df['Technology'].unique())
+    technologies = {tech_type: sorted(vocabulary) for tech_type, vocabulary in vocabularies.items()}
+
+    tables = {}
+    for (tech_type, status), tech_df in tech_tables.items():
+        if tech_df is None:
+            continue
+        lookup = {label: code for code, label in enumerate(technologies[tech_type])}
+        tables[(tech_type, status)] = build_csr(
+            respondents, tech_df['ResponseId'].to_numpy(), tech_df['Technology'].map(lookup).to_numpy()
+        )
+
+    multi = {
+        dim: (build_bitset(respondents, bridge_df['ResponseId'], bridge_df['ValueId'], len(labels)), list(labels))
+        for dim, (bridge_df, labels) in (multiselect or {}).items()
+    }
+
+    return _write_store(output_dir, respondents, dims, technologies, tables, multi)
+
+def _extend_labels(old_labels, new_values):
+    """
+    Объединенный словарь (в алфавитном порядке) и перекодировка старых кодов.
+
+    Returns:
+        (словарь, dict значение → код, массив новый код по старому коду)
+    """
+    labels = sorted(set(old_labels).union(new_values))
+    lookup = {label: code for code, label in enumerate(labels)}
+    remap = np.array([lookup[label] for label in old_labels], dtype=CODE_DTYPE)
+    return labels, lookup, remap
+
+def append_fact_store(demo_df, tech_tables, output_dir=FACT_STORE_DIR, multiselect=None):
+    """
+    Добавление новых респондентов в существующее хранилище.
+
+    Старые пары берутся из массивов самого хранилища (CSV не перечитываются),
+    словари демографии и технологий дополняются новыми значениями, CSR
+    пересобирается по объединенной оси.
+
+    Args:
+        demo_df: demographics только новых респондентов
+        tech_tables: dict {(tech_type, status): unpivot DataFrame новых респондентов}
+        multiselect: dict {dim: (bridge DataFrame новых респондентов, словарь значений)};
+            словарь дополняет прежний в конце (create_multiselect_tables), поэтому
+            биты прежних респондентов не перекодируются
+
+    Returns:
+        dict manifest
+    """
+    store = load_fact_store(output_dir)
+    multiselect = multiselect or {}
+    old_respondents = np.array(store.respondents)
+    new_respondents = demo_df['ResponseId'].to_numpy(dtype=np.int64)
+
+    repeated = np.intersect1d(old_respondents, new_respondents)
+    if len(repeated):
+        raise ValueError(f"ResponseId уже есть в хранилище: {repeated[:5].tolist()}")
+
+    respondents = np.sort(np.concatenate([old_respondents, new_respondents]))
+    old_positions = np.searchsorted(respondents, old_respondents)
+    new_positions = np.searchsorted(respondents, new_respondents)
+
+    dims = {}
+    for dim, (old_codes, old_labels) in store.dims.items():
+        values = demo_df[dim].astype(str)
+        labels, lookup, remap = _extend_labels(old_labels, values.unique())
+        codes = np.empty(len(respondents), dtype=CODE_DTYPE)
+        codes[old_positions] = remap[np.asarray(old_codes)]
+        codes[new_positions] = values.map(lookup).to_numpy(dtype=CODE_DTYPE)
+        dims[dim] = (codes, labels)
+
+    new_values = {}
+    for (tech_type, status), tech_df in tech_tables.items():
+        if tech_df is not None:
+            new_values.setdefault(tech_type, set()).update(tech_df['Technology'].unique())
+
+    technologies, lookups, remaps = {}, {}, {}
+    for tech_type in set(store.technologies) | set(new_values):
+        technologies[tech_type], lookups[tech_type], remaps[tech_type] = _extend_labels(
+            store.technologies.get(tech_type, []), new_values.get(tech_type, ())
+        )
+
+    tables = {}
+    keys = list(store.tables) + [
+        key for key, tech_df in tech_tables.items() if tech_df is not None and key not in store.tables
+    ]
+    for tech_type, status in keys:
+        response_ids, tech_codes = [], []
+        if (tech_type, status) in store.tables:
+            offsets, codes = store.table(tech_type, status)
+            response_ids.append(np.repeat(old_respondents, np.diff(offsets)))
+            tech_codes.append(remaps[tech_type][np.asarray(codes)])
+
+        tech_df = tech_tables.get((tech_type, status))
+        if tech_df is not None:
+            response_ids.append(tech_df['ResponseId'].to_numpy(dtype=np.int64))
+            tech_codes.append(tech_df['Technology'].map(lookups[tech_type]).to_numpy(dtype=CODE_DTYPE))
+
+        tables[(tech_type, status)] = build_csr(
+            respondents, np.concatenate(response_ids), np.concatenate(tech_codes)
+        )
+
+    multi = {}
+    for dim in list(store.multiselect) + [dim for dim in multiselect if dim not in store.multiselect]:
+        old_labels = store.multiselect[dim][1] if dim in store.multiselect else []
+        bridge_df, labels = multiselect.get(dim, (None, old_labels))
+        if list(labels[:len(old_labels)]) != list(old_labels):
+            raise ValueError(f"Словарь {dim} не продолжает словарь хранилища")
+
+        response_ids, value_codes = [], []
+        if dim in store.multiselect:
+            positions, codes = bitset_pairs(store.multiselect[dim][0], len(old_labels))
+            response_ids.append(old_respondents[positions])
+            value_codes.append(codes)
+        if bridge_df is not None:
+            response_ids.append(bridge_df['ResponseId'].to_numpy(dtype=np.int64))
+            value_codes.append(bridge_df['ValueId'].to_numpy(dtype=np.int64))
+
+        multi[dim] = (
+            build_bitset(respondents, np.concatenate(response_ids), np.concatenate(value_codes), len(labels)),
+            list(labels),
+        )
+
+    return _write_store(output_dir, respondents, dims, technologies, tables, multi)
+
+# ============================================================================
+# ЧТЕНИЕ
+# ============================================================================
+
+class FactStore:
+    """
+    Хранилище фактов, открытое через memory-mapping.
+
+    Массивы читаются с диска по мере обращения, копии в памяти не создаются.
+    """
+
+    def __init__(self, path=FACT_STORE_DIR):
+        self.path = Path(path)
+
+        with open(self.path / 'manifest.json', 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+        self.respondents = self._load('respondents.npy')
+        self.dims = {
+            dim: (self._load(f"dims/{dim}.codes.npy"), self._load_json(f"dims/{dim}.labels.json"))
+            for dim in self.manifest['dimensions']
+        }
+        self.multiselect = {
+            dim: (self._load(f"multi/{dim}.bits.npy"), self._load_json(f"multi/{dim}.labels.json"))
+            for dim in self.manifest.get('multiselect', {})
+        }
+        self.technologies = {
+            tech_type: self._load_json(f"{tech_type}/technologies.json")
+            for tech_type in self.manifest['technologies']
+        }
+        self._row_respondents = {}
+        self._check_lengths()
+
+    def _check_lengths(self):
+        """Длины массивов по оси респондентов совпадают с manifest (прерванная запись)"""
+        n = self.manifest['respondents']
+        lengths = {'respondents.npy': len(self.respondents)}
+        for dim, (codes, _) in self.dims.items():
+            lengths[f"dims/{dim}.codes.npy"] = len(codes)
+        for dim, (bits, _) in self.multiselect.items():
+            lengths[f"multi/{dim}.bits.npy"] = len(bits)
+        for category, status in self.tables:
+            offsets, _ = self.table(category, status)
+            lengths[f"{category}/{status}.offsets.npy"] = len(offsets) - 1
+
+        broken = {name: length for name, length in lengths.items() if length != n}
+        if broken:
+            raise ValueError(
+                f"Хранилище фактов {self.path} повреждено: в manifest {n:,} респондентов, "
+                f"в массивах {broken} - нужна полная подготовка: python -m tech_survey prepare"
+            )
+
+    def _load(self, relative_path):
+        return np.load(self.path / relative_path, mmap_mode='r')
+
+    def _load_json(self, relative_path):
+        with open(self.path / relative_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @property
+    def tables(self):
+        """Список (category, status)"""
+        return [tuple(name.split('/')) for name in self.manifest['tables']]
+
+    @property
+    def n_respondents(self):
+        return len(self.respondents)
+
+    def table(self, category, status):
+        """(offsets, codes) таблицы"""
+        return (
+            self._load(f"{category}/{status}.offsets.npy"),
+            self._load(f"{category}/{status}.codes.npy"),
+        )
+
+    def dimension_values(self, dim):
+        """Значения демографии по оси респондентов (массив строк)"""
+        codes, labels = self.dims[dim]
+        return np.asarray(labels, dtype=object)[np.asarray(codes)]
+
+    def respondent_technologies(self, response_id, category, status):
+        """Технологии одного респондента"""
+        i = int(np.searchsorted(self.respondents, response_id))
+        if i >= len(self.respondents) or self.respondents[i] != response_id:
+            return []
+        offsets, codes = self.table(category, status)
+        labels = self.technologies[category]
+        return [labels[c] for c in codes[offsets[i]:offsets[i + 1]]]
+
+    def row_respondents(self, category, status):
+        """Индекс респондента для каждой пары (разворот offsets, кэшируется)"""
+        key = (category, status)
+        if key not in self._row_respondents:
+            offsets, _ = self.table(category, status)
+            self._row_respondents[key] = np.repeat(
+                np.arange(self.n_respondents, dtype=np.int32), np.diff(offsets)
+            )
+        return self._row_respondents[key]
+
+    def technology_counts(self, category, status, respondent_mask=None):
+        """
+        Число респондентов по каждой технологии.
+
+        Args:
+            respondent_mask: bool массив по оси респондентов (None - все)
+
+        Returns:
+            массив счетчиков, индекс = код технологии
+        """
+        _, codes = self.table(category, status)
+        n_technologies = len(self.technologies[category])
+        if respondent_mask is None:
+            return np.bincount(codes, minlength=n_technologies)
+        selected = np.asarray(respondent_mask)[self.row_respondents(category, status)]
+        return np.bincount(codes[selected], minlength=n_technologies)
+
+def load_fact_store(path=FACT_STORE_DIR):
+    """Открытие хранилища фактов"""
+    return FactStore(path)
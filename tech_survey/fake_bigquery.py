@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/fake_bigquery.py
+
+Замена bigquery.Client в памяти процесса для запуска загрузки без
+credentials: тесты сценариев, замеры и benchmarks/bench_upload.py.
+
+Реализована та часть API, которую используют tech_survey/upload.py,
+tech_survey/bq_query.py, scripts/create_dataset.py и
+test_bigquery_connection.py:
+    create_dataset, get_dataset, delete_table, create_table,
+    load_table_from_file, get_job, get_table, query
+
+Поведение приближено к BigQuery:
+- load job сопоставляет столбцы CSV со схемой по позиции, учитывает
+  write_disposition (WRITE_TRUNCATE / WRITE_APPEND / WRITE_EMPTY) и при
+  check_types=True отклоняет значения не того типа (BadRequest, правила
+  tech_survey/schema_validation.py);
+- ошибка load job возникает в job.result(), как у настоящего клиента;
+  job_id уникален (повтор - Conflict), get_job возвращает созданный job;
+- сбой опроса job (job_poll) возникает в job.result() уже после того,
+  как job выполнен: состояние job не меняется, данные загружены;
+- query понимает SELECT констант (проверка подключения), запрос
+  контрольных сумм table_checksums.build_checksum_query и запрос версий
+  таблиц bq_query.DATASET_TABLES_SQL, остальное - BadRequest. Запрос
+  контрольных сумм вычисляется по своему тексту (ключевые столбцы,
+  разделитель, позиции SUBSTR), а не через table_checksums.compute_checksum:
+  ошибка в SQL дает расхождение с локальной суммой, как в BigQuery.
+
+Задержки задаются профилем (LATENCY_PROFILES): время вызова API, load job,
+запроса и пропускная способность отправки файла, с разбросом jitter.
+Сбои: failure_rate - вероятность временной ошибки (503) на каждый вызов,
+fail_next() - ошибка для конкретного следующего вызова метода (например,
+fail_next('job_poll') - ошибка после того, как load job записал строки).
+
+Использование:
+    client = FakeBigQueryClient(latency='wan', failure_rate=0.05, seed=1)
+    client.create_dataset('tech_survey_data')
+    results = upload.run_upload(client, 'tech_survey_data')
+    print(client.stats)
+"""
+
+import hashlib
+import io
+import re
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from google.api_core import exceptions as api_exceptions
+
+from tech_survey.schema_validation import format_issue, validate_dataframe
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+DEFAULT_PROJECT = 'fake-project'
+
+# Профили задержек: сек на вызов API / load job / запрос, МБ/сек отправки
+# файла (0 - без ограничения), относительный разброс
+LATENCY_PROFILES = {
+    'none': {'call': 0.0, 'load': 0.0, 'query': 0.0, 'upload_mbps': 0, 'jitter': 0.0},
+    'lan': {'call': 0.02, 'load': 0.3, 'query': 0.2, 'upload_mbps': 100, 'jitter': 0.2},
+    'wan': {'call': 0.15, 'load': 1.5, 'query': 0.8, 'upload_mbps': 10, 'jitter': 0.3},
+}
+
+# Вызовы, к которым применяется failure_rate (load_job / query_job - ошибка
+# выполнения в job.result(), job_poll - сбой опроса уже выполненного job)
+FAILING_METHODS = (
+    'get_dataset', 'delete_table', 'create_table', 'load_table_from_file', 'load_job',
+    'job_poll', 'get_job', 'get_table', 'query', 'query_job',
+)
+
+INTEGER_TYPES = {'INTEGER', 'INT64'}
+
+# Часть запроса table_checksums.build_checksum_query для одной таблицы
+CHECKSUM_SELECT = re.compile(
+    r"SELECT '(?P<table_name>[\w\-]+)' AS table_name,\s*"
+    r"COUNT\(\*\) AS row_count,\s*"
+    r"COALESCE\(SUM\(CAST\(CONCAT\('0x', SUBSTR\(h, (?P<sum_start>\d+), (?P<sum_length>\d+)\)\) AS INT64\)\), 0\) "
+    r"AS hash_sum,\s*"
+    r"COALESCE\(BIT_XOR\(CAST\(CONCAT\('0x', SUBSTR\(h, (?P<xor_start>\d+), (?P<xor_length>\d+)\)\) AS INT64\)\), 0\) "
+    r"AS hash_xor\s*"
+    r"FROM \(SELECT TO_HEX\(MD5\((?P<key>.*?)\)\) AS h FROM `(?P<table>[\w\-.]+)`\)\s*",
+    flags=re.DOTALL,
+)
+# Ключевой столбец в выражении ключа строки
+CHECKSUM_KEY_COLUMN = re.compile(r"COALESCE\(CAST\((\w+) AS STRING\), ''\)")
+
+# ============================================================================
+# ОБЪЕКТЫ РЕЗУЛЬТАТОВ
+# ============================================================================
+
+class FakeDataset:
+    def __init__(self, dataset_id, location='US'):
+        self.project, self.dataset_id = dataset_id.split('.')
+        self.full_dataset_id = dataset_id
+        self.location = location
+        self.created = datetime.now(timezone.utc)
+
+class FakeTable:
+    """Снимок таблицы (как bigquery.Table после get_table)"""
+
+    def __init__(self, table_id, schema, clustering_fields, frame, created, modified):
+        self.project, self.dataset_id, self.table_id = table_id.split('.')
+        self.full_table_id = table_id
+        self.schema = list(schema or [])
+        self.clustering_fields = clustering_fields
+        self.num_rows = 0 if frame is None else len(frame)
+        self.created = created
+        self.modified = modified
+        self.view_query = None
+
+class FakeRowIterator:
+    def __init__(self, df):
+        self._df = df
+        self.total_rows = len(df)
+
+    def to_arrow(self):
+        return pa.Table.from_pandas(self._df, preserve_index=False)
+
+    def to_dataframe(self):
+        return self._df.copy()
+
+    def __iter__(self):
+        return iter(self._df.to_dict('records'))
+
+class FakeJob:
+    """
+    Load или query job: работа выполняется в result() (там же возникают
+    задержка и ошибки), повторный result() возвращает тот же результат
+    или снова поднимает ту же ошибку. poll() вызывается после выполнения
+    при каждом result() - сбой опроса, не меняющий состояние job
+    """
+
+    def __init__(self, run, job_type, job_id=None, poll=None):
+        self.job_type = job_type
+        self.job_id = job_id
+        self.errors = None
+        self.error_result = None
+        self.state = 'RUNNING'
+        self._run = run
+        self._poll = poll
+        self._result = None
+        self._exception = None
+
+    def result(self, timeout=None):
+        if self.state != 'DONE':
+            try:
+                self._result = self._run()
+            except Exception as e:
+                self._exception = e
+                self.error_result = {'reason': type(e).__name__, 'message': str(e)}
+                if isinstance(e, api_exceptions.GoogleAPICallError):
+                    self.errors = list(getattr(e, 'errors', None) or [])
+            finally:
+                self.state = 'DONE'
+        if self._poll is not None:
+            self._poll()
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+# ============================================================================
+# КЛИЕНТ
+# ============================================================================
+
+def _table_id(table, project):
+    """Полный table_id из строки или bigquery.Table / FakeTable"""
+    if not isinstance(table, str):
+        table = f"{table.project}.{table.dataset_id}.{table.table_id}"
+    return table if table.count('.') == 2 else f"{project}.{table}"
+
+def _dataset_id(dataset, project):
+    if not isinstance(dataset, str):
+        dataset = f"{dataset.project}.{dataset.dataset_id}"
+    return dataset if '.' in dataset else f"{project}.{dataset}"
+
+class FakeBigQueryClient:
+    """
+    bigquery.Client в памяти: datasets и таблицы (pandas DataFrame) живут
+    в объекте клиента. Потокобезопасен; задержки выполняются вне блокировки,
+    поэтому параллельные вызовы перекрываются, как у настоящего API.
+
+    Args:
+        project: ID проекта
+        latency: имя профиля из LATENCY_PROFILES или dict с теми же ключами
+        failure_rate: вероятность временной ошибки (ServiceUnavailable) на вызов
+        seed: seed задержек и сбоев (воспроизводимые замеры)
+        check_types: проверять значения по схеме при загрузке
+        sleep: функция ожидания (подменяется для ускоренных прогонов)
+    """
+
+    def __init__(self, project=DEFAULT_PROJECT, latency='none', failure_rate=0.0, seed=None,
+                 check_types=True, sleep=time.sleep):
+        self.project = project
+        self.location = 'US'
+        self.latency = dict(LATENCY_PROFILES[latency] if isinstance(latency, str) else latency)
+        self.failure_rate = failure_rate
+        self.check_types = check_types
+        self._sleep = sleep
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.datasets = {}
+        self.tables = {}
+        self.jobs = {}
+        self._scheduled_failures = {}
+        self.stats = {'calls': {}, 'failures': 0, 'bytes_uploaded': 0, 'rows_loaded': 0}
+
+    # ------------------------------------------------------------------
+    # Задержки и сбои
+    # ------------------------------------------------------------------
+
+    def fail_next(self, method, error=None, count=1):
+        """Ошибка для следующих count вызовов метода (по умолчанию 503)"""
+        error = error or api_exceptions.ServiceUnavailable(f"fake: injected failure in {method}")
+        with self._lock:
+            self._scheduled_failures.setdefault(method, []).extend([error] * count)
+
+    def _call(self, method, kind='call', nbytes=0):
+        """Учет вызова, задержка и (возможно) сбой"""
+        with self._lock:
+            calls = self.stats['calls']
+            calls[method] = calls.get(method, 0) + 1
+
+            delay = self.latency[kind]
+            if delay and self.latency['jitter']:
+                delay *= 1 + self._random.uniform(-1, 1) * self.latency['jitter']
+            if nbytes and self.latency['upload_mbps']:
+                delay += nbytes / (self.latency['upload_mbps'] * 1024 * 1024)
+
+            scheduled = self._scheduled_failures.get(method)
+            if scheduled:
+                error = scheduled.pop(0)
+            elif method in FAILING_METHODS and self._random.random() < self.failure_rate:
+                error = api_exceptions.ServiceUnavailable(f"fake: backend error in {method}")
+            else:
+                error = None
+            if error is not None:
+                self.stats['failures'] += 1
+
+        if delay > 0:
+            self._sleep(delay)
+        if error is not None:
+            raise error
+
+    # ------------------------------------------------------------------
+    # Datasets и таблицы
+    # ------------------------------------------------------------------
+
+    def create_dataset(self, dataset, exists_ok=False, **kwargs):
+        self._call('create_dataset')
+        dataset_id = _dataset_id(dataset, self.project)
+        with self._lock:
+            if dataset_id in self.datasets:
+                if not exists_ok:
+                    raise api_exceptions.Conflict(f"Already Exists: Dataset {dataset_id}")
+            else:
+                self.datasets[dataset_id] = FakeDataset(dataset_id, getattr(dataset, 'location', None) or 'US')
+            return self.datasets[dataset_id]
+
+    def get_dataset(self, dataset, **kwargs):
+        self._call('get_dataset')
+        dataset_id = _dataset_id(dataset, self.project)
+        with self._lock:
+            if dataset_id not in self.datasets:
+                raise api_exceptions.NotFound(f"Not found: Dataset {dataset_id}")
+            return self.datasets[dataset_id]
+
+    def _check_dataset(self, table_id):
+        dataset_id = table_id.rsplit('.', 1)[0]
+        if dataset_id not in self.datasets:
+            raise api_exceptions.NotFound(f"Not found: Dataset {dataset_id}")
+
+    def delete_table(self, table, not_found_ok=False, **kwargs):
+        self._call('delete_table')
+        table_id = _table_id(table, self.project)
+        with self._lock:
+            if table_id not in self.tables:
+                if not_found_ok:
+                    return
+                raise api_exceptions.NotFound(f"Not found: Table {table_id}")
+            del self.tables[table_id]
+
+    def create_table(self, table, exists_ok=False, **kwargs):
+        self._call('create_table')
+        table_id = _table_id(table, self.project)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self._check_dataset(table_id)
+            if table_id in self.tables:
+                if exists_ok:
+                    return self._snapshot(table_id)
+                raise api_exceptions.Conflict(f"Already Exists: Table {table_id}")
+            self.tables[table_id] = {
+                'schema': list(getattr(table, 'schema', None) or []),
+                'clustering_fields': getattr(table, 'clustering_fields', None),
+                'frame': None,
+                'created': now,
+                'modified': now,
+            }
+            return self._snapshot(table_id)
+
+    def get_table(self, table, **kwargs):
+        self._call('get_table')
+        table_id = _table_id(table, self.project)
+        with self._lock:
+            if table_id not in self.tables:
+                raise api_exceptions.NotFound(f"Not found: Table {table_id}")
+            return self._snapshot(table_id)
+
+    def _snapshot(self, table_id):
+        state = self.tables[table_id]
+        return FakeTable(
+            table_id, state['schema'], state['clustering_fields'], state['frame'],
+            state['created'], state['modified'],
+        )
+
+    def table_frame(self, table):
+        """Данные таблицы (DataFrame) - для проверок в тестах и замерах"""
+        table_id = _table_id(table, self.project)
+        with self._lock:
+            frame = self.tables[table_id]['frame']
+            return frame.copy() if frame is not None else pd.DataFrame()
+
+    # ------------------------------------------------------------------
+    # Загрузка
+    # ------------------------------------------------------------------
+
+    def _parse_csv(self, data, schema, job_config):
+        """CSV → DataFrame по схеме (BadRequest при несовпадении)"""
+        skip = getattr(job_config, 'skip_leading_rows', 0) or 0
+        df = pd.read_csv(
+            io.BytesIO(data), header=None, skiprows=skip, dtype=str,
+            keep_default_na=False, na_filter=False,
+        )
+        if not schema:
+            raise api_exceptions.BadRequest("fake: load without schema is not supported")
+        if len(df.columns) != len(schema):
+            raise api_exceptions.BadRequest(
+                f"CSV has {len(df.columns)} columns, schema has {len(schema)}",
+                errors=[{'reason': 'invalid', 'message': 'column count mismatch'}],
+            )
+        df.columns = [field.name for field in schema]
+
+        if self.check_types:
+            issues = validate_dataframe(df, schema)
+            if issues:
+                raise api_exceptions.BadRequest(
+                    f"Error while reading data: {format_issue(issues[0])}",
+                    errors=[{'reason': 'invalid', 'message': format_issue(issue)} for issue in issues],
+                )
+
+        df = df.replace('', None)
+        for field in schema:
+            if field.field_type.upper() in INTEGER_TYPES:
+                df[field.name] = pd.to_numeric(df[field.name]).astype('Int64')
+        return df
+
+    def load_table_from_file(self, file_obj, destination, job_config=None, job_id=None, **kwargs):
+        data = file_obj.read()
+        self._call('load_table_from_file', nbytes=len(data))
+        table_id = _table_id(destination, self.project)
+        with self._lock:
+            if job_id is not None and job_id in self.jobs:
+                raise api_exceptions.Conflict(f"Already Exists: Job {self.project}:{job_id}")
+
+        def run():
+            self._call('load_job', kind='load')
+            with self._lock:
+                self._check_dataset(table_id)
+                state = self.tables.get(table_id)
+                schema = getattr(job_config, 'schema', None) or (state['schema'] if state else None)
+
+            df = self._parse_csv(data, schema, job_config)
+            loaded = len(df)
+            disposition = getattr(job_config, 'write_disposition', None) or 'WRITE_APPEND'
+            now = datetime.now(timezone.utc)
+
+            with self._lock:
+                state = self.tables.get(table_id)
+                if state is None:
+                    state = self.tables[table_id] = {
+                        'schema': list(schema), 'frame': None, 'created': now,
+                        'clustering_fields': getattr(job_config, 'clustering_fields', None),
+                    }
+                current = state['frame']
+                if disposition == 'WRITE_EMPTY' and current is not None and len(current):
+                    raise api_exceptions.BadRequest(f"Table {table_id} is not empty (WRITE_EMPTY)")
+                if disposition == 'WRITE_APPEND' and current is not None:
+                    df = pd.concat([current, df], ignore_index=True)
+                state['frame'] = df
+                state['schema'] = list(schema)
+                state['modified'] = now
+                self.stats['bytes_uploaded'] += len(data)
+                self.stats['rows_loaded'] += loaded
+            return self
+
+        job = FakeJob(run, 'load', job_id, poll=lambda: self._call('job_poll'))
+        if job_id is not None:
+            with self._lock:
+                self.jobs[job_id] = job
+        return job
+
+    def get_job(self, job_id, **kwargs):
+        self._call('get_job')
+        with self._lock:
+            if job_id not in self.jobs:
+                raise api_exceptions.NotFound(f"Not found: Job {self.project}:{job_id}")
+            return self.jobs[job_id]
+
+    # ------------------------------------------------------------------
+    # Запросы
+    # ------------------------------------------------------------------
+
+    def query(self, sql, **kwargs):
+        self._call('query')
+
+        def run():
+            self._call('query_job', kind='query')
+            return FakeRowIterator(self._execute(sql))
+
+        return FakeJob(run, 'query')
+
+    def _execute(self, sql):
+        """Поддерживаемые запросы: SELECT констант, контрольные суммы и версии таблиц"""
+        tables_match = re.search(r"FROM `([\w\-.]+)\.__TABLES__`", sql)
+        if tables_match:
+            dataset_id = _dataset_id(tables_match.group(1), self.project)
+            with self._lock:
+                if dataset_id not in self.datasets:
+                    raise api_exceptions.NotFound(f"Not found: Dataset {dataset_id}")
+                rows = [
+                    {
+                        'table_id': table_id.rsplit('.', 1)[1],
+                        'last_modified_time': int(state['modified'].timestamp() * 1000),
+                        'view_definition': None,
+                    }
+                    for table_id, state in self.tables.items()
+                    if table_id.rsplit('.', 1)[0] == dataset_id
+                ]
+            return pd.DataFrame(rows, columns=['table_id', 'last_modified_time', 'view_definition'])
+
+        if re.match(r"\s*SELECT '[\w\-]+' AS table_name,", sql):
+            rows = []
+            for part in re.split(r'\bUNION ALL\b', sql):
+                match = CHECKSUM_SELECT.fullmatch(part.strip() + ' ')
+                if not match:
+                    raise api_exceptions.BadRequest(f"fake: unsupported checksum query: {part.strip()[:80]}")
+                rows.append(self._checksum_row(match))
+            return pd.DataFrame(rows)
+
+        match = re.fullmatch(r'\s*SELECT\s+(.*?)\s*;?\s*', sql, flags=re.DOTALL | re.IGNORECASE)
+        if match and not re.search(r'\bFROM\b', sql, flags=re.IGNORECASE):
+            row = {}
+            # Элементы списка SELECT: запятые вне строковых литералов
+            for item in re.split(r",(?=(?:[^']*'[^']*')*[^']*$)", match.group(1)):
+                parts = re.split(r'\s+as\s+', item.strip(), flags=re.IGNORECASE)
+                alias = parts[1].strip() if len(parts) > 1 else f"f{len(row)}_"
+                row[alias] = self._constant(parts[0].strip())
+            return pd.DataFrame([row])
+
+        raise api_exceptions.BadRequest(f"fake: unsupported query: {sql.strip()[:80]}")
+
+    def _checksum_row(self, match):
+        """
+        Одна таблица запроса контрольных сумм: TO_HEX(MD5(ключ)) каждой строки,
+        SUM и BIT_XOR чисел из SUBSTR(h, начало, длина) как INT64
+        """
+        table_id = _table_id(match.group('table'), self.project)
+        with self._lock:
+            if table_id not in self.tables:
+                raise api_exceptions.NotFound(f"Not found: Table {table_id}")
+            state = self.tables[table_id]
+        frame = state['frame']
+        if frame is None:
+            frame = pd.DataFrame(columns=[field.name for field in state['schema'] or []])
+
+        key_parts = self._key_parts(match.group('key'))
+        for kind, name in key_parts:
+            if kind == 'column' and name not in frame.columns:
+                raise api_exceptions.BadRequest(f"Unrecognized name: {name}")
+
+        def substr_int64(digest, start, length):
+            start, length = int(match.group(start)), int(match.group(length))
+            value = int(digest[start - 1:start - 1 + length], 16)
+            if value >= 2 ** 63:
+                raise api_exceptions.BadRequest(f"Bad int64 value: 0x{digest[start - 1:start - 1 + length]}")
+            return value
+
+        hash_sum = 0
+        hash_xor = 0
+        for row in frame.itertuples(index=False):
+            values = row._asdict()
+            key = ''.join(
+                name if kind == 'literal' else self._cast_string(values[name])
+                for kind, name in key_parts
+            )
+            digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+            hash_sum += substr_int64(digest, 'sum_start', 'sum_length')
+            hash_xor ^= substr_int64(digest, 'xor_start', 'xor_length')
+
+        return {
+            'table_name': match.group('table_name'),
+            'row_count': len(frame),
+            'hash_sum': hash_sum,
+            'hash_xor': hash_xor,
+        }
+
+    @staticmethod
+    def _key_parts(expression):
+        """
+        Выражение ключа строки: COALESCE(CAST(столбец AS STRING), '') или
+        CONCAT таких выражений и строковых литералов
+
+        Returns:
+            список ('column', имя) / ('literal', строка)
+        """
+        concat = re.fullmatch(r'CONCAT\((.*)\)', expression.strip(), flags=re.DOTALL)
+        items, depth, quoted, current = [], 0, False, ''
+        for char in (concat.group(1) if concat else expression):
+            if char == "'":
+                quoted = not quoted
+            elif not quoted and char in '()':
+                depth += 1 if char == '(' else -1
+            elif not quoted and depth == 0 and char == ',':
+                items.append(current)
+                current = ''
+                continue
+            current += char
+        items.append(current)
+
+        parts = []
+        for item in (item.strip() for item in items):
+            column = CHECKSUM_KEY_COLUMN.fullmatch(item)
+            if column:
+                parts.append(('column', column.group(1)))
+            elif re.fullmatch(r"'[^']*'", item):
+                parts.append(('literal', item[1:-1]))
+            else:
+                raise api_exceptions.BadRequest(f"fake: unsupported key expression: {item}")
+        return parts
+
+    @staticmethod
+    def _cast_string(value):
+        """COALESCE(CAST(value AS STRING), ''): INTEGER - десятичная запись, NULL - ''"""
+        if value is None or value is pd.NA:
+            return ''
+        if isinstance(value, (int, np.integer)):
+            return str(int(value))
+        return str(value)
+
+    @staticmethod
+    def _constant(expression):
+        if re.fullmatch(r'[+-]?\d+', expression):
+            return int(expression)
+        if re.fullmatch(r"'.*'", expression, flags=re.DOTALL):
+            return expression[1:-1]
+        if expression.upper() in ('CURRENT_TIMESTAMP()', 'CURRENT_TIMESTAMP'):
+            return datetime.now(timezone.utc)
+        raise api_exceptions.BadRequest(f"fake: unsupported expression: {expression}")
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/incremental.py
+
+Дозагрузка новых ответов опроса (python -m tech_survey prepare --append)
+без полной подготовки данных заново.
+
+1. ResponseId исходного файла сравниваются с data/processed/demographics.csv,
+   целиком (нужные столбцы) разбираются только строки новых респондентов.
+2. demographics, unpivot таблицы, bridge таблицы DevType/Employment,
+   technology_changes (и technology_responses, если она есть) новых
+   респондентов записываются рядом с таблицами (*.tail.tmp, без заголовка):
+   все эти таблицы упорядочены сначала по ResponseId, поэтому новые строки
+   дописываются в конец CSV, а прежние строки не читаются и не копируются.
+   Те же строки дописываются в data/processed/delta/ - эти файлы загружает
+   `upload --append` (WRITE_APPEND) и затем удаляет. Только если ResponseId
+   новых респондентов меньше уже подготовленных, таблица сливается с новыми
+   строками и сортируется заново. Словари <prefix>_values дополняются
+   в конце (коды прежних значений не меняются) и загружаются целиком.
+3. factstore/ и sketches/ дополняются по своим же массивам, CSV фактов
+   не перечитываются.
+4. tech_cube: счетчики складываются со счетчиками новых респондентов,
+   знаменатели и проценты пересчитываются по размерам сегментов
+   из хранилища фактов (prepare.update_technology_cube).
+
+Прежние файлы меняются только после того, как все шаги выполнены:
+список изменений (размер каждого CSV до дозаписи, файлы для замены)
+сначала записывается в data/processed/.append_journal.json, затем
+применяется. Ошибка до записи журнала оставляет CSV прежними, и повторный
+запуск добавит тех же респондентов заново (хранилище фактов, дополненное
+прошлым запуском, определяется по manifest). Прерванное применение
+журнала повторный запуск завершает: CSV обрезаются до сохраненных
+размеров и новые строки дописываются еще раз.
+
+Результат совпадает с полной подготовкой по тому же исходному файлу,
+кроме CreatedAt новых строк, порядка кодов новых значений в словарях
+<prefix>_values и порядка строк demographics (он повторяет исходный файл,
+а новые строки дописываются в конец).
+"""
+
+import json
+import os
+import shutil
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tech_survey import prepare
+from tech_survey.fact_store import append_fact_store, load_fact_store
+from tech_survey.sketches import append_sketches
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+# Строк исходного файла за одно чтение
+READ_CHUNK_SIZE = 20000
+
+# Новые строки таблицы (без заголовка) и новая версия файла, заменяющая прежний
+TAIL_SUFFIX = '.tail.tmp'
+STAGED_SUFFIX = '.append.tmp'
+
+# Журнал изменений подготовленных файлов (см. apply_journal)
+JOURNAL_FILE = '.append_journal.json'
+
+# Порядок строк таблиц при полной подготовке (столбцы по старшинству):
+# Category и Status - в порядке TECH_COLUMNS_MAP, остальные - по значению.
+# Сортировка нужна, только если новые ResponseId меньше уже подготовленных
+TECHNOLOGY_ORDER = ['ResponseId', 'Technology']
+BRIDGE_ORDER = ['ResponseId', 'ValueId']
+CHANGES_ORDER = ['ResponseId', 'Category', 'Technology']
+RESPONSES_ORDER = ['ResponseId', 'Category', 'Status', 'Technology']
+
+CATEGORY_ORDER = list(dict.fromkeys(tech_type for tech_type, _ in prepare.TECH_COLUMNS_MAP.values()))
+STATUS_ORDER = list(dict.fromkeys(status for _, status in prepare.TECH_COLUMNS_MAP.values()))
+
+def print_header(text):
+    """Печать заголовка"""
+    print("\n" + "="*70)
+    print(text)
+    print("="*70)
+
+# ============================================================================
+# НОВЫЕ РЕСПОНДЕНТЫ
+# ============================================================================
+
+def load_known_response_ids(output_dir=prepare.OUTPUT_DIR):
+    """ResponseId уже подготовленных респондентов (по demographics.csv)"""
+    demo_path = os.path.join(output_dir, 'demographics.csv')
+    if not os.path.exists(demo_path):
+        raise FileNotFoundError(
+            f"{demo_path} не найден - сначала полная подготовка: python -m tech_survey prepare"
+        )
+    return pd.read_csv(demo_path, usecols=['ResponseId'])['ResponseId'].to_numpy(np.int64)
+
+def read_new_responses(input_file, known_ids, chunksize=READ_CHUNK_SIZE):
+    """
+    Строки исходного файла с новыми ResponseId.
+
+    Читаются только столбцы, нужные подготовке (демография и технологии),
+    по частям - в памяти остаются только новые строки.
+    """
+    header = pd.read_csv(input_file, nrows=0).columns
+    needed = ['ResponseId'] + prepare.DEMO_COLUMNS + list(prepare.TECH_COLUMNS_MAP)
+    usecols = [col for col in header if col in set(needed)]
+
+    # Значения как строки: тип, выведенный по части файла, не должен
+    # отличаться от полной подготовки (например, YearsCode "13" → 13.0)
+    dtype = {col: str for col in usecols if col != 'ResponseId'}
+
+    parts = []
+    total = 0
+    for chunk in pd.read_csv(input_file, usecols=usecols, dtype=dtype, chunksize=chunksize):
+        total += len(chunk)
+        new_rows = chunk[~chunk['ResponseId'].isin(known_ids)]
+        if len(new_rows):
+            parts.append(new_rows)
+
+    new_df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=usecols)
+    return new_df, total
+
+def load_multiselect_labels(table_prefix, output_dir=prepare.OUTPUT_DIR):
+    """Словарь значений прежней подготовки (список по ValueId; None - таблицы нет)"""
+    values_path = os.path.join(output_dir, f"{table_prefix}_values.csv")
+    if not os.path.exists(values_path):
+        return None
+    values_df = pd.read_csv(values_path, keep_default_na=False).sort_values('ValueId')
+    return values_df['Value'].tolist()
+
+# ============================================================================
+# ДОЗАПИСЬ ФАЙЛОВ
+# ============================================================================
+
+def csv_columns(path):
+    """Столбцы заголовка CSV (None - файла нет)"""
+    if not os.path.exists(path):
+        return None
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def sort_rows(df, order):
+    """Строки в порядке полной подготовки (устойчивая сортировка по столбцам order)"""
+    keys = []
+    for column in reversed(order):
+        if column == 'Category':
+            keys.append(pd.Categorical(df[column], categories=CATEGORY_ORDER).codes)
+        elif column == 'Status':
+            keys.append(pd.Categorical(df[column], categories=STATUS_ORDER).codes)
+        elif column == 'Technology':
+            keys.append(pd.factorize(df[column], sort=True)[0])
+        else:
+            keys.append(df[column].to_numpy())
+    return df.iloc[np.lexsort(keys)].reset_index(drop=True)
+
+def merge_rows(df, path, staged_path, order):
+    """Слияние CSV с новыми строками и сортировка в порядке полной подготовки"""
+    old_df = pd.read_csv(path, keep_default_na=False)
+    df = pd.concat([old_df, df[list(old_df.columns)]], ignore_index=True)
+    sort_rows(df, order).to_csv(staged_path, index=False, encoding='utf-8')
+
+def file_size(path):
+    """Размер файла до дозаписи (None - файла нет, он создается с заголовком)"""
+    return os.path.getsize(path) if os.path.exists(path) else None
+
+def stage_table(df, filename, pending, order=None, output_dir=prepare.OUTPUT_DIR, delta_dir=prepare.DELTA_DIR):
+    """
+    Новые строки подготовленной таблицы и ее дельты для upload --append
+
+    Новые строки записываются в <файл>.tail.tmp в порядке столбцов
+    заголовка таблицы; в журнал добавляется их дозапись в конец таблицы
+    и дельты.
+
+    Args:
+        pending: список изменений журнала (дополняется)
+        order: столбцы сортировки - таблица сливается с новыми строками
+            и заменяется целиком; None - строки дописываются в конец
+
+    Returns:
+        число новых строк
+    """
+    if df is None or len(df) == 0:
+        return 0
+
+    path = os.path.join(output_dir, filename)
+    columns = csv_columns(path) or list(df.columns)
+    missing = set(columns) - set(df.columns)
+    if missing:
+        raise ValueError(f"{path}: нет столбцов {sorted(missing)} в новых строках")
+
+    tail_path = path + TAIL_SUFFIX
+    pending.append({'action': 'remove', 'source': tail_path})
+    df[columns].to_csv(tail_path, header=False, index=False, encoding='utf-8')
+    header = df[columns].head(0).to_csv(index=False)
+
+    if order is None or not os.path.exists(path):
+        pending.append({'action': 'append', 'source': tail_path, 'target': path,
+                        'size': file_size(path), 'header': header})
+    else:
+        staged_path = path + STAGED_SUFFIX
+        pending.append({'action': 'replace', 'source': staged_path, 'target': path})
+        merge_rows(df, path, staged_path, order)
+
+    # Дельта - только новые строки (порядок для WRITE_APPEND не важен)
+    delta_path = os.path.join(delta_dir, filename)
+    pending.append({'action': 'append', 'source': tail_path, 'target': delta_path,
+                    'size': file_size(delta_path), 'header': header})
+
+    print(f"  ✓ {filename}: +{len(df):,} строк{' (слияние с сортировкой)' if order else ''}")
+    return len(df)
+
+def stage_frame(df, filename, pending, output_dir=prepare.OUTPUT_DIR):
+    """Новая версия таблицы, которая перезаписывается целиком (словари, куб)"""
+    path = os.path.join(output_dir, filename)
+    staged_path = path + STAGED_SUFFIX
+    pending.append({'action': 'replace', 'source': staged_path, 'target': path})
+    df.to_csv(staged_path, index=False, encoding='utf-8')
+    print(f"  ✓ {filename}: {len(df):,} строк")
+
+def append_tail(entry):
+    """
+    Дозапись новых строк в конец CSV с размера, сохраненного в журнале:
+    повторное применение (после прерванного) дает тот же файл
+    """
+    Path(entry['target']).parent.mkdir(parents=True, exist_ok=True)
+    with open(entry['source'], 'rb') as tail:
+        if entry['size'] is None:
+            with open(entry['target'], 'wb') as f:
+                f.write(entry['header'].encode('utf-8'))
+                shutil.copyfileobj(tail, f)
+        else:
+            with open(entry['target'], 'r+b') as f:
+                f.truncate(entry['size'])
+                f.seek(entry['size'])
+                shutil.copyfileobj(tail, f)
+
+def apply_journal(journal_path):
+    """
+    Применение журнала: дозапись новых строк и замена файлов новыми
+    версиями, затем удаление журнала и временных файлов
+    """
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+
+    for entry in entries:
+        if entry['action'] == 'append':
+            append_tail(entry)
+        elif entry['action'] == 'replace' and os.path.exists(entry['source']):
+            os.replace(entry['source'], entry['target'])
+
+    os.remove(journal_path)
+    discard_pending(entries)
+
+def commit_pending(pending, output_dir=prepare.OUTPUT_DIR):
+    """
+    Запись журнала (атомарно, через os.replace) и его применение.
+    После записи журнала изменения не отменяются: ошибку при применении
+    исправляет повторный запуск (resume_journal)
+    """
+    journal_path = os.path.join(output_dir, JOURNAL_FILE)
+    with open(journal_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(pending, f, ensure_ascii=False, indent=2)
+    os.replace(journal_path + '.tmp', journal_path)
+    pending.clear()
+    apply_journal(journal_path)
+
+def resume_journal(output_dir=prepare.OUTPUT_DIR):
+    """Завершение дозаписи, прерванной при применении журнала"""
+    journal_path = os.path.join(output_dir, JOURNAL_FILE)
+    if os.path.exists(journal_path):
+        print(f"  ♻️  Завершение прерванной дозагрузки: {journal_path}")
+        apply_journal(journal_path)
+
+def discard_pending(pending):
+    """Удаление временных файлов (до записи журнала прежние файлы не меняются)"""
+    for entry in pending:
+        if os.path.exists(entry['source']):
+            os.remove(entry['source'])
+    pending.clear()
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def main(input_file=prepare.INPUT_FILE, output_dir=prepare.OUTPUT_DIR, consolidated=False):
+    """
+    Дозагрузка новых респондентов во все подготовленные данные
+
+    Args:
+        consolidated: загрузка будет с --consolidated (technology_responses
+            дописывается всегда, если она уже создана)
+    """
+    print("\n" + "="*70)
+    print("➕ ДОЗАГРУЗКА НОВЫХ ОТВЕТОВ")
+    print("="*70)
+    print(f"Время начала: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    timings = {}
+    pending = []
+
+    try:
+        # ===== ШАГ 1: НОВЫЕ РЕСПОНДЕНТЫ =====
+        print_header("🔍 ПОИСК НОВЫХ RESPONSEID")
+        start = time.perf_counter()
+        resume_journal(output_dir)
+        known_ids = load_known_response_ids(output_dir)
+        new_df, total = read_new_responses(input_file, known_ids)
+        timings['чтение исходного файла'] = time.perf_counter() - start
+
+        print(f"  Строк в исходном файле: {total:,}")
+        print(f"  Уже подготовлено:       {len(known_ids):,}")
+        print(f"  Новых респондентов:     {len(new_df):,}")
+
+        if len(new_df) == 0:
+            print_header("✅ НОВЫХ ОТВЕТОВ НЕТ")
+            return 0
+
+        # ===== ШАГ 2: ТАБЛИЦЫ НОВЫХ РЕСПОНДЕНТОВ =====
+        start = time.perf_counter()
+        new_demo_df = prepare.create_demographics_table(new_df)
+
+        print_header("🔧 UNPIVOT НОВЫХ РЕСПОНДЕНТОВ")
+        new_tech_tables = {}
+        for source_column, (tech_type, status) in prepare.TECH_COLUMNS_MAP.items():
+            tech_df = prepare.create_technology_unpivot_table(new_df, source_column, tech_type, status)
+            if tech_df is not None:
+                new_tech_tables[(tech_type, status)] = tech_df
+
+        print_header("🏷️  BRIDGE ТАБЛИЦЫ НОВЫХ РЕСПОНДЕНТОВ")
+        new_multiselect = {}
+        for source_column, table_prefix in prepare.MULTISELECT_COLUMNS.items():
+            labels = load_multiselect_labels(table_prefix, output_dir)
+            if labels is None:
+                print(f"  ⚠️  {table_prefix}_values.csv не найден - нужна полная подготовка")
+                continue
+            bridge_df, values_df = prepare.create_multiselect_tables(new_df, source_column, table_prefix, labels)
+            if bridge_df is not None:
+                new_multiselect[source_column] = (table_prefix, bridge_df, values_df)
+        timings['demographics и unpivot'] = time.perf_counter() - start
+
+        # ===== ШАГ 3: НОВЫЕ СТРОКИ ТАБЛИЦ =====
+        print_header("📝 ДОЗАПИСЬ ТАБЛИЦ")
+        start = time.perf_counter()
+
+        # Таблицы упорядочены сначала по ResponseId и остаются упорядоченными
+        # при дозаписи в конец, если новые ResponseId больше всех прежних
+        ids_increase = len(known_ids) == 0 or new_demo_df['ResponseId'].min() > known_ids.max()
+
+        def order(columns):
+            return None if ids_increase else columns
+
+        stage_table(new_demo_df, 'demographics.csv', pending, output_dir=output_dir)
+        for (tech_type, status), tech_df in new_tech_tables.items():
+            stage_table(tech_df, f"{tech_type}_{status}.csv", pending, order(TECHNOLOGY_ORDER), output_dir)
+
+        for table_prefix, bridge_df, values_df in new_multiselect.values():
+            stage_table(bridge_df, f"{table_prefix}_bridge.csv", pending, order(BRIDGE_ORDER), output_dir)
+            stage_frame(values_df, f"{table_prefix}_values.csv", pending, output_dir)
+
+        # Изменения стека зависят только от строк самого респондента
+        if os.path.exists(os.path.join(output_dir, f"{prepare.CHANGES_TABLE}.csv")):
+            stage_table(
+                prepare.create_technology_changes(new_tech_tables),
+                f"{prepare.CHANGES_TABLE}.csv", pending, order(CHANGES_ORDER), output_dir,
+            )
+        else:
+            print(f"  ⚠️  {prepare.CHANGES_TABLE}.csv не найден - нужна полная подготовка")
+
+        responses_path = os.path.join(output_dir, f"{prepare.CONSOLIDATED_TABLE}.csv")
+        if os.path.exists(responses_path):
+            stage_table(
+                prepare.create_technology_responses(new_tech_tables),
+                f"{prepare.CONSOLIDATED_TABLE}.csv", pending, order(RESPONSES_ORDER), output_dir,
+            )
+        elif consolidated:
+            print(f"  ⚠️  {responses_path} не найден - нужна полная подготовка с --consolidated")
+        timings['новые строки CSV'] = time.perf_counter() - start
+
+        # ===== ШАГ 4: ХРАНИЛИЩЕ ФАКТОВ И СКЕТЧИ =====
+        start = time.perf_counter()
+        if not os.path.exists(os.path.join(prepare.FACT_STORE_DIR, 'manifest.json')):
+            raise FileNotFoundError(
+                f"{prepare.FACT_STORE_DIR} не найден - сначала полная подготовка: python -m tech_survey prepare"
+            )
+        # Прошлый запуск мог дополнить хранилище и упасть до записи журнала.
+        # Число респондентов - по manifest: он записывается последним,
+        # load_fact_store проверяет по нему длины массивов
+        stored = load_fact_store().manifest['respondents']
+        if stored == len(known_ids) + len(new_demo_df):
+            print("  ⏭️  factstore: новые респонденты уже добавлены прошлым запуском")
+        elif stored != len(known_ids):
+            raise ValueError(
+                f"factstore: {stored:,} респондентов, подготовлено {len(known_ids):,} - "
+                "нужна полная подготовка"
+            )
+        else:
+            manifest = append_fact_store(new_demo_df, new_tech_tables, multiselect={
+                source_column: (bridge_df, values_df['Value'].tolist())
+                for source_column, (_, bridge_df, values_df) in new_multiselect.items()
+            })
+            print(f"  ✓ factstore: {manifest['respondents']:,} респондентов")
+        if os.path.exists(os.path.join(prepare.SKETCH_DIR, 'manifest.json')):
+            # Объединение HLL - максимум регистров, повторное добавление ничего не меняет
+            manifest = append_sketches(new_demo_df, new_tech_tables)
+            print(f"  ✓ sketches: {sum(info['sketches'] for info in manifest['tables'].values()):,} скетчей")
+        timings['factstore и sketches'] = time.perf_counter() - start
+
+        # ===== ШАГ 5: КУБ АГРЕГАТОВ =====
+        # Размеры сегментов - по измерениям всех респондентов в хранилище фактов
+        start = time.perf_counter()
+        store = load_fact_store()
+        demo_dims = pd.DataFrame({dim: store.dimension_values(dim) for dim in store.dims})
+        cube_df = pd.read_csv(os.path.join(output_dir, 'tech_cube.csv'), keep_default_na=False)
+        cube_df = prepare.update_technology_cube(cube_df, demo_dims, new_demo_df, new_tech_tables)
+        stage_frame(cube_df, 'tech_cube.csv', pending, output_dir)
+        timings['tech_cube'] = time.perf_counter() - start
+
+        # ===== ШАГ 6: ДОЗАПИСЬ И ЗАМЕНА ФАЙЛОВ =====
+        start = time.perf_counter()
+        commit_pending(pending, output_dir)
+        timings['дозапись CSV'] = time.perf_counter() - start
+
+    except Exception as e:
+        discard_pending(pending)
+        print_header("❌ ОШИБКА!")
+        print(f"\n{type(e).__name__}: {e}")
+        print("\nПолный traceback:")
+        print(traceback.format_exc())
+        return 1
+
+    print_header("✅ НОВЫЕ ОТВЕТЫ ДОБАВЛЕНЫ")
+    for name, seconds in timings.items():
+        print(f"  {name:<26} {seconds:>7.2f} сек")
+    print(f"\n📁 Новые строки для загрузки: {prepare.DELTA_DIR}/")
+
+    print("\n" + "="*70)
+    print("📝 СЛЕДУЮЩИЙ ШАГ:")
+    print(f"   Запустите: python -m tech_survey upload --append{' --consolidated' if consolidated else ''}")
+    print("="*70)
+
+    return 0
@@ -0,0 +1,675 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/pipeline.py
+
+Оркестратор конвейера: анализ → подготовка → загрузка → проверка → views.
+
+Работа описана графом зависимостей этапов (profile, demographics, каждый
+unpivot и bridge таблица, cube, factstore, sketches, каждая загрузка,
+verify, views).
+Независимые этапы выполняются параллельно, этап пропускается, если его
+входы (файлы и результаты зависимостей) не изменились с прошлого успешного
+запуска. Состояние сохраняется после каждого этапа, поэтому повторный запуск
+продолжает с места сбоя. Этапы пишут таблицы синхронно, без фоновой записи
+prepare --writers (см. build_stages).
+
+Использование:
+    python -m tech_survey pipeline              # полный конвейер
+    python -m tech_survey pipeline --no-upload  # только локальные этапы
+    python -m tech_survey pipeline --consolidated  # technology_responses вместо 8 таблиц
+    python -m tech_survey pipeline --only "upload:*" --force
+"""
+
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from pathlib import Path
+
+from tech_survey.cli import parse_command
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+PIPELINE_DIR = 'data/processed/.pipeline'
+STATE_PATH = os.path.join(PIPELINE_DIR, 'state.json')
+LOG_DIR = os.path.join(PIPELINE_DIR, 'logs')
+VIEWS_SQL = 'bigquery/sql_queries/create_views.sql'
+CONSOLIDATED_VIEWS_SQL = 'bigquery/sql_queries/create_views_consolidated.sql'
+VIEWS_SQL_DATASET = 'surveydata-478616.tech_survey_data'
+
+DEFAULT_WORKERS = 4
+
+# ============================================================================
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ============================================================================
+
+def print_header(text):
+    """Печать заголовка"""
+    print("\n" + "="*70)
+    print(text)
+    print("="*70)
+
+class _ThreadOutput(io.TextIOBase):
+    """
+    Подмена sys.stdout: вывод этапа, выполняемого в потоке, пишется в его
+    собственный буфер, остальной вывод - в исходный stdout.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+def file_fingerprint(path):
+    """Размер и время изменения файла (None - файла нет)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+# ============================================================================
+# ЭТАПЫ И ИХ ВЫПОЛНЕНИЕ
+# ============================================================================
+
+class Stage:
+    """
+    Этап конвейера.
+
+    Args:
+        name: уникальное имя (например, 'unpivot:language_haveworked')
+        func: функция func(ctx) -> dict | None (результат сохраняется в состоянии)
+        deps: имена этапов, которые должны завершиться раньше
+        inputs: файлы, от которых зависит результат
+        outputs: файлы, которые создает этап (этап не пропускается, если их нет)
+    """
+
+    def __init__(self, name, func, deps=(), inputs=(), outputs=()):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+class StageFailed(RuntimeError):
+    """
+    Ошибка этапа, из-за которой другие, уже выполненные этапы нужно
+    выполнить заново (например, verify - загрузки с несовпавшими суммами)
+
+    Args:
+        invalidate: имена этапов, которые следующий запуск не пропустит
+    """
+
+    def __init__(self, message, invalidate=()):
+        super().__init__(message)
+        self.invalidate = list(invalidate)
+
+class PipelineContext:
+    """Общие ресурсы этапов: исходные данные, таблицы в памяти, клиент BigQuery"""
+
+    def __init__(self):
+        self.tables = {}
+        self.results = {}
+        self._raw = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    def raw(self):
+        """Исходные данные опроса (загружаются один раз, при первом обращении)"""
+        with self._lock:
+            if self._raw is None:
+                from tech_survey import prepare
+
+                self._raw = prepare.load_data(prepare.INPUT_FILE)
+            return self._raw
+
+    def table(self, name, path):
+        """Таблица, созданная в этом запуске, или прочитанная из CSV"""
+        import pandas as pd
+
+        with self._lock:
+            if name not in self.tables:
+                self.tables[name] = pd.read_csv(path) if os.path.exists(path) else None
+            return self.tables[name]
+
+    def client(self):
+        """Клиент BigQuery (создается при первой загрузке)"""
+        with self._lock:
+            if self._client is None:
+                from tech_survey import upload
+
+                upload.check_credentials()
+                self._client = upload.init_bigquery_client()
+            return self._client
+
+def validate_graph(stages):
+    """Проверка графа: известные зависимости и отсутствие циклов"""
+    by_name = {stage.name: stage for stage in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("Имена этапов должны быть уникальными")
+
+    for stage in stages:
+        unknown = [dep for dep in stage.deps if dep not in by_name]
+        if unknown:
+            raise ValueError(f"Этап {stage.name}: неизвестные зависимости {unknown}")
+
+    visiting, visited = set(), set()
+
+    def visit(name, path):
+        if name in visited:
+            return
+        if name in visiting:
+            raise ValueError(f"Цикл в графе этапов: {' → '.join(path + [name])}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep, path + [name])
+        visiting.discard(name)
+        visited.add(name)
+
+    for stage in stages:
+        visit(stage.name, [])
+
+def load_state(state_path):
+    if not os.path.exists(state_path):
+        return {}
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state, state_path):
+    Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, state_path)
+
+def stage_fingerprint(stage, state):
+    """Отпечаток входов этапа: файлы и отпечатки зависимостей"""
+    payload = {
+        'inputs': {path: file_fingerprint(path) for path in stage.inputs},
+        'deps': {dep: state.get(dep, {}).get('fingerprint') for dep in stage.deps},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+def can_skip(stage, fingerprint, state):
+    previous = state.get(stage.name)
+    return (
+        previous is not None
+        and previous.get('status') == 'done'
+        and previous.get('fingerprint') == fingerprint
+        and all(os.path.exists(path) for path in stage.outputs)
+    )
+
+def _execute(stage, ctx, output, log_dir):
+    """Выполнение этапа в потоке пула с перехватом вывода в лог"""
+    buffer = io.StringIO()
+    output.local.buffer = buffer
+    start_time = time.time()
+    error = None
+    result = None
+    try:
+        result = stage.func(ctx)
+    except Exception as e:
+        error = e
+        buffer.write(traceback.format_exc())
+    finally:
+        output.local.buffer = None
+
+    Path(log_dir).mkdir(parents=True, exist_ok=True)
+    log_path = os.path.join(log_dir, f"{stage.name.replace(':', '_')}.log")
+    with open(log_path, 'w', encoding='utf-8') as f:
+        f.write(buffer.getvalue())
+
+    return result, error, time.time() - start_time, log_path
+
+def run_pipeline(stages, ctx=None, state_path=STATE_PATH, log_dir=LOG_DIR,
+                 workers=DEFAULT_WORKERS, force=False, selected=None):
+    """
+    Выполнение графа этапов.
+
+    Ошибка StageFailed этапа снимает отметку выполнения с этапов из ее
+    invalidate: следующий запуск выполнит их заново.
+
+    Args:
+        stages: список Stage
+        force: выполнить все выбранные этапы, не проверяя отпечатки
+        selected: имена выбранных этапов (None - все); невыбранные этапы
+                  считаются выполненными
+
+    Returns:
+        dict {имя этапа: {'status', 'seconds', 'error'}}
+        status: done / skipped / failed / blocked / excluded
+    """
+    validate_graph(stages)
+    ctx = ctx or PipelineContext()
+    state = load_state(state_path)
+    pending = {stage.name: stage for stage in stages}
+    report = {}
+
+    output = _ThreadOutput(sys.stdout)
+    original_stdout = sys.stdout
+    sys.stdout = output
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            running = {}
+
+            while pending or running:
+                progress = True
+                while progress:
+                    progress = False
+                    for name, stage in list(pending.items()):
+                        dep_status = [report.get(dep, {}).get('status') for dep in stage.deps]
+                        if any(s in ('failed', 'blocked') for s in dep_status):
+                            report[name] = {'status': 'blocked', 'seconds': 0.0, 'error': None}
+                        elif not all(s in ('done', 'skipped', 'excluded') for s in dep_status):
+                            continue
+                        elif selected is not None and name not in selected:
+                            report[name] = {'status': 'excluded', 'seconds': 0.0, 'error': None}
+                        else:
+                            fingerprint = stage_fingerprint(stage, state)
+                            if not force and can_skip(stage, fingerprint, state):
+                                ctx.results[name] = state[name].get('result')
+                                report[name] = {'status': 'skipped', 'seconds': 0.0, 'error': None}
+                                original_stdout.write(f"  ⏭️  {name}: входы не изменились\n")
+                            else:
+                                future = pool.submit(_execute, stage, ctx, output, log_dir)
+                                running[future] = (stage, fingerprint)
+                                original_stdout.write(f"  ▶️  {name}\n")
+                        del pending[name]
+                        progress = True
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, fingerprint = running.pop(future)
+                    result, error, seconds, log_path = future.result()
+
+                    if error is None:
+                        ctx.results[stage.name] = result
+                        state[stage.name] = {
+                            'status': 'done',
+                            'fingerprint': fingerprint,
+                            'finished': datetime.now().isoformat(timespec='seconds'),
+                            'seconds': round(seconds, 3),
+                            'result': result,
+                        }
+                        report[stage.name] = {'status': 'done', 'seconds': seconds, 'error': None}
+                        original_stdout.write(f"  ✓ {stage.name}: {seconds:.2f} сек\n")
+                    else:
+                        state[stage.name] = {'status': 'failed', 'error': str(error)}
+                        for name in getattr(error, 'invalidate', ()):
+                            if name in state:
+                                state[name] = {'status': 'invalidated', 'error': f"{stage.name}: {error}"}
+                        report[stage.name] = {'status': 'failed', 'seconds': seconds, 'error': error}
+                        original_stdout.write(
+                            f"  ❌ {stage.name}: {type(error).__name__}: {error} (лог: {log_path})\n"
+                        )
+                    save_state(state, state_path)
+    finally:
+        sys.stdout = original_stdout
+
+    return report
+
+# ============================================================================
+# ЭТАПЫ ПРОЕКТА
+# ============================================================================
+
+def build_stages(include_upload=True, consolidated=False):
+    """
+    Граф этапов конвейера проекта
+
+    Таблицы записываются синхронно (TableWriter без потоков записи), фоновая
+    запись prepare --writers здесь не используется: выходной файл
+    этапа должен быть записан до его отпечатка и до запуска зависимых
+    этапов, а запись одного этапа и так идет параллельно с вычислением
+    других (--workers).
+
+    Args:
+        include_upload: добавить этапы загрузки, проверки и views
+        consolidated: создать и загружать technology_responses вместо 8 таблиц
+    """
+    from tech_survey import analyze, prepare
+    from tech_survey.table_writer import TableWriter
+
+    output_dir = prepare.OUTPUT_DIR
+    raw_file = prepare.INPUT_FILE
+
+    def csv_path(table_name):
+        return os.path.join(output_dir, f"{table_name}.csv")
+
+    def save_tables(*tables):
+        """Синхронная запись таблиц (df, имя файла): все файлы записаны до возврата"""
+        with TableWriter(workers=0) as writer:
+            for df, filename in tables:
+                writer.submit(df, filename, output_dir)
+
+    def run_profile(ctx):
+        summary = analyze.analyze_dataframe(ctx.raw(), raw_file, analyze.REPORT_PATH)
+        return {'rows': summary['rows'], 'tech_columns': len(summary['tech_columns'])}
+
+    def run_demographics(ctx):
+        prepare.clear_delta_dir()
+        demo_df = prepare.create_demographics_table(ctx.raw())
+        ctx.tables['demographics'] = demo_df
+        save_tables((demo_df, 'demographics.csv'))
+        return {'rows': len(demo_df)}
+
+    def make_unpivot(source_column, tech_type, status):
+        table_name = f"{tech_type}_{status}"
+
+        def run_unpivot(ctx):
+            tech_df = prepare.create_technology_unpivot_table(ctx.raw(), source_column, tech_type, status)
+            ctx.tables[table_name] = tech_df
+            save_tables((tech_df, f"{table_name}.csv"))
+            return {'rows': 0 if tech_df is None else len(tech_df)}
+
+        return run_unpivot
+
+    tech_names = [f"{tech_type}_{status}" for tech_type, status in prepare.TECH_COLUMNS_MAP.values()]
+
+    def make_multiselect(source_column, table_prefix):
+        def run_multiselect(ctx):
+            bridge_df, values_df = prepare.create_multiselect_tables(ctx.raw(), source_column, table_prefix)
+            ctx.tables[f"{table_prefix}_bridge"] = bridge_df
+            ctx.tables[f"{table_prefix}_values"] = values_df
+            save_tables((bridge_df, f"{table_prefix}_bridge.csv"), (values_df, f"{table_prefix}_values.csv"))
+            return {'rows': 0 if bridge_df is None else len(bridge_df)}
+
+        return run_multiselect
+
+    multiselect_names = [
+        f"{table_prefix}_{suffix}"
+        for table_prefix in prepare.MULTISELECT_COLUMNS.values() for suffix in ('bridge', 'values')
+    ]
+    multiselect_stages = [f"multiselect:{table_prefix}" for table_prefix in prepare.MULTISELECT_COLUMNS.values()]
+
+    def run_cube(ctx):
+        demo_df = ctx.table('demographics', csv_path('demographics'))
+        tech_tables = {
+            (tech_type, status): ctx.table(f"{tech_type}_{status}", csv_path(f"{tech_type}_{status}"))
+            for tech_type, status in prepare.TECH_COLUMNS_MAP.values()
+        }
+        cube_df = prepare.create_technology_cube(demo_df, tech_tables)
+        save_tables((cube_df, 'tech_cube.csv'))
+        return {'rows': 0 if cube_df is None else len(cube_df)}
+
+    def run_fact_store(ctx):
+        demo_df = ctx.table('demographics', csv_path('demographics'))
+        tech_tables = {
+            (tech_type, status): ctx.table(f"{tech_type}_{status}", csv_path(f"{tech_type}_{status}"))
+            for tech_type, status in prepare.TECH_COLUMNS_MAP.values()
+        }
+        multiselect = {}
+        for source_column, table_prefix in prepare.MULTISELECT_COLUMNS.items():
+            bridge_df = ctx.table(f"{table_prefix}_bridge", csv_path(f"{table_prefix}_bridge"))
+            values_df = ctx.table(f"{table_prefix}_values", csv_path(f"{table_prefix}_values"))
+            if bridge_df is not None and values_df is not None:
+                multiselect[source_column] = (bridge_df, values_df.sort_values('ValueId')['Value'].tolist())
+        manifest = prepare.create_fact_store(demo_df, tech_tables, multiselect=multiselect)
+        return {'respondents': manifest['respondents']}
+
+    def run_sketches(ctx):
+        demo_df = ctx.table('demographics', csv_path('demographics'))
+        tech_tables = {
+            (tech_type, status): ctx.table(f"{tech_type}_{status}", csv_path(f"{tech_type}_{status}"))
+            for tech_type, status in prepare.TECH_COLUMNS_MAP.values()
+        }
+        manifest = prepare.create_sketches(demo_df, tech_tables)
+        return {'sketches': sum(info['sketches'] for info in manifest['tables'].values())}
+
+    def run_changes(ctx):
+        tech_tables = {
+            (tech_type, status): ctx.table(f"{tech_type}_{status}", csv_path(f"{tech_type}_{status}"))
+            for tech_type, status in prepare.TECH_COLUMNS_MAP.values()
+        }
+        changes_df = prepare.create_technology_changes(tech_tables)
+        save_tables((changes_df, f"{prepare.CHANGES_TABLE}.csv"))
+        return {'rows': 0 if changes_df is None else len(changes_df)}
+
+    def run_responses(ctx):
+        tech_tables = {
+            (tech_type, status): ctx.table(f"{tech_type}_{status}", csv_path(f"{tech_type}_{status}"))
+            for tech_type, status in prepare.TECH_COLUMNS_MAP.values()
+        }
+        responses_df = prepare.create_technology_responses(tech_tables)
+        save_tables((responses_df, f"{prepare.CONSOLIDATED_TABLE}.csv"))
+        return {'rows': 0 if responses_df is None else len(responses_df)}
+
+    prepared_tables = ['demographics'] + tech_names + multiselect_names + [prepare.CHANGES_TABLE, 'tech_cube']
+    if consolidated:
+        prepared_tables.append(prepare.CONSOLIDATED_TABLE)
+
+    def run_prepare_report(ctx):
+        created_files = [csv_path(name) for name in prepared_tables if os.path.exists(csv_path(name))]
+        prepare.validate_data_integrity(ctx.raw(), created_files)
+        prepare.create_summary_report(created_files)
+
+    stages = [
+        Stage('profile', run_profile, inputs=[raw_file], outputs=[analyze.REPORT_PATH]),
+        Stage('demographics', run_demographics, inputs=[raw_file], outputs=[csv_path('demographics')]),
+    ]
+    for source_column, (tech_type, status) in prepare.TECH_COLUMNS_MAP.items():
+        table_name = f"{tech_type}_{status}"
+        stages.append(Stage(
+            f"unpivot:{table_name}", make_unpivot(source_column, tech_type, status),
+            inputs=[raw_file], outputs=[csv_path(table_name)],
+        ))
+    for source_column, table_prefix in prepare.MULTISELECT_COLUMNS.items():
+        stages.append(Stage(
+            f"multiselect:{table_prefix}", make_multiselect(source_column, table_prefix),
+            inputs=[raw_file], outputs=[csv_path(f"{table_prefix}_{suffix}") for suffix in ('bridge', 'values')],
+        ))
+    stages.append(Stage(
+        'cube', run_cube,
+        deps=['demographics'] + [f"unpivot:{name}" for name in tech_names],
+        inputs=[csv_path(name) for name in ['demographics'] + tech_names],
+        outputs=[csv_path('tech_cube')],
+    ))
+    stages.append(Stage(
+        'factstore', run_fact_store,
+        deps=['demographics'] + [f"unpivot:{name}" for name in tech_names] + multiselect_stages,
+        inputs=[csv_path(name) for name in ['demographics'] + tech_names + multiselect_names],
+        outputs=[os.path.join(prepare.FACT_STORE_DIR, 'manifest.json')],
+    ))
+    stages.append(Stage(
+        'sketches', run_sketches,
+        deps=['demographics'] + [f"unpivot:{name}" for name in tech_names],
+        inputs=[csv_path(name) for name in ['demographics'] + tech_names],
+        outputs=[os.path.join(prepare.SKETCH_DIR, 'manifest.json')],
+    ))
+    stages.append(Stage(
+        'changes', run_changes,
+        deps=[f"unpivot:{name}" for name in tech_names],
+        inputs=[csv_path(name) for name in tech_names],
+        outputs=[csv_path(prepare.CHANGES_TABLE)],
+    ))
+    if consolidated:
+        stages.append(Stage(
+            'responses', run_responses,
+            deps=[f"unpivot:{name}" for name in tech_names],
+            inputs=[csv_path(name) for name in tech_names],
+            outputs=[csv_path(prepare.CONSOLIDATED_TABLE)],
+        ))
+    stages.append(Stage(
+        'prepare_report', run_prepare_report,
+        deps=['cube', 'changes'] + multiselect_stages + (['responses'] if consolidated else []),
+        inputs=[csv_path(name) for name in prepared_tables],
+        outputs=[os.path.join(output_dir, 'data_preparation_report.txt')],
+    ))
+
+    if include_upload:
+        if consolidated:
+            upload_tables = (
+                ['demographics', prepare.CONSOLIDATED_TABLE] + multiselect_names + [prepare.CHANGES_TABLE, 'tech_cube']
+            )
+            stages.extend(build_upload_stages(upload_tables, csv_path, CONSOLIDATED_VIEWS_SQL))
+        else:
+            stages.extend(build_upload_stages(prepared_tables, csv_path))
+
+    return stages
+
+def build_upload_stages(table_names, csv_path, views_sql=VIEWS_SQL):
+    """Этапы загрузки, проверки и обновления views"""
+    from tech_survey import bq_query, upload
+    from tech_survey import table_checksums as checksums
+
+    producer = {
+        'demographics': 'demographics',
+        'tech_cube': 'cube',
+        upload.CONSOLIDATED_TABLE: 'responses',
+        upload.CHANGES_TABLE: 'changes',
+    }
+    for table_prefix in upload.MULTISELECT_TABLES:
+        producer[f"{table_prefix}_bridge"] = producer[f"{table_prefix}_values"] = f"multiselect:{table_prefix}"
+
+    def run_dataset_check(ctx):
+        if not upload.check_dataset_exists(ctx.client(), upload.DATASET_ID):
+            raise RuntimeError(f"Dataset {upload.DATASET_ID} не найден")
+
+    def make_upload(table_name):
+        def run_upload_table(ctx):
+            result = upload.upload_csv_to_bigquery(
+                ctx.client(), upload.DATASET_ID, table_name, csv_path(table_name)
+            )
+            if not result['success']:
+                raise RuntimeError(result['error'] or 'Upload failed')
+            return {
+                'attempts': result['attempts'],
+                'checksum': checksums.compute_file_checksum(csv_path(table_name), table_name),
+            }
+
+        return run_upload_table
+
+    upload_stages = [f"upload:{name}" for name in table_names]
+
+    def run_verify(ctx):
+        local_checksums = {
+            name: ctx.results[f"upload:{name}"]['checksum']
+            for name in table_names
+            if ctx.results.get(f"upload:{name}")
+        }
+        mismatches = upload.verify_uploaded_tables(ctx.client(), upload.DATASET_ID, local_checksums)
+        failed = [name for name, fields in mismatches.items() if fields]
+        if failed:
+            # Следующий запуск загрузит эти таблицы заново, даже если CSV не изменились
+            raise StageFailed(
+                f"Контрольные суммы не совпали: {', '.join(failed)}",
+                invalidate=[f"upload:{name}" for name in failed],
+            )
+
+    def run_views(ctx):
+        with open(views_sql, 'r', encoding='utf-8') as f:
+            sql_text = f.read().replace(VIEWS_SQL_DATASET, f"{upload.PROJECT_ID}.{upload.DATASET_ID}")
+        statements = bq_query.split_sql_script(sql_text)
+        client = ctx.client()
+        for title, sql in statements:
+            client.query(sql).result()
+            print(f"  ✓ {title or sql.splitlines()[0]}")
+        return {'statements': len(statements)}
+
+    stages = [Stage('dataset', run_dataset_check)]
+    for name in table_names:
+        stages.append(Stage(
+            f"upload:{name}", make_upload(name),
+            deps=['dataset', producer.get(name, f"unpivot:{name}")],
+            inputs=[csv_path(name)],
+        ))
+    stages.append(Stage('verify', run_verify, deps=upload_stages))
+    stages.append(Stage('views', run_views, deps=['verify'], inputs=[views_sql]))
+    return stages
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def print_timings(report, wall_time):
+    """Таблица времени выполнения по этапам"""
+    print_header("⏱️  ВРЕМЯ ВЫПОЛНЕНИЯ ЭТАПОВ")
+
+    icons = {'done': '✓', 'skipped': '⏭️', 'failed': '❌', 'blocked': '⛔', 'excluded': '·'}
+    for name, info in report.items():
+        print(f"  {icons[info['status']]:<3} {name:<34} {info['status']:<9} {info['seconds']:>8.2f} сек")
+
+    stage_time = sum(info['seconds'] for info in report.values())
+    counts = {}
+    for info in report.values():
+        counts[info['status']] = counts.get(info['status'], 0) + 1
+
+    print("\n" + "-"*70)
+    print(f"  Этапов: " + ", ".join(f"{status} {count}" for status, count in counts.items()))
+    print(f"  Сумма времени этапов: {stage_time:.2f} сек")
+    print(f"  Фактическое время:    {wall_time:.2f} сек")
+
+def run(args):
+    """Команда `pipeline` (tech_survey.cli)"""
+    workers = args.workers or DEFAULT_WORKERS
+
+    print("\n" + "="*70)
+    print("🚀 КОНВЕЙЕР ДАННЫХ TECH SURVEY")
+    print("="*70)
+    print(f"Время начала: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    try:
+        stages = build_stages(include_upload=not args.no_upload, consolidated=args.consolidated)
+
+        selected = None
+        if args.only:
+            patterns = [p.strip() for p in args.only.split(',') if p.strip()]
+            selected = {s.name for s in stages if any(fnmatch.fnmatch(s.name, p) for p in patterns)}
+            print(f"Выбрано этапов: {len(selected)}/{len(stages)}")
+
+        print_header(f"▶️  ВЫПОЛНЕНИЕ ({len(stages)} этапов, потоков: {workers})")
+        start_time = time.time()
+        report = run_pipeline(stages, workers=workers, force=args.force, selected=selected)
+        print_timings(report, time.time() - start_time)
+
+    except Exception as e:
+        print_header("❌ ОШИБКА!")
+        print(f"\n{type(e).__name__}: {e}")
+        print("\nПолный traceback:")
+        print(traceback.format_exc())
+        return 1
+
+    failed = [name for name, info in report.items() if info['status'] in ('failed', 'blocked')]
+    if failed:
+        print_header("⚠️  КОНВЕЙЕР ЗАВЕРШЕН С ОШИБКАМИ")
+        print(f"\nНе выполнены: {', '.join(failed)}")
+        print(f"Логи этапов: {LOG_DIR}/")
+        print("\n🔁 Повторный запуск продолжит с невыполненных этапов:")
+        print("   python -m tech_survey pipeline")
+        return 1
+
+    print_header("✅ КОНВЕЙЕР ЗАВЕРШЕН УСПЕШНО!")
+    return 0
+
+def main(argv=None):
+    """Основная функция"""
+    return run(parse_command('pipeline', argv))
+
+# ============================================================================
+# ТОЧКА ВХОДА
+# ============================================================================
+
+if __name__ == "__main__":
+    exit(main())
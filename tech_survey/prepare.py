@@ -0,0 +1,1003 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/prepare.py
+
+Скрипт для подготовки данных опроса для загрузки в BigQuery.
+Создает:
+1. demographics.csv - демографические данные
+2. 8 unpivot таблиц для технологий (Language, Database, Platform, Webframe)
+3. tech_cube.csv - предвычисленный куб Technology × Country × Age × EdLevel
+4. factstore/ - CSR хранилище респондент → технологии (memory-mapped NumPy)
+5. sketches/ - скетчи HyperLogLog технология × сегмент (объединяемые оценки)
+6. technology_changes.csv - по каждому респонденту: какие технологии хочет изучить
+   (learn), продолжает использовать (keep) и хочет бросить (drop)
+7. technology_responses.csv - все unpivot таблицы одной таблицей (опция --consolidated)
+8. <prefix>_bridge.csv и <prefix>_values.csv - столбцы демографии с множественным
+   выбором (DevType, Employment, см. MULTISELECT_COLUMNS) в целочисленных кодах
+
+Unpivot таблицы отсортированы по ResponseId, Technology.
+
+С --append добавляются только новые ResponseId (см. incremental.py).
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from itertools import product
+import os
+import shutil
+import time
+from datetime import datetime
+
+from tech_survey.fact_store import FACT_STORE_DIR, write_fact_store
+from tech_survey.sketches import SKETCH_DIR, load_sketches, relative_error, write_sketches
+from tech_survey.table_writer import DEFAULT_WRITERS, TableWriter
+
+# ============================================================================
+# КОНСТАНТЫ И НАСТРОЙКИ
+# ============================================================================
+
+INPUT_FILE = 'data/raw/survey_results.csv'
+OUTPUT_DIR = 'data/processed'
+# Строки, добавленные prepare --append и еще не загруженные upload --append
+DELTA_DIR = os.path.join(OUTPUT_DIR, 'delta')
+
+# Технологические столбцы (из вашего анализа)
+TECH_COLUMNS_MAP = {
+    'LanguageHaveWorkedWith': ('language', 'haveworked'),
+    'LanguageWantToWorkWith': ('language', 'wanttowork'),
+    'DatabaseHaveWorkedWith': ('database', 'haveworked'),
+    'DatabaseWantToWorkWith': ('database', 'wanttowork'),
+    'PlatformHaveWorkedWith': ('platform', 'haveworked'),
+    'PlatformWantToWorkWith': ('platform', 'wanttowork'),
+    'WebframeHaveWorkedWith': ('webframe', 'haveworked'),
+    'WebframeWantToWorkWith': ('webframe', 'wanttowork')
+}
+
+# Демографические столбцы (ключевые для анализа)
+DEMO_COLUMNS = [
+    'ResponseId',
+    'Country',
+    'Age',
+    'EdLevel',
+    'YearsCode',
+    'YearsCodePro',
+    'Employment',
+    'RemoteWork',
+    'DevType',
+    'OrgSize'
+]
+
+# Столбцы демографии с множественным выбором ("A;B;C"): столбец → префикс таблиц
+# <prefix>_bridge (ResponseId, ValueId) и <prefix>_values (ValueId, Value).
+# В demographics столбец остается исходной строкой; новый столбец - только строка здесь
+MULTISELECT_COLUMNS = {
+    'DevType': 'devtype',
+    'Employment': 'employment',
+}
+
+# Измерения куба (фильтры дашборда) и метка агрегированного уровня
+CUBE_DIMENSIONS = ['Country', 'Age', 'EdLevel']
+CUBE_ALL_VALUE = 'ALL'
+
+# Единая таблица фактов (ResponseId, Category, Status, Technology) вместо 8 таблиц
+CONSOLIDATED_TABLE = 'technology_responses'
+
+# Изменения стека респондента: haveworked → wanttowork по каждой категории
+CHANGES_TABLE = 'technology_changes'
+# Коды изменений: только wanttowork / в обоих / только haveworked
+CHANGE_VALUES = np.array(['learn', 'keep', 'drop'], dtype=object)
+CHANGE_LEARN, CHANGE_KEEP, CHANGE_DROP = range(3)
+
+# ============================================================================
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ============================================================================
+
+def print_header(text):
+    """Печать красивого заголовка"""
+    print("\n" + "="*70)
+    print(text)
+    print("="*70)
+
+def print_subheader(text):
+    """Печать подзаголовка"""
+    print("\n" + "─"*70)
+    print(text)
+    print("─"*70)
+
+def safe_strip(value):
+    """Безопасное удаление пробелов"""
+    if pd.isna(value):
+        return None
+    return str(value).strip()
+
+# ============================================================================
+# ОСНОВНЫЕ ФУНКЦИИ
+# ============================================================================
+
+def load_data(filepath):
+    """Загрузка исходных данных"""
+    print_header("📂 ЗАГРУЗКА ИСХОДНЫХ ДАННЫХ")
+    
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"Файл '{filepath}' не найден!")
+    
+    print(f"Файл: {filepath}")
+    df = pd.read_csv(filepath, low_memory=False)
+    print(f"✓ Загружено строк: {len(df):,}")
+    print(f"✓ Столбцов: {len(df.columns):,}")
+    
+    return df
+
+def explode_multiselect(df, source_column, separator=';', value_column='Technology'):
+    """
+    Разворот столбца с множественным выбором ("A;B;C") в длинный формат
+    
+    Returns:
+        DataFrame (ResponseId, value_column) в порядке исходных строк,
+        без пустых значений
+    """
+    values = df.set_index('ResponseId')[source_column].dropna().astype(str)
+    
+    exploded = values.str.split(separator).explode().str.strip()
+    exploded = exploded[exploded.notna() & (exploded != '')]
+    
+    return pd.DataFrame({
+        'ResponseId': exploded.index.to_numpy(),
+        value_column: exploded.to_numpy(),
+    })
+
+def create_demographics_table(df):
+    """
+    Создание таблицы с демографическими данными
+    """
+    print_header("👥 СОЗДАНИЕ ТАБЛИЦЫ DEMOGRAPHICS")
+    
+    # Проверка наличия всех столбцов
+    available_columns = [col for col in DEMO_COLUMNS if col in df.columns]
+    missing_columns = [col for col in DEMO_COLUMNS if col not in df.columns]
+    
+    print(f"\n✓ Доступно столбцов: {len(available_columns)}/{len(DEMO_COLUMNS)}")
+    if missing_columns:
+        print(f"⚠️  Отсутствующие столбцы: {', '.join(missing_columns)}")
+    
+    # Создаем копию с доступными столбцами
+    demo_df = df[available_columns].copy()
+    
+    # Обработка пропущенных значений
+    print("\n🔧 Обработка пропущенных значений...")
+    
+    # Для каждого столбца (кроме ResponseId) создаем флаг валидности
+    for col in available_columns:
+        if col == 'ResponseId':
+            continue
+        
+        # Создаем флаг валидности
+        is_valid_col = f"{col}_IsValid"
+        demo_df[is_valid_col] = demo_df[col].notna() & (demo_df[col].astype(str).str.strip() != '')
+        
+        # Заменяем пропуски на "Not Specified"
+        demo_df[col] = demo_df[col].fillna('Not Specified')
+        demo_df[col] = demo_df[col].replace('', 'Not Specified')
+        
+        # Статистика
+        valid_count = demo_df[is_valid_col].sum()
+        valid_percent = (valid_count / len(demo_df) * 100)
+        print(f"  • {col}: {valid_count:,}/{len(demo_df):,} валидных ({valid_percent:.1f}%)")
+    
+    # Добавляем метаданные
+    demo_df['CreatedAt'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    print(f"\n✓ Итоговая таблица: {len(demo_df):,} строк × {len(demo_df.columns)} столбцов")
+    
+    return demo_df
+
+def create_technology_unpivot_table(df, source_column, tech_type, status):
+    """
+    Создание unpivot таблицы для конкретной технологии
+    
+    Args:
+        df: исходный DataFrame
+        source_column: название столбца с технологиями (например, 'LanguageHaveWorkedWith')
+        tech_type: тип технологии (например, 'language')
+        status: статус (например, 'haveworked')
+    
+    Returns:
+        DataFrame с развернутыми технологиями
+    """
+    print_subheader(f"🔨 Обработка: {source_column}")
+    
+    # Проверка наличия столбца
+    if source_column not in df.columns:
+        print(f"⚠️  Столбец '{source_column}' не найден, пропускаем")
+        return None
+    
+    # Статистика исходных данных
+    total_rows = len(df)
+    null_count = df[source_column].isna().sum()
+    valid_count = total_rows - null_count
+    
+    print(f"  Всего строк: {total_rows:,}")
+    print(f"  Валидных данных: {valid_count:,} ({valid_count/total_rows*100:.1f}%)")
+    
+    # Разворачиваем технологии (векторно, без цикла по строкам)
+    unpivot_df = explode_multiselect(df, source_column)
+    
+    if len(unpivot_df) == 0:
+        print(f"  ⚠️  Нет валидных данных для обработки")
+        return None
+    
+    # Удаляем дубликаты (если респондент указал одну технологию дважды)
+    before_dedup = len(unpivot_df)
+    unpivot_df = sort_fact_table(unpivot_df.drop_duplicates(subset=['ResponseId', 'Technology']))
+    after_dedup = len(unpivot_df)
+    
+    if before_dedup > after_dedup:
+        print(f"  ⚠️  Удалено дубликатов: {before_dedup - after_dedup:,}")
+    
+    # Статистика результата
+    unique_respondents = unpivot_df['ResponseId'].nunique()
+    unique_technologies = unpivot_df['Technology'].nunique()
+    avg_tech_per_respondent = len(unpivot_df) / unique_respondents
+    
+    print(f"  ✓ Создано записей: {len(unpivot_df):,}")
+    print(f"  ✓ Уникальных респондентов: {unique_respondents:,}")
+    print(f"  ✓ Уникальных технологий: {unique_technologies:,}")
+    print(f"  ✓ Среднее технологий на респондента: {avg_tech_per_respondent:.1f}")
+    
+    # Топ-5 технологий для проверки
+    top_5 = unpivot_df['Technology'].value_counts().head(5)
+    print(f"\n  Топ-5 технологий:")
+    for tech, count in top_5.items():
+        print(f"    {count:>5,} - {tech}")
+    
+    return unpivot_df
+
+def sort_fact_table(tech_df):
+    """
+    Сортировка таблицы фактов по ResponseId, Technology (по целочисленным
+    ключам: коды технологий в алфавитном порядке)
+    
+    Отсортированные таблицы лучше сжимаются (Parquet, BigQuery) и позволяют
+    сравнивать таблицы слиянием за один проход (create_technology_changes).
+    """
+    tech_codes, _ = pd.factorize(tech_df['Technology'], sort=True)
+    order = np.lexsort((tech_codes, tech_df['ResponseId'].to_numpy()))
+    return tech_df.iloc[order].reset_index(drop=True)
+
+def sort_by_response(df):
+    """
+    Устойчивая сортировка по ResponseId: объединение отсортированных таблиц
+    категорий (в порядке TECH_COLUMNS_MAP) упорядочивается по ResponseId,
+    затем по категории и статусу, затем по Technology
+    """
+    order = np.argsort(df['ResponseId'].to_numpy(), kind='stable')
+    return df.iloc[order].reset_index(drop=True)
+
+def encode_multiselect_values(values, labels=None):
+    """
+    Целочисленные коды значений по словарю
+
+    Значения, которых нет в словаре, добавляются в его конец (в алфавитном
+    порядке), поэтому коды прежних значений не меняются и уже загруженные
+    строки bridge таблицы остаются верными после prepare --append.
+
+    Returns:
+        (коды int32, словарь - список значений, индекс = код)
+    """
+    labels = list(labels or [])
+    labels += sorted(set(values).difference(labels))
+    codes = pd.Categorical(values, categories=labels).codes.astype(np.int32)
+    return codes, labels
+
+def create_multiselect_tables(df, source_column, table_prefix, labels=None):
+    """
+    Bridge таблица и словарь значений для столбца с множественным выбором
+
+    Разворот - тот же векторный explode_multiselect, что и у технологий;
+    значения заменяются кодами, поэтому фильтр по роли или занятости -
+    соединение по ValueId (в хранилище фактов - проверка битовой маски),
+    а не LIKE '%...%' по строке demographics.
+
+    Args:
+        source_column: столбец исходных данных (например, 'DevType')
+        table_prefix: префикс таблиц (например, 'devtype')
+        labels: словарь прежней подготовки (prepare --append)
+
+    Returns:
+        (bridge DataFrame (ResponseId, ValueId), отсортирован по ResponseId, ValueId;
+         словарь DataFrame (ValueId, Value)) или (None, None), если ответов нет
+    """
+    print_subheader(f"🔨 Обработка: {source_column} → {table_prefix}_bridge")
+
+    if source_column not in df.columns:
+        print(f"⚠️  Столбец '{source_column}' не найден, пропускаем")
+        return None, None
+
+    pairs = explode_multiselect(df, source_column, value_column='Value').drop_duplicates()
+    if len(pairs) == 0:
+        print(f"  ⚠️  Нет валидных данных для обработки")
+        return None, None
+
+    codes, labels = encode_multiselect_values(pairs['Value'].to_numpy(), labels)
+    response_ids = pairs['ResponseId'].to_numpy(np.int64)
+    order = np.lexsort((codes, response_ids))
+
+    bridge_df = pd.DataFrame({'ResponseId': response_ids[order], 'ValueId': codes[order]})
+    values_df = pd.DataFrame({'ValueId': np.arange(len(labels), dtype=np.int32), 'Value': labels})
+
+    unique_respondents = len(np.unique(response_ids))
+    print(f"  ✓ Создано записей: {len(bridge_df):,}")
+    print(f"  ✓ Уникальных респондентов: {unique_respondents:,}")
+    print(f"  ✓ Значений в словаре: {len(labels):,}")
+    print(f"  ✓ Среднее значений на респондента: {len(bridge_df) / unique_respondents:.1f}")
+
+    counts = np.bincount(codes, minlength=len(labels))
+    print(f"\n  Топ-5 значений:")
+    for code in np.argsort(-counts, kind='stable')[:5]:
+        print(f"    {counts[code]:>5,} - {labels[code]}")
+
+    return bridge_df, values_df
+
+def merge_sorted_keys(have_keys, want_keys):
+    """
+    Слияние двух отсортированных массивов уникальных ключей
+    
+    Устойчивая сортировка конкатенации двух отсортированных серий -
+    линейное слияние; одинаковые ключи оказываются рядом (сначала have).
+    
+    Returns:
+        (ключи объединения по возрастанию, коды CHANGE_LEARN / CHANGE_KEEP / CHANGE_DROP)
+    """
+    keys = np.concatenate([have_keys, want_keys])
+    order = np.argsort(keys, kind='stable')
+    merged = keys[order]
+    
+    # Пара одинаковых ключей: первый (have) - keep, второй (want) пропускается
+    same = merged[1:] == merged[:-1]
+    first = np.append(same, False)
+    second = np.insert(same, 0, False)
+    
+    changes = np.where(order >= len(have_keys), CHANGE_LEARN, CHANGE_DROP)
+    changes[first] = CHANGE_KEEP
+    return merged[~second], changes[~second]
+
+def create_technology_changes(tech_tables):
+    """
+    Таблица изменений стека по каждому респонденту и категории:
+    learn - хочет работать, но не работал; keep - работал и хочет продолжать;
+    drop - работал, но не хочет продолжать
+    
+    Учитываются респонденты, ответившие на оба вопроса категории (без ответа
+    на wanttowork все технологии попали бы в drop). Ключ пары - целое
+    ResponseId * число технологий + код технологии, поэтому отсортированные
+    unpivot таблицы (sort_fact_table) сравниваются линейным слиянием
+    без соединения по строкам.
+    
+    Returns:
+        DataFrame (ResponseId, Category, Technology, Change), отсортирован
+        по ResponseId, Category (в порядке TECH_COLUMNS_MAP), Technology -
+        строки новых респондентов (prepare --append) дописываются в конец
+    """
+    print_header(f"🔀 СОЗДАНИЕ ТАБЛИЦЫ {CHANGES_TABLE.upper()}")
+    
+    parts = []
+    for tech_type in dict.fromkeys(tech_type for tech_type, _ in TECH_COLUMNS_MAP.values()):
+        have_df = tech_tables.get((tech_type, 'haveworked'))
+        want_df = tech_tables.get((tech_type, 'wanttowork'))
+        if have_df is None or want_df is None:
+            print(f"  ⚠️  {tech_type}: нет haveworked или wanttowork, пропускаем")
+            continue
+        
+        # Общие коды технологий обеих таблиц (алфавитный порядок = порядок сортировки таблиц)
+        codes, labels = pd.factorize(
+            pd.concat([have_df['Technology'], want_df['Technology']], ignore_index=True), sort=True
+        )
+        have_codes, want_codes = codes[:len(have_df)], codes[len(have_df):]
+        have_ids = have_df['ResponseId'].to_numpy(np.int64)
+        want_ids = want_df['ResponseId'].to_numpy(np.int64)
+        
+        # Респонденты, ответившие на оба вопроса
+        answered = np.intersect1d(have_ids, want_ids)
+        in_have = np.isin(have_ids, answered)
+        in_want = np.isin(want_ids, answered)
+        
+        n_labels = len(labels)
+        keys, changes = merge_sorted_keys(
+            have_ids[in_have] * n_labels + have_codes[in_have],
+            want_ids[in_want] * n_labels + want_codes[in_want],
+        )
+        
+        parts.append(pd.DataFrame({
+            'ResponseId': keys // n_labels,
+            'Category': tech_type,
+            'Technology': np.asarray(labels, dtype=object)[keys % n_labels],
+            'Change': CHANGE_VALUES[changes],
+        }))
+        
+        counts = np.bincount(changes, minlength=len(CHANGE_VALUES))
+        print(f"  • {tech_type}: респондентов {len(answered):,}, "
+              + ", ".join(f"{name} {count:,}" for name, count in zip(CHANGE_VALUES, counts)))
+    
+    if not parts:
+        print("  ⚠️  Нет пар haveworked / wanttowork")
+        return None
+    
+    changes_df = sort_by_response(pd.concat(parts, ignore_index=True))
+    print(f"\n✓ Записей: {len(changes_df):,}")
+    return changes_df
+
+def create_technology_responses(tech_tables):
+    """
+    Единая таблица фактов в длинном формате: все unpivot таблицы
+    со столбцами Category и Status (новая категория - только строка в TECH_COLUMNS_MAP),
+    отсортирована по ResponseId, Category, Status, Technology
+    """
+    print_header(f"🧾 СОЗДАНИЕ ЕДИНОЙ ТАБЛИЦЫ {CONSOLIDATED_TABLE.upper()}")
+    
+    parts = []
+    for (tech_type, status), tech_df in tech_tables.items():
+        if tech_df is None:
+            continue
+        parts.append(pd.DataFrame({
+            'ResponseId': tech_df['ResponseId'].to_numpy(),
+            'Category': tech_type,
+            'Status': status,
+            'Technology': tech_df['Technology'].to_numpy(),
+        }))
+    
+    if not parts:
+        print("  ⚠️  Нет технологических таблиц")
+        return None
+    
+    responses_df = sort_by_response(pd.concat(parts, ignore_index=True))
+    print(f"  Таблиц объединено: {len(parts)}")
+    print(f"  Записей: {len(responses_df):,}, уникальных респондентов: {responses_df['ResponseId'].nunique():,}")
+    
+    return responses_df
+
+def create_technology_cube(demo_df, tech_tables):
+    """
+    Создание куба агрегатов Technology × Category × Status × Country × Age × EdLevel
+    
+    Для каждого подмножества измерений (8 уровней rollup) считается число
+    респондентов, упомянувших технологию. Свернутое измерение получает
+    значение CUBE_ALL_VALUE, а GroupingId - битовая маска свернутых измерений
+    (как GROUPING_ID в SQL: Country=4, Age=2, EdLevel=1).
+    SegmentRespondents - все респонденты сегмента из demographics, т.е. тот же
+    знаменатель, что и в views (COUNT(*) FROM demographics).
+    
+    Args:
+        demo_df: таблица demographics (пропуски уже заменены на 'Not Specified')
+        tech_tables: dict {(tech_type, status): unpivot DataFrame}
+    
+    Returns:
+        DataFrame с кубом агрегатов
+    """
+    print_header("🧊 СОЗДАНИЕ КУБА АГРЕГАТОВ (TECH_CUBE)")
+    
+    dimensions = [col for col in CUBE_DIMENSIONS if col in demo_df.columns]
+    if len(dimensions) < len(CUBE_DIMENSIONS):
+        missing = sorted(set(CUBE_DIMENSIONS) - set(dimensions))
+        print(f"⚠️  Измерения отсутствуют в demographics: {', '.join(missing)}")
+    
+    frames = [
+        tech_df[['ResponseId', 'Technology']].assign(Category=tech_type, Status=status)
+        for (tech_type, status), tech_df in tech_tables.items()
+        if tech_df is not None and len(tech_df) > 0
+    ]
+    if not frames:
+        print("⚠️  Нет технологических таблиц для построения куба")
+        return None
+    
+    # Одно соединение с demographics на все уровни куба
+    facts = pd.concat(frames, ignore_index=True)
+    facts = facts.merge(demo_df[['ResponseId'] + dimensions], on='ResponseId', how='inner')
+    print(f"  Фактов (респондент × технология): {len(facts):,}")
+    
+    cube_levels = []
+    for mask in product([False, True], repeat=len(dimensions)):
+        grouped = [dim for dim, rolled_up in zip(dimensions, mask) if not rolled_up]
+        grouping_id = sum(1 << (len(dimensions) - 1 - i) for i, rolled_up in enumerate(mask) if rolled_up)
+        
+        counts = (
+            facts.groupby(['Category', 'Status', 'Technology'] + grouped, observed=True)
+            .size()
+            .rename('RespondentCount')
+            .reset_index()
+        )
+        
+        # Знаменатель: размер сегмента по demographics
+        if grouped:
+            segments = demo_df.groupby(grouped, observed=True).size().rename('SegmentRespondents').reset_index()
+            counts = counts.merge(segments, on=grouped, how='left')
+        else:
+            counts['SegmentRespondents'] = len(demo_df)
+        
+        for dim, rolled_up in zip(dimensions, mask):
+            if rolled_up:
+                counts[dim] = CUBE_ALL_VALUE
+        counts['GroupingId'] = grouping_id
+        
+        level_name = ' × '.join(grouped) if grouped else 'итого'
+        print(f"  • GroupingId={grouping_id} ({level_name}): {len(counts):,} строк")
+        cube_levels.append(counts)
+    
+    cube_df = pd.concat(cube_levels, ignore_index=True)
+    cube_df['Percentage'] = (cube_df['RespondentCount'] / cube_df['SegmentRespondents'] * 100).round(2)
+    cube_df = cube_df[
+        ['Category', 'Status', 'Technology'] + dimensions
+        + ['GroupingId', 'RespondentCount', 'SegmentRespondents', 'Percentage']
+    ]
+    
+    print(f"\n✓ Итоговый куб: {len(cube_df):,} строк × {len(cube_df.columns)} столбцов")
+    
+    return cube_df
+
+def create_segment_sizes(demo_df, dimensions):
+    """
+    Размеры сегментов всех уровней rollup (знаменатель процентов куба)
+    
+    Returns:
+        DataFrame: измерения (свернутые - CUBE_ALL_VALUE), GroupingId, SegmentRespondents
+    """
+    levels = []
+    for mask in product([False, True], repeat=len(dimensions)):
+        grouped = [dim for dim, rolled_up in zip(dimensions, mask) if not rolled_up]
+        grouping_id = sum(1 << (len(dimensions) - 1 - i) for i, rolled_up in enumerate(mask) if rolled_up)
+        
+        if grouped:
+            sizes = demo_df.groupby(grouped, observed=True).size().rename('SegmentRespondents').reset_index()
+        else:
+            sizes = pd.DataFrame({'SegmentRespondents': [len(demo_df)]})
+        for dim, rolled_up in zip(dimensions, mask):
+            if rolled_up:
+                sizes[dim] = CUBE_ALL_VALUE
+        sizes['GroupingId'] = grouping_id
+        levels.append(sizes)
+    
+    return pd.concat(levels, ignore_index=True)[dimensions + ['GroupingId', 'SegmentRespondents']]
+
+def update_technology_cube(cube_df, demo_df, new_demo_df, new_tech_tables):
+    """
+    Обновление куба агрегатов новыми респондентами без пересчета по всем фактам
+    
+    RespondentCount складывается с кубом, построенным только по новым
+    респондентам; SegmentRespondents и Percentage пересчитываются для всех
+    строк по размерам сегментов demographics (меняются и у технологий,
+    которых новые респонденты не указали). Порядок строк - как у
+    create_technology_cube, поэтому результат совпадает с полным пересчетом.
+    
+    Args:
+        cube_df: прежний куб
+        demo_df: измерения куба всех респондентов, включая новых
+            (prepare --append берет их из хранилища фактов, FactStore.dimension_values)
+        new_demo_df: demographics только новых респондентов
+        new_tech_tables: dict {(tech_type, status): unpivot DataFrame новых респондентов}
+    
+    Returns:
+        DataFrame с обновленным кубом
+    """
+    dimensions = [col for col in CUBE_DIMENSIONS if col in cube_df.columns]
+    keys = ['Category', 'Status', 'Technology'] + dimensions + ['GroupingId']
+    
+    previous_rows = len(cube_df)
+    delta_df = create_technology_cube(new_demo_df, new_tech_tables)
+    counts = cube_df[keys + ['RespondentCount']]
+    if delta_df is not None:
+        counts = pd.concat([counts, delta_df[keys + ['RespondentCount']]], ignore_index=True)
+        counts = counts.groupby(keys, sort=False, observed=True)['RespondentCount'].sum().reset_index()
+    
+    cube_df = counts.merge(create_segment_sizes(demo_df, dimensions), on=dimensions + ['GroupingId'], how='left')
+    cube_df['Percentage'] = (cube_df['RespondentCount'] / cube_df['SegmentRespondents'] * 100).round(2)
+    cube_df = cube_df.sort_values(['GroupingId', 'Category', 'Status', 'Technology'] + dimensions, kind='stable')
+    
+    print(f"\n✓ Обновленный куб: {len(cube_df):,} строк (было {previous_rows:,})")
+    
+    return cube_df[keys + ['RespondentCount', 'SegmentRespondents', 'Percentage']].reset_index(drop=True)
+
+def create_fact_store(demo_df, tech_tables, output_dir=FACT_STORE_DIR, multiselect=None):
+    """
+    Запись CSR хранилища фактов (см. fact_store.py)
+    
+    Args:
+        multiselect: dict {столбец: (bridge DataFrame, словарь значений)} -
+            сохраняются битовыми масками по респондентам
+    """
+    print_header("🗄️  СОЗДАНИЕ ХРАНИЛИЩА ФАКТОВ (CSR)")
+    
+    manifest = write_fact_store(demo_df, tech_tables, output_dir, multiselect)
+    
+    total_size = sum(f.stat().st_size for f in Path(output_dir).rglob('*') if f.is_file()) / 1024
+    print(f"  Респондентов: {manifest['respondents']:,}")
+    for name, info in manifest['tables'].items():
+        print(f"  • {name}: {info['pairs']:,} пар")
+        if info['dropped']:
+            print(f"    ⚠️  Пропущено пар без респондента в demographics: {info['dropped']:,}")
+    for dim, n_values in manifest.get('multiselect', {}).items():
+        print(f"  • {dim}: битовые маски по {n_values} значениям")
+    print(f"\n✓ Сохранено: {output_dir}/ ({total_size:.1f} KB)")
+    
+    return manifest
+
+def create_sketches(demo_df, tech_tables, output_dir=SKETCH_DIR):
+    """
+    Запись скетчей HyperLogLog (см. sketches.py) и сверка оценок с точными значениями
+    """
+    print_header("🧮 СОЗДАНИЕ СКЕТЧЕЙ HYPERLOGLOG")
+    
+    manifest = write_sketches(demo_df, tech_tables, output_dir)
+    sketches = load_sketches(output_dir)
+    
+    total_size = sum(f.stat().st_size for f in Path(output_dir).rglob('*') if f.is_file()) / 1024
+    print(f"  Год опроса: {manifest['survey_year']}, точность p={manifest['precision']} "
+          f"(стандартная ошибка {relative_error(manifest['precision']):.2%})")
+    
+    # Сверка: респонденты всего и по каждой таблице (любая технология)
+    checks = [('respondents', demo_df['ResponseId'].nunique(), sketches.estimate())]
+    for (tech_type, status), tech_df in tech_tables.items():
+        if tech_df is not None:
+            checks.append((
+                f"{tech_type}_{status}",
+                tech_df['ResponseId'].nunique(),
+                sketches.estimate(tech_type, status),
+            ))
+    
+    for name, exact, estimate in checks:
+        info = manifest['tables'][name]
+        error = abs(estimate - exact) / exact if exact else 0
+        print(f"  • {name}: {info['sketches']:,} скетчей, {info['registers']:,} регистров, "
+              f"оценка {estimate:,.0f} / точно {exact:,} ({error:.2%})")
+    print(f"\n✓ Сохранено: {output_dir}/ ({total_size:.1f} KB)")
+    
+    return manifest
+
+def clear_delta_dir(delta_dir=DELTA_DIR):
+    """Удаление дельт prepare --append: полная подготовка заменяет все таблицы"""
+    if os.path.isdir(delta_dir):
+        shutil.rmtree(delta_dir)
+        print(f"  🗑️  Удалены дельты прошлых дозагрузок: {delta_dir}/")
+
+def print_timings(timings, writer_stats, writers, total_seconds):
+    """
+    Время этапов подготовки и сколько ожидания записи скрыто фоновыми потоками
+    
+    Время этапов включает ожидание места в очереди записи (backpressure) и,
+    на одном ядре, конкуренцию с потоками записи за процессор - поэтому
+    выигрыш проверяется по общему времени в сравнении с --writers 0.
+    """
+    print_header("⏱️  ВРЕМЯ ЭТАПОВ")
+    
+    for name, seconds in timings.items():
+        print(f"  {name:<44} {seconds:>7.2f} сек")
+    print(f"  {'итого вычисление и запись':<44} {total_seconds:>7.2f} сек")
+    
+    waited = writer_stats['backpressure_seconds'] + writer_stats['drain_seconds']
+    hidden = writer_stats['hidden_seconds']
+    share = hidden / writer_stats['write_cpu_seconds'] if writer_stats['write_cpu_seconds'] else 0
+    
+    print("\n" + "-"*70)
+    print(f"  Запись таблиц: {writer_stats['tables']}, потоков: {writers}")
+    print(f"  {'запись (процессорное время)':<44} {writer_stats['write_cpu_seconds']:>7.2f} сек")
+    print(f"  {'запись (по часам, в потоках)':<44} {writer_stats['write_seconds']:>7.2f} сек")
+    print(f"  {'основной поток ждал очередь':<44} {writer_stats['backpressure_seconds']:>7.2f} сек")
+    print(f"  {'основной поток ждал окончания записи':<44} {writer_stats['drain_seconds']:>7.2f} сек")
+    print(f"  {'скрыто ожидания записи':<44} {hidden:>7.2f} сек ({share:.0%}, ждали {waited:.2f} сек)")
+
+def validate_data_integrity(df_original, created_files):
+    """
+    Валидация целостности созданных данных
+    """
+    print_header("🔍 ВАЛИДАЦИЯ ЦЕЛОСТНОСТИ ДАННЫХ")
+    
+    total_respondents = len(df_original)
+    print(f"\nИсходное количество респондентов: {total_respondents:,}")
+    
+    # Проверка demographics
+    demo_file = os.path.join(OUTPUT_DIR, 'demographics.csv')
+    if os.path.exists(demo_file):
+        demo_df = pd.read_csv(demo_file)
+        demo_count = len(demo_df)
+        
+        if demo_count == total_respondents:
+            print(f"✓ demographics.csv: {demo_count:,} строк (совпадает)")
+        else:
+            print(f"⚠️  demographics.csv: {demo_count:,} строк (ожидалось {total_respondents:,})")
+    
+    # Проверка технологических таблиц
+    print("\nПроверка технологических таблиц:")
+    for tech_file in created_files:
+        if any(name in tech_file for name in ('demographics', 'tech_cube', CONSOLIDATED_TABLE, CHANGES_TABLE,
+                                              '_bridge', '_values')):
+            continue
+        
+        tech_df = pd.read_csv(tech_file)
+        unique_respondents = tech_df['ResponseId'].nunique()
+        total_records = len(tech_df)
+        
+        filename = os.path.basename(tech_file)
+        print(f"\n  {filename}:")
+        print(f"    Всего записей: {total_records:,}")
+        print(f"    Уникальных респондентов: {unique_respondents:,}")
+        print(f"    Среднее на респондента: {total_records/unique_respondents:.1f}")
+        
+        # Проверка на респондентов, которых нет в исходной таблице
+        original_ids = set(df_original['ResponseId'])
+        tech_ids = set(tech_df['ResponseId'])
+        missing_ids = tech_ids - original_ids
+        
+        if missing_ids:
+            print(f"    ⚠️  Найдено {len(missing_ids)} ID не из исходной таблицы!")
+        else:
+            print(f"    ✓ Все ResponseId валидны")
+    
+    # Проверка bridge таблиц: коды есть в словаре, респонденты - в исходной таблице
+    for table_prefix in MULTISELECT_COLUMNS.values():
+        bridge_file = os.path.join(OUTPUT_DIR, f"{table_prefix}_bridge.csv")
+        values_file = os.path.join(OUTPUT_DIR, f"{table_prefix}_values.csv")
+        if bridge_file not in created_files or values_file not in created_files:
+            continue
+        
+        bridge = pd.read_csv(bridge_file)
+        values = pd.read_csv(values_file)
+        unknown_codes = int((~bridge['ValueId'].isin(values['ValueId'])).sum())
+        unknown_ids = int((~bridge['ResponseId'].isin(df_original['ResponseId'])).sum())
+        
+        print(f"\n  {table_prefix}_bridge.csv: {len(bridge):,} записей, {len(values):,} значений")
+        if unknown_codes or unknown_ids:
+            print(f"    ⚠️  Кодов не из словаря: {unknown_codes:,}, ResponseId не из исходной таблицы: {unknown_ids:,}")
+        else:
+            print(f"    ✓ Все ValueId и ResponseId валидны")
+    
+    # Проверка куба: итоговый уровень должен совпадать с unpivot таблицами
+    cube_file = os.path.join(OUTPUT_DIR, 'tech_cube.csv')
+    if cube_file in created_files:
+        print("\nПроверка куба агрегатов:")
+        cube_df = pd.read_csv(cube_file)
+        totals = cube_df[cube_df['GroupingId'] == cube_df['GroupingId'].max()]
+        totals = totals.groupby(['Category', 'Status'])['RespondentCount'].sum()
+        
+        mismatches = 0
+        for (tech_type, status), cube_total in totals.items():
+            tech_file = os.path.join(OUTPUT_DIR, f"{tech_type}_{status}.csv")
+            if tech_file in created_files:
+                expected = len(pd.read_csv(tech_file))
+                if cube_total != expected:
+                    mismatches += 1
+                    print(f"  ⚠️  {tech_type}_{status}: {cube_total:,} в кубе (ожидалось {expected:,})")
+        
+        if mismatches == 0:
+            print(f"  ✓ Итоги куба совпадают с unpivot таблицами ({len(totals)} таблиц)")
+    
+    # Проверка изменений: keep + drop = haveworked, learn + keep = wanttowork
+    # (по респондентам, ответившим на оба вопроса категории)
+    changes_file = os.path.join(OUTPUT_DIR, f"{CHANGES_TABLE}.csv")
+    if changes_file in created_files:
+        print(f"\nПроверка {CHANGES_TABLE}:")
+        changes = pd.read_csv(changes_file, usecols=['Category', 'Change'])
+        counts = changes.groupby(['Category', 'Change']).size()
+        
+        mismatches = 0
+        for tech_type in changes['Category'].unique():
+            have = pd.read_csv(os.path.join(OUTPUT_DIR, f"{tech_type}_haveworked.csv"), usecols=['ResponseId'])
+            want = pd.read_csv(os.path.join(OUTPUT_DIR, f"{tech_type}_wanttowork.csv"), usecols=['ResponseId'])
+            answered = set(have['ResponseId']) & set(want['ResponseId'])
+            expected = {
+                'haveworked': int(have['ResponseId'].isin(answered).sum()),
+                'wanttowork': int(want['ResponseId'].isin(answered).sum()),
+            }
+            actual = {
+                'haveworked': int(counts.get((tech_type, 'keep'), 0) + counts.get((tech_type, 'drop'), 0)),
+                'wanttowork': int(counts.get((tech_type, 'learn'), 0) + counts.get((tech_type, 'keep'), 0)),
+            }
+            for status in expected:
+                if actual[status] != expected[status]:
+                    mismatches += 1
+                    print(f"  ⚠️  {tech_type}/{status}: {actual[status]:,} (ожидалось {expected[status]:,})")
+        
+        if mismatches == 0:
+            print(f"  ✓ {len(changes):,} строк, совпадает с unpivot таблицами")
+    
+    # Проверка единой таблицы: строк столько же, сколько во всех unpivot таблицах
+    responses_file = os.path.join(OUTPUT_DIR, f"{CONSOLIDATED_TABLE}.csv")
+    if responses_file in created_files:
+        print(f"\nПроверка {CONSOLIDATED_TABLE}:")
+        responses = pd.read_csv(responses_file, usecols=['Category', 'Status'])
+        counts = responses.groupby(['Category', 'Status']).size()
+        
+        mismatches = 0
+        for (tech_type, status), count in counts.items():
+            tech_file = os.path.join(OUTPUT_DIR, f"{tech_type}_{status}.csv")
+            expected = len(pd.read_csv(tech_file)) if tech_file in created_files else None
+            if count != expected:
+                mismatches += 1
+                print(f"  ⚠️  {tech_type}/{status}: {count:,} строк (ожидалось {expected})")
+        
+        if mismatches == 0:
+            print(f"  ✓ {len(responses):,} строк, совпадает с unpivot таблицами ({len(counts)} таблиц)")
+
+def create_summary_report(created_files):
+    """Создание итогового отчета"""
+    print_header("📄 СОЗДАНИЕ ИТОГОВОГО ОТЧЕТА")
+    
+    report_lines = []
+    report_lines.append("="*70)
+    report_lines.append("ОТЧЕТ ПО ПОДГОТОВКЕ ДАННЫХ ДЛЯ BIGQUERY")
+    report_lines.append("="*70)
+    report_lines.append(f"\nДата создания: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    report_lines.append(f"\nСоздано файлов: {len(created_files)}")
+    report_lines.append("\n" + "-"*70)
+    report_lines.append("СПИСОК СОЗДАННЫХ ФАЙЛОВ:")
+    report_lines.append("-"*70)
+    
+    total_size = 0
+    for filepath in created_files:
+        filename = os.path.basename(filepath)
+        file_size = os.path.getsize(filepath) / 1024  # KB
+        total_size += file_size
+        
+        df = pd.read_csv(filepath)
+        rows = len(df)
+        cols = len(df.columns)
+        
+        report_lines.append(f"\n{filename}:")
+        report_lines.append(f"  Строк: {rows:,}")
+        report_lines.append(f"  Столбцов: {cols}")
+        report_lines.append(f"  Размер: {file_size:.1f} KB")
+    
+    report_lines.append("\n" + "-"*70)
+    report_lines.append(f"ИТОГО: {total_size:.1f} KB ({total_size/1024:.2f} MB)")
+    report_lines.append("="*70)
+    
+    report_text = "\n".join(report_lines)
+    
+    # Сохранение отчета
+    report_path = os.path.join(OUTPUT_DIR, 'data_preparation_report.txt')
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(report_text)
+    
+    print(report_text)
+    print(f"\n✓ Отчет сохранен: {report_path}")
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def main(consolidated=False, writers=DEFAULT_WRITERS):
+    """
+    Основная функция выполнения
+    
+    Args:
+        consolidated: дополнительно создать единую таблицу technology_responses
+        writers: потоков фоновой записи таблиц (0 - запись сразу после вычисления)
+    """
+    
+    print("\n" + "="*70)
+    print("🚀 ПОДГОТОВКА ДАННЫХ ДЛЯ BIGQUERY")
+    print("="*70)
+    print(f"Время начала: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    # Создание выходной директории
+    Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+    
+    clear_delta_dir()
+    
+    created_files = []
+    timings = {}
+    
+    try:
+        # ===== ШАГ 1: ЗАГРУЗКА ДАННЫХ =====
+        start = time.perf_counter()
+        df = load_data(INPUT_FILE)
+        timings['загрузка исходных данных'] = time.perf_counter() - start
+        
+        # Таблицы пишутся в фоне, пока считаются следующие (см. table_writer.py)
+        tables_start = time.perf_counter()
+        with TableWriter(workers=writers) as writer:
+            
+            # ===== ШАГ 2: СОЗДАНИЕ DEMOGRAPHICS =====
+            start = time.perf_counter()
+            demo_df = create_demographics_table(df)
+            created_files.append(writer.submit(demo_df, 'demographics.csv', OUTPUT_DIR))
+            
+            print_header("🏷️  BRIDGE ТАБЛИЦЫ СТОЛБЦОВ С МНОЖЕСТВЕННЫМ ВЫБОРОМ")
+            
+            multiselect = {}
+            for source_column, table_prefix in MULTISELECT_COLUMNS.items():
+                bridge_df, values_df = create_multiselect_tables(df, source_column, table_prefix)
+                if bridge_df is None:
+                    continue
+                multiselect[source_column] = (bridge_df, values_df['Value'].tolist())
+                for table_df, suffix in ((bridge_df, 'bridge'), (values_df, 'values')):
+                    created_files.append(writer.submit(table_df, f"{table_prefix}_{suffix}.csv", OUTPUT_DIR))
+            timings['demographics и bridge таблицы'] = time.perf_counter() - start
+            
+            # ===== ШАГ 3: СОЗДАНИЕ ТЕХНОЛОГИЧЕСКИХ ТАБЛИЦ =====
+            print_header("🔧 СОЗДАНИЕ ТЕХНОЛОГИЧЕСКИХ ТАБЛИЦ (UNPIVOT)")
+            
+            start = time.perf_counter()
+            tech_tables = {}
+            for source_column, (tech_type, status) in TECH_COLUMNS_MAP.items():
+                # Создаем unpivot таблицу
+                tech_df = create_technology_unpivot_table(df, source_column, tech_type, status)
+                
+                # Сохраняем (в фоне)
+                if tech_df is not None:
+                    tech_tables[(tech_type, status)] = tech_df
+                    created_files.append(writer.submit(tech_df, f"{tech_type}_{status}.csv", OUTPUT_DIR))
+            timings['unpivot'] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            changes_df = create_technology_changes(tech_tables)
+            created_files.append(writer.submit(changes_df, f"{CHANGES_TABLE}.csv", OUTPUT_DIR))
+            
+            if consolidated:
+                responses_df = create_technology_responses(tech_tables)
+                created_files.append(writer.submit(responses_df, f"{CONSOLIDATED_TABLE}.csv", OUTPUT_DIR))
+            timings[CHANGES_TABLE + (f" и {CONSOLIDATED_TABLE}" if consolidated else '')] = time.perf_counter() - start
+            
+            # ===== ШАГ 4: КУБ АГРЕГАТОВ =====
+            start = time.perf_counter()
+            cube_df = create_technology_cube(demo_df, tech_tables)
+            created_files.append(writer.submit(cube_df, 'tech_cube.csv', OUTPUT_DIR))
+            timings['tech_cube'] = time.perf_counter() - start
+            
+            # ===== ШАГ 5: ХРАНИЛИЩЕ ФАКТОВ (CSR) =====
+            start = time.perf_counter()
+            create_fact_store(demo_df, tech_tables, multiselect=multiselect)
+            timings['factstore'] = time.perf_counter() - start
+            
+            # ===== ШАГ 6: СКЕТЧИ HYPERLOGLOG =====
+            start = time.perf_counter()
+            create_sketches(demo_df, tech_tables)
+            timings['sketches'] = time.perf_counter() - start
+            
+            print_header(f"💾 ЗАПИСЬ ТАБЛИЦ (потоков: {writers})")
+        
+        created_files = [path for path in created_files if path]
+        print_timings(timings, writer.stats, writers, time.perf_counter() - tables_start)
+        
+        # ===== ШАГ 7: ВАЛИДАЦИЯ =====
+        validate_data_integrity(df, created_files)
+        
+        # ===== ШАГ 8: ИТОГОВЫЙ ОТЧЕТ =====
+        create_summary_report(created_files)
+        
+        # ===== ЗАВЕРШЕНИЕ =====
+        print_header("✅ ПОДГОТОВКА ДАННЫХ ЗАВЕРШЕНА УСПЕШНО!")
+        print(f"\n📁 Все файлы сохранены в: {OUTPUT_DIR}/")
+        print(f"📊 Создано файлов: {len(created_files)}")
+        print(f"⏱️  Время завершения: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        print("\n" + "="*70)
+        print("📝 СЛЕДУЮЩИЙ ШАГ:")
+        print(f"   Запустите: python -m tech_survey upload{' --consolidated' if consolidated else ''}")
+        print("="*70)
+        
+        return 0
+        
+    except Exception as e:
+        print_header("❌ ОШИБКА!")
+        print(f"\n{type(e).__name__}: {e}")
+        
+        import traceback
+        print("\nПолный traceback:")
+        print(traceback.format_exc())
+        
+        return 1
+
+def run(args):
+    """Команда `prepare` (tech_survey.cli)"""
+    if args.append:
+        from tech_survey import incremental
+        return incremental.main(consolidated=args.consolidated)
+    writers = DEFAULT_WRITERS if args.writers is None else args.writers
+    return main(consolidated=args.consolidated, writers=writers)
+
+# ============================================================================
+# ТОЧКА ВХОДА
+# ============================================================================
+
+if __name__ == "__main__":
+    exit(main())
\ No newline at end of file
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/query_index.py
+
+Запросы "топ-N технологий категории/статуса с фильтрами Country/Age/EdLevel/
+DevType/Employment" без обращения к BigQuery - по хранилищу фактов
+(tech_survey/fact_store.py).
+
+Индексы строятся в памяти при открытии:
+- инвертированный индекс по каждому измерению: значение → отсортированные
+  номера респондентов (posting list);
+- матрицы счетчиков значение измерения × технология для каждой таблицы
+  (фильтр по одному измерению отвечает сложением строк матрицы);
+- для пересечения нескольких фильтров берется самый короткий posting list,
+  остальные условия проверяются по кодам демографии, затем счетчики
+  считаются по CSR строкам только выбранных респондентов;
+- столбцы с множественным выбором (DevType, Employment) фильтруются по
+  битовым маскам хранилища: респондент проходит, если у него установлен
+  хотя бы один бит выбранных значений (проверяются только нужные байты).
+
+Топ-N выбирается частичной выборкой (np.partition), полная сортировка
+не выполняется. Percentage = RespondentCount / респондентов сегмента * 100,
+как в views top10_* и tech_cube.
+
+Использование:
+    index = load_query_index()
+    index.top_n('language', 'haveworked', 10, {'Country': 'Germany', 'Age': '25-34 years old'})
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from tech_survey.fact_store import FACT_STORE_DIR, load_fact_store
+
+# ============================================================================
+# ЧАСТИЧНАЯ ВЫБОРКА
+# ============================================================================
+
+def top_k_indices(values, k=None):
+    """
+    Индексы k наибольших значений по убыванию (при равенстве - по индексу).
+
+    Сортируются только кандидаты не меньше k-го значения,
+    поэтому результат детерминирован и при равенстве на границе.
+    """
+    n = len(values)
+    if k is None or k >= n:
+        candidates = np.arange(n)
+    elif k <= 0:
+        return np.empty(0, dtype=np.int64)
+    else:
+        kth = np.partition(values, n - k)[n - k]
+        candidates = np.flatnonzero(values >= kth)
+
+    order = np.lexsort((candidates, -values[candidates]))
+    return candidates[order[:k]]
+
+def gather_csr_rows(offsets, codes, rows):
+    """Коды технологий всех выбранных строк CSR одним массивом"""
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return codes[:0]
+    # Смещение каждой позиции результата относительно начала ее строки
+    shifts = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return codes[np.arange(total) + shifts]
+
+# ============================================================================
+# ИНДЕКС
+# ============================================================================
+
+class TechQueryIndex:
+    """
+    Индексы для фильтрованных топ-N запросов по хранилищу фактов.
+
+    Фильтры - dict {измерение: значение или список значений}, например
+    {'Country': ['Germany', 'France'], 'EdLevel': 'Master’s degree ...'}.
+    Для DevType/Employment список значений - "выбрал хотя бы одно".
+    Неизвестное измерение - ValueError, неизвестное значение не совпадает
+    ни с одним респондентом.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.technologies = store.technologies
+        self.n_respondents = store.n_respondents
+
+        # Коды демографии и словари значение → код
+        self.dim_codes = {dim: np.asarray(codes) for dim, (codes, _) in store.dims.items()}
+        self.dim_labels = {dim: labels for dim, (_, labels) in store.dims.items()}
+        self._dim_lookup = {
+            dim: {label: code for code, label in enumerate(labels)}
+            for dim, labels in self.dim_labels.items()
+        }
+
+        # Posting lists: postings[dim][bounds[c]:bounds[c + 1]] - респонденты значения c
+        self._postings = {}
+        for dim, codes in self.dim_codes.items():
+            order = np.argsort(codes, kind='stable').astype(np.int32)
+            bounds = np.zeros(len(self.dim_labels[dim]) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(codes, minlength=len(self.dim_labels[dim])), out=bounds[1:])
+            self._postings[dim] = (order, bounds)
+
+        # Битовые маски столбцов с множественным выбором и словари значение → бит
+        self.multi_bits = {dim: np.asarray(bits) for dim, (bits, _) in store.multiselect.items()}
+        self.multi_labels = {dim: labels for dim, (_, labels) in store.multiselect.items()}
+        self._multi_lookup = {
+            dim: {label: code for code, label in enumerate(labels)}
+            for dim, labels in self.multi_labels.items()
+        }
+
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Таблицы и предвычисленные счетчики
+    # ------------------------------------------------------------------
+
+    def _table(self, category, status):
+        """CSR массивы таблицы в памяти и матрицы счетчиков (строятся один раз)"""
+        key = (category, status)
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+
+        with self._lock:
+            if key not in self._tables:
+                if key not in self.store.tables:
+                    raise ValueError(f"Нет таблицы {category}/{status}, доступны: {self.store.tables}")
+
+                offsets, codes = self.store.table(category, status)
+                offsets = np.asarray(offsets, dtype=np.int64)
+                codes = np.asarray(codes)
+                n_technologies = len(self.technologies[category])
+                row_respondents = np.repeat(np.arange(self.n_respondents), np.diff(offsets))
+
+                dim_counts = {}
+                for dim, dim_codes in self.dim_codes.items():
+                    n_values = len(self.dim_labels[dim])
+                    flat = dim_codes[row_respondents].astype(np.int64) * n_technologies + codes
+                    dim_counts[dim] = np.bincount(
+                        flat, minlength=n_values * n_technologies
+                    ).reshape(n_values, n_technologies)
+
+                self._tables[key] = {
+                    'offsets': offsets,
+                    'codes': codes,
+                    'total': np.bincount(codes, minlength=n_technologies),
+                    'dim_counts': dim_counts,
+                }
+            return self._tables[key]
+
+    def warm(self):
+        """Построение индексов всех таблиц заранее (иначе - при первом запросе)"""
+        for category, status in self.store.tables:
+            self._table(category, status)
+        return self
+
+    # ------------------------------------------------------------------
+    # Сегменты
+    # ------------------------------------------------------------------
+
+    def _conditions(self, filters):
+        """[(измерение, массив кодов значений)] из словаря фильтров"""
+        conditions = []
+        for dim, values in (filters or {}).items():
+            if values is None:
+                continue
+            lookup = self._dim_lookup.get(dim, self._multi_lookup.get(dim))
+            if lookup is None:
+                available = list(self._dim_lookup) + list(self._multi_lookup)
+                raise ValueError(f"Неизвестное измерение {dim}, доступны: {available}")
+            if isinstance(values, str):
+                values = [values]
+            codes = np.array(sorted({lookup[v] for v in values if v in lookup}), dtype=np.int64)
+            conditions.append((dim, codes))
+        return conditions
+
+    def _posting(self, dim, codes):
+        order, bounds = self._postings[dim]
+        if len(codes) == 0:
+            return order[:0]
+        if len(codes) == 1:
+            return order[bounds[codes[0]]:bounds[codes[0] + 1]]
+        return np.sort(np.concatenate([order[bounds[c]:bounds[c + 1]] for c in codes]))
+
+    def _multi_rows(self, dim, codes, rows=None):
+        """Респонденты (из rows или все), выбравшие хотя бы одно из значений codes"""
+        bits = self.multi_bits[dim]
+        if len(codes) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Проверяются только байты масок, в которых лежат биты выбранных значений
+        columns = np.unique(codes // 8)
+        selected = np.zeros(bits.shape[1] * 8, dtype=bool)
+        selected[codes] = True
+        value_mask = np.packbits(selected, bitorder='little')[columns]
+
+        if rows is None:
+            return np.flatnonzero((bits[:, columns] & value_mask).any(axis=1))
+        return rows[(bits[rows[:, None], columns] & value_mask).any(axis=1)]
+
+    def _segment_rows(self, conditions):
+        """Номера респондентов, удовлетворяющих всем условиям"""
+        single = [(dim, codes) for dim, codes in conditions if dim in self._postings]
+        multi = [(dim, codes) for dim, codes in conditions if dim not in self._postings]
+
+        if single:
+            sizes = [
+                int(sum(self._postings[dim][1][c + 1] - self._postings[dim][1][c] for c in codes))
+                for dim, codes in single
+            ]
+            first = int(np.argmin(sizes))
+            dim, codes = single[first]
+            rows = self._posting(dim, codes)
+
+            for i, (dim, codes) in enumerate(single):
+                if i == first or len(rows) == 0:
+                    continue
+                values = self.dim_codes[dim][rows]
+                rows = rows[values == codes[0]] if len(codes) == 1 else rows[np.isin(values, codes)]
+        else:
+            dim, codes = multi.pop(0)
+            rows = self._multi_rows(dim, codes)
+
+        for dim, codes in multi:
+            if len(rows) == 0:
+                break
+            rows = self._multi_rows(dim, codes, rows)
+        return rows
+
+    def segment(self, filters=None):
+        """Номера респондентов сегмента (None - все респонденты)"""
+        conditions = self._conditions(filters)
+        if not conditions:
+            return None
+        return self._segment_rows(conditions)
+
+    def segment_size(self, filters=None):
+        """Число респондентов сегмента"""
+        rows = self.segment(filters)
+        return self.n_respondents if rows is None else len(rows)
+
+    # ------------------------------------------------------------------
+    # Запросы
+    # ------------------------------------------------------------------
+
+    def counts(self, category, status, filters=None):
+        """
+        Число респондентов сегмента по каждой технологии.
+
+        Returns:
+            (массив счетчиков по кодам технологий, респондентов в сегменте)
+        """
+        table = self._table(category, status)
+        conditions = self._conditions(filters)
+
+        if not conditions:
+            return table['total'], self.n_respondents
+
+        if len(conditions) == 1 and conditions[0][0] in self._postings:
+            dim, codes = conditions[0]
+            bounds = self._postings[dim][1]
+            size = int((bounds[codes + 1] - bounds[codes]).sum())
+            return table['dim_counts'][dim][codes].sum(axis=0), size
+
+        rows = self._segment_rows(conditions)
+        n_technologies = len(self.technologies[category])
+        selected = gather_csr_rows(table['offsets'], table['codes'], rows)
+        return np.bincount(selected, minlength=n_technologies), len(rows)
+
+    def top_n(self, category, status, n=10, filters=None):
+        """
+        Топ-N технологий сегмента (n=None - все, как all_platforms_*).
+
+        Returns:
+            список dict Technology, RespondentCount, Percentage
+            по убыванию RespondentCount (технологии без ответов не включаются)
+        """
+        counts, size = self.counts(category, status, filters)
+        labels = self.technologies[category]
+
+        return [
+            {
+                'Technology': labels[code],
+                'RespondentCount': int(counts[code]),
+                'Percentage': round(float(counts[code]) / size * 100, 2),
+            }
+            for code in top_k_indices(counts, n)
+            if counts[code] > 0
+        ]
+
+    def table_stats(self, category, status, filters=None):
+        """
+        Сводка таблицы по сегменту (как view overall_tech_stats).
+
+        Returns:
+            dict UniqueTechnologies, TotalMentions, UniqueRespondents
+        """
+        table = self._table(category, status)
+        counts, _ = self.counts(category, status, filters)
+        rows = self.segment(filters)
+
+        offsets = table['offsets']
+        lengths = np.diff(offsets) if rows is None else offsets[rows + 1] - offsets[rows]
+        return {
+            'UniqueTechnologies': int(np.count_nonzero(counts)),
+            'TotalMentions': int(lengths.sum()),
+            'UniqueRespondents': int(np.count_nonzero(lengths)),
+        }
+
+    def technology_share(self, category, status, technology, filters=None):
+        """Число и процент респондентов сегмента, выбравших технологию"""
+        counts, size = self.counts(category, status, filters)
+        try:
+            count = int(counts[self.technologies[category].index(technology)])
+        except ValueError:
+            count = 0
+        return {
+            'Technology': technology,
+            'RespondentCount': count,
+            'SegmentRespondents': size,
+            'Percentage': round(count / size * 100, 2) if size else None,
+        }
+
+def load_query_index(path=FACT_STORE_DIR, warm=False):
+    """Открытие хранилища фактов и построение индексов"""
+    index = TechQueryIndex(load_fact_store(path))
+    return index.warm() if warm else index
+
+# ============================================================================
+# КОМАНДА TOP
+# ============================================================================
+
+# Фильтры команды (аргументы --country, --devtype, ... в tech_survey.cli)
+TOP_FILTERS = ('Country', 'Age', 'EdLevel', 'DevType', 'Employment')
+
+def run_top(args):
+    """Команда `top` (tech_survey.cli): топ-N технологий сегмента"""
+    filters = {dim: getattr(args, dim) for dim in TOP_FILTERS if getattr(args, dim)}
+
+    try:
+        index = load_query_index(args.store or FACT_STORE_DIR, warm=True)
+        start = time.perf_counter()
+        rows = index.top_n(args.category, args.status, args.limit or None, filters)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        size = index.segment_size(filters)
+    except (OSError, ValueError) as e:
+        print(f"❌ {type(e).__name__}: {e}")
+        return 1
+
+    print(f"📊 {args.category}/{args.status}, респондентов в сегменте: {size:,}")
+    for name, values in filters.items():
+        print(f"   {name}: {', '.join(values)}")
+    print()
+    for number, row in enumerate(rows, 1):
+        print(f"  {number:>3}. {row['Technology']:<40} {row['RespondentCount']:>8,} {row['Percentage']:>7.2f}%")
+    print(f"\n⏱️  Запрос: {elapsed_ms:.3f} мс")
+    return 0
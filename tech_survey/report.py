@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/report.py
+
+Выполнение отчетных запросов из bigquery/sql_queries/sql report.sql
+(или другого SQL файла) через кэширующий слой bq_query.
+Повторный запуск без изменений в данных не обращается к BigQuery.
+
+Использование:
+    python -m tech_survey report [путь/к/файлу.sql]
+"""
+
+import os
+from datetime import datetime
+
+from google.cloud import bigquery
+from dotenv import load_dotenv
+
+from tech_survey.bq_query import run_query, get_default_cache, split_sql_script
+from tech_survey.cli import parse_command
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+load_dotenv()
+
+PROJECT_ID = os.getenv('GCP_PROJECT_ID')
+REPORT_FILE = 'bigquery/sql_queries/sql report.sql'
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def run(args):
+    """Команда `report` (tech_survey.cli)"""
+    report_file = args.sql_file or REPORT_FILE
+
+    print("\n" + "="*70)
+    print("📊 ОТЧЕТНЫЕ ЗАПРОСЫ BIGQUERY")
+    print("="*70)
+    print(f"Файл: {report_file}")
+    print(f"Время начала: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    if not os.path.exists(report_file):
+        print(f"\n❌ Файл не найден: {report_file}")
+        return 1
+
+    with open(report_file, 'r', encoding='utf-8') as f:
+        statements = split_sql_script(f.read())
+
+    client = bigquery.Client(project=PROJECT_ID)
+    cache = get_default_cache()
+
+    try:
+        for number, (title, sql) in enumerate(statements, 1):
+            print("\n" + "─"*70)
+            print(f"{number}. {title or 'Запрос'}")
+            print("─"*70)
+
+            hits_before = cache.stats['hits']
+            df = run_query(client, sql, cache=cache).to_pandas()
+            source = "кэш" if cache.stats['hits'] > hits_before else "BigQuery"
+
+            print(df.to_string(index=False))
+            print(f"\n  Строк: {len(df):,} (источник: {source})")
+
+    except Exception as e:
+        print(f"\n❌ Ошибка выполнения запроса: {type(e).__name__}: {e}")
+        return 1
+
+    print("\n" + "="*70)
+    print(f"✅ Выполнено запросов: {len(statements)}")
+    print(f"💾 Кэш: попаданий {cache.stats['hits']}, промахов {cache.stats['misses']}")
+    print("="*70)
+
+    return 0
+
+def main(argv=None):
+    """Основная функция"""
+    return run(parse_command('report', argv))
+
+# ============================================================================
+# ТОЧКА ВХОДА
+# ============================================================================
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/schema_validation.py
+
+Локальная проверка CSV перед загрузкой в BigQuery по схеме таблицы
+(TABLE_SCHEMAS в tech_survey/upload.py).
+
+Load job с явной схемой сопоставляет столбцы CSV по позиции и узнает о
+несовпадении типов только после отправки файла. Здесь те же правила
+проверяются векторно по всему файлу (значения читаются строками, как их
+видит BigQuery):
+- заголовок: имена и порядок столбцов совпадают со схемой;
+- тип: INTEGER, FLOAT, BOOLEAN, TIMESTAMP/DATE разбираются так, как их
+  принимает загрузка CSV (пустое значение - NULL);
+- REQUIRED: нет пустых значений;
+- ключ: значения ключевых столбцов (table_checksums.CHECKSUM_KEYS) уникальны.
+
+Каждая найденная проблема содержит число строк и первые примеры с номерами
+строк CSV (1 - заголовок).
+
+Использование:
+    rows, issues = validate_csv('data/processed/demographics.csv', schema, ['ResponseId'])
+    for issue in issues:
+        print(format_issue(issue))
+"""
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+# Примеров строк в диагностике каждой проблемы
+MAX_EXAMPLES = 5
+
+INT64_MAX_DIGITS = '9223372036854775807'
+INT64_MIN_DIGITS = '9223372036854775808'
+# Значения длиннее не INT64 при любом содержимом (знак + 19 цифр)
+INTEGER_MAX_WIDTH = len(INT64_MAX_DIGITS) + 1
+
+BOOLEAN_VALUES = {'true', 'false', 't', 'f', 'yes', 'no', 'y', 'n', '1', '0'}
+
+# YYYY-[M]M-[D]D[( |T)[H]H:[M]M[:[S]S[.F]]][часовой пояс]
+TIMESTAMP_PATTERN = (
+    r'\d{4}-\d{1,2}-\d{1,2}'
+    r'(?:[ T]\d{1,2}:\d{1,2}(?::\d{1,2}(?:\.\d{1,6})?)?)?'
+    r'(?:\s*(?:Z|UTC|[+-]\d{1,2}(?::?\d{2})?))?'
+)
+DATE_PATTERN = r'\d{4}-\d{1,2}-\d{1,2}'
+
+# ============================================================================
+# ПРОВЕРКИ ТИПОВ
+# ============================================================================
+
+def _invalid_integer_slow(values):
+    valid = values.str.fullmatch(r'[+-]?\d+')
+    # Выход за INT64: больше 19 цифр или 19 цифр больше максимума
+    # (для отрицательных - больше модуля минимума)
+    digits = values.str.lstrip('+-').str.lstrip('0')
+    lengths = digits.str.len()
+    limit = values.str.startswith('-').map({True: INT64_MIN_DIGITS, False: INT64_MAX_DIGITS})
+    overflow = (lengths > len(INT64_MAX_DIGITS)) | (
+        (lengths == len(INT64_MAX_DIGITS)) & (digits > limit)
+    )
+    return ~valid | overflow
+
+def _invalid_integer(values):
+    """
+    Проверка целых по матрице байтов (в ~10 раз быстрее строковых
+    операций pandas); длинные и не-ASCII значения - регулярным выражением
+    """
+    try:
+        raw = values.to_numpy().astype('S')
+    except UnicodeEncodeError:
+        return _invalid_integer_slow(values)
+    if raw.dtype.itemsize > INTEGER_MAX_WIDTH:
+        return _invalid_integer_slow(values)
+
+    chars = raw.view(np.uint8).reshape(len(raw), raw.dtype.itemsize)
+    digits = (chars >= ord('0')) & (chars <= ord('9'))
+    # Дополнение нулевыми байтами только в конце значения
+    allowed = digits | (chars == 0)
+    signed = (chars[:, 0] == ord('+')) | (chars[:, 0] == ord('-'))
+    valid = digits.any(axis=1) & (allowed[:, 1:].all(axis=1) & (allowed[:, 0] | signed))
+
+    invalid = ~valid
+    long_values = valid & (digits.sum(axis=1) >= len(INT64_MAX_DIGITS))
+    if long_values.any():
+        invalid[long_values] = _invalid_integer_slow(values[long_values]).to_numpy()
+    return pd.Series(invalid, index=values.index)
+
+def _invalid_float(values):
+    try:
+        values.to_numpy().astype(np.float64)
+        return pd.Series(False, index=values.index)
+    except ValueError:
+        return pd.to_numeric(values, errors='coerce').isna()
+
+def _invalid_boolean(values):
+    return ~values.str.lower().isin(BOOLEAN_VALUES)
+
+def _invalid_date_part(values):
+    """Несуществующая дата (2024-02-30, 2024-13-01)"""
+    dates = values.str.extract(r'^(\d{4})-(\d{1,2})-(\d{1,2})')
+    parsed = pd.to_datetime(
+        dict(year=dates[0].astype(int), month=dates[1].astype(int), day=dates[2].astype(int)),
+        errors='coerce',
+    )
+    return parsed.isna()
+
+def _invalid_timestamp(values):
+    invalid = ~values.str.fullmatch(TIMESTAMP_PATTERN)
+    matched = values[~invalid]
+    if len(matched):
+        invalid[~invalid] = _invalid_date_part(matched).to_numpy()
+    return invalid
+
+def _invalid_date(values):
+    invalid = ~values.str.fullmatch(DATE_PATTERN)
+    matched = values[~invalid]
+    if len(matched):
+        invalid[~invalid] = _invalid_date_part(matched).to_numpy()
+    return invalid
+
+TYPE_CHECKS = {
+    'INTEGER': _invalid_integer,
+    'INT64': _invalid_integer,
+    'FLOAT': _invalid_float,
+    'FLOAT64': _invalid_float,
+    'NUMERIC': _invalid_float,
+    'BOOLEAN': _invalid_boolean,
+    'BOOL': _invalid_boolean,
+    'TIMESTAMP': _invalid_timestamp,
+    'DATETIME': _invalid_timestamp,
+    'DATE': _invalid_date,
+}
+
+def invalid_values_mask(values, field_type):
+    """
+    Маска непустых значений, которые BigQuery не разберет как field_type.
+
+    Args:
+        values: pd.Series строк (пустая строка - NULL, не проверяется)
+        field_type: тип поля схемы ('STRING' и неизвестные типы не проверяются)
+    """
+    check = TYPE_CHECKS.get(field_type.upper())
+    mask = np.zeros(len(values), dtype=bool)
+    if check is None:
+        return mask
+
+    present = (values != '').to_numpy()
+    if present.any():
+        mask[present] = check(values[present]).to_numpy(dtype=bool)
+    return mask
+
+# ============================================================================
+# ПРОВЕРКА ТАБЛИЦЫ
+# ============================================================================
+
+def _issue(check, column, mask, values=None, max_examples=MAX_EXAMPLES, message=None):
+    """Проблема с примерами: номер строки CSV = индекс + 2 (строка 1 - заголовок)"""
+    positions = np.flatnonzero(mask)[:max_examples]
+    return {
+        'check': check,
+        'column': column,
+        'count': int(np.count_nonzero(mask)),
+        'rows': [int(p) + 2 for p in positions],
+        'values': [] if values is None else [values[p] for p in positions],
+        'message': message,
+    }
+
+def validate_dataframe(df, schema, key_columns=None, max_examples=MAX_EXAMPLES):
+    """
+    Проверка таблицы, прочитанной строками (read_csv_for_validation), по схеме.
+
+    Args:
+        df: DataFrame со строковыми значениями, пустая строка - NULL
+        schema: список полей с атрибутами name, field_type, mode
+            (bigquery.SchemaField)
+        key_columns: столбцы, значения которых должны быть уникальны
+
+    Returns:
+        список проблем (dict: check, column, count, rows, values, message);
+        пустой список - таблица пройдет загрузку с этой схемой
+    """
+    expected = [field.name for field in schema]
+    actual = list(df.columns)
+    if actual != expected:
+        # Столбцы сопоставляются по позиции - остальные проверки бессмысленны
+        missing = [name for name in expected if name not in actual]
+        extra = [name for name in actual if name not in expected]
+        details = []
+        if missing:
+            details.append(f"нет столбцов {missing}")
+        if extra:
+            details.append(f"лишние столбцы {extra}")
+        if not details:
+            details.append(f"порядок столбцов {actual}, ожидался {expected}")
+        return [{
+            'check': 'columns', 'column': None, 'count': 0, 'rows': [1], 'values': [],
+            'message': '; '.join(details),
+        }]
+
+    issues = []
+    for field in schema:
+        values = df[field.name]
+        raw = values.to_numpy()
+
+        if (field.mode or 'NULLABLE').upper() == 'REQUIRED':
+            missing = (values == '').to_numpy()
+            if missing.any():
+                issues.append(_issue('required', field.name, missing, max_examples=max_examples))
+
+        invalid = invalid_values_mask(values, field.field_type)
+        if invalid.any():
+            issues.append(_issue(
+                'type', field.name, invalid, raw, max_examples,
+                message=f"не {field.field_type.upper()}",
+            ))
+
+    if key_columns and len(df):
+        duplicated = df.duplicated(subset=list(key_columns), keep='first').to_numpy()
+        if duplicated.any():
+            keys = df[list(key_columns)].astype(str).agg('|'.join, axis=1).to_numpy()
+            issues.append(_issue(
+                'duplicate', ', '.join(key_columns), duplicated, keys, max_examples,
+                message="повтор ключа",
+            ))
+
+    return issues
+
+def read_csv_for_validation(csv_path):
+    """CSV как строки без преобразований (как его читает загрузка BigQuery)"""
+    return pd.read_csv(csv_path, dtype=str, keep_default_na=False, na_filter=False)
+
+def validate_csv(csv_path, schema, key_columns=None, max_examples=MAX_EXAMPLES):
+    """
+    Проверка CSV файла по схеме
+
+    Returns:
+        (число строк данных, список проблем validate_dataframe)
+    """
+    df = read_csv_for_validation(csv_path)
+    return len(df), validate_dataframe(df, schema, key_columns, max_examples)
+
+def format_issue(issue):
+    """Текст проблемы для вывода: что не так и примеры строк"""
+    check_names = {
+        'columns': 'заголовок',
+        'required': 'пустое значение в REQUIRED',
+        'type': 'неверный тип',
+        'duplicate': 'неуникальный ключ',
+    }
+    title = check_names.get(issue['check'], issue['check'])
+    if issue['column']:
+        title += f" [{issue['column']}]"
+    if issue['message'] and issue['check'] != 'required':
+        title += f": {issue['message']}"
+    if issue['count']:
+        title += f", строк: {issue['count']:,}"
+
+    if issue['values']:
+        examples = [f"строка {row}: {value!r}" for row, value in zip(issue['rows'], issue['values'])]
+    else:
+        examples = [f"строка {row}" for row in issue['rows']]
+    return title + ("\n      " + "; ".join(examples) if examples else '')
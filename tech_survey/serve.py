@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/serve.py
+
+Локальный HTTP сервис агрегатов - замена views BigQuery при разработке
+дашборда и для низкой задержки: те же строки, что и views из
+bigquery/sql_queries/create_views.sql, считаются по индексам хранилища
+фактов (tech_survey/query_index.py).
+
+Запросы:
+    GET /health
+    GET /views                                   - список views
+    GET /views/<view>?country=...&age=...&edlevel=...&devtype=...&employment=...
+    GET /views/tech_by_segment?category=language&status=haveworked&limit=10&country=...
+
+Фильтры можно повторять (country=Germany&country=France), значение ALL
+означает "без фильтра" (как в tech_cube). Ответ - JSON
+{"view", "filters", "rows"}; каждый ответ имеет ETag, запрос с
+If-None-Match получает 304 без тела. Готовые ответы хранятся в LRU кэше
+в памяти.
+
+Сервер - asyncio streams (HTTP/1.1, keep-alive) без сторонних зависимостей.
+Сам расчет занимает доли миллисекунды, поэтому выполняется прямо в
+обработчике, без пула потоков.
+
+Использование:
+    python -m tech_survey serve --port 8765
+    curl "http://127.0.0.1:8765/views/top10_languages_haveworked?country=Germany"
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from tech_survey.fact_store import FACT_STORE_DIR
+from tech_survey.query_index import load_query_index
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 4096
+
+# Параметр запроса -> измерение
+FILTER_PARAMS = {
+    'country': 'Country', 'age': 'Age', 'edlevel': 'EdLevel',
+    'devtype': 'DevType', 'employment': 'Employment',
+}
+ALL_VALUE = 'ALL'
+NOT_SPECIFIED = 'Not Specified'
+
+# Views технологий: имя -> (категория, статус, лимит)
+TECHNOLOGY_VIEWS = {}
+for _status in ('haveworked', 'wanttowork'):
+    TECHNOLOGY_VIEWS[f"top10_languages_{_status}"] = ('language', _status, 10)
+    TECHNOLOGY_VIEWS[f"top10_databases_{_status}"] = ('database', _status, 10)
+    TECHNOLOGY_VIEWS[f"all_platforms_{_status}"] = ('platform', _status, None)
+    TECHNOLOGY_VIEWS[f"top10_webframes_{_status}"] = ('webframe', _status, 10)
+
+# Views демографии: имя -> измерение
+DEMOGRAPHIC_VIEWS = {
+    'demographics_by_country': 'Country',
+    'demographics_by_age': 'Age',
+    'demographics_by_education': 'EdLevel',
+}
+
+AGE_ORDER = [
+    'Under 18 years old', '18-24 years old', '25-34 years old', '35-44 years old',
+    '45-54 years old', '55-64 years old', '65 years or older',
+]
+
+CATEGORY_NAMES = {
+    'language': 'Languages',
+    'database': 'Databases',
+    'platform': 'Platforms',
+    'webframe': 'Web Frameworks',
+}
+STATUS_NAMES = {'haveworked': 'Have Worked', 'wanttowork': 'Want to Work'}
+
+HTTP_REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+                405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+class RequestError(Exception):
+    """Ошибка запроса клиента (HTTP статус + сообщение)"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# ============================================================================
+# РАСЧЕТ VIEWS
+# ============================================================================
+
+def rank_rows(rows, key='RespondentCount'):
+    """RANK() OVER (ORDER BY key DESC) для уже отсортированных строк"""
+    for position, row in enumerate(rows, 1):
+        if position > 1 and row[key] == rows[position - 2][key]:
+            row['TechRank'] = rows[position - 2]['TechRank']
+        else:
+            row['TechRank'] = position
+    return rows
+
+class AggregateService:
+    """
+    Расчет строк views по индексам и LRU кэш готовых JSON ответов.
+
+    Ответ кэшируется целиком (тело + ETag), поэтому повторный запрос
+    не сериализует JSON заново.
+    """
+
+    def __init__(self, index, cache_size=DEFAULT_CACHE_SIZE):
+        self.index = index
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.stats = {'requests': 0, 'hits': 0, 'misses': 0, 'not_modified': 0, 'errors': 0}
+
+        self.views = {
+            **{name: self._technology_view for name in TECHNOLOGY_VIEWS},
+            **{name: self._demographic_view for name in DEMOGRAPHIC_VIEWS},
+            'languages_have_vs_want': self._have_vs_want_view,
+            'overall_tech_stats': self._overall_stats_view,
+            'tech_by_segment': self._tech_by_segment_view,
+        }
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+
+    def _technology_view(self, view, filters, params):
+        category, status, limit = TECHNOLOGY_VIEWS[view]
+        return self.index.top_n(category, status, limit, filters)
+
+    def _demographic_view(self, view, filters, params):
+        dim = DEMOGRAPHIC_VIEWS[view]
+        codes = self.index.dim_codes[dim]
+        labels = self.index.dim_labels[dim]
+        rows = self.index.segment(filters)
+        segment_codes = codes if rows is None else codes[rows]
+        size = len(segment_codes)
+
+        counts = np.bincount(segment_codes, minlength=len(labels))
+        result = [
+            {
+                dim: labels[code],
+                'RespondentCount': int(counts[code]),
+                'Percentage': round(float(counts[code]) / size * 100, 2),
+            }
+            for code in np.argsort(-counts, kind='stable')
+            if counts[code] > 0 and labels[code] != NOT_SPECIFIED
+        ]
+        if dim == 'Age':
+            order = {age: position for position, age in enumerate(AGE_ORDER)}
+            result.sort(key=lambda row: order.get(row['Age'], len(AGE_ORDER)))
+        return result
+
+    def _have_vs_want_view(self, view, filters, params):
+        have, _ = self.index.counts('language', 'haveworked', filters)
+        want, _ = self.index.counts('language', 'wanttowork', filters)
+        labels = self.index.technologies['language']
+
+        rows = []
+        for row in self.index.top_n('language', 'haveworked', 10, filters):
+            code = labels.index(row['Technology'])
+            have_count, want_count = int(have[code]), int(want[code])
+            rows.append({
+                'Technology': row['Technology'],
+                'HaveWorkedCount': have_count,
+                'WantToWorkCount': want_count,
+                'Difference': want_count - have_count,
+                'GrowthPercent': round((want_count - have_count) / have_count * 100, 1),
+            })
+        return rows
+
+    def _overall_stats_view(self, view, filters, params):
+        return [
+            {
+                'TechCategory': CATEGORY_NAMES.get(category, category),
+                'Status': STATUS_NAMES.get(status, status),
+                **self.index.table_stats(category, status, filters),
+            }
+            for category, status in self.index.store.tables
+        ]
+
+    def _tech_by_segment_view(self, view, filters, params):
+        category = params.get('category', [None])[0]
+        status = params.get('status', [None])[0]
+        if not category or not status:
+            raise RequestError(400, "tech_by_segment: нужны параметры category и status")
+
+        limit = params.get('limit', [None])[0]
+        try:
+            limit = int(limit) if limit else None
+        except ValueError:
+            raise RequestError(400, f"limit должен быть числом: {limit}")
+
+        size = self.index.segment_size(filters)
+        rows = self.index.top_n(category, status, limit, filters)
+        for row in rows:
+            row.update({'Category': category, 'Status': status, 'SegmentRespondents': size})
+        return rank_rows(rows)
+
+    # ------------------------------------------------------------------
+    # Ответы
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def parse_filters(params):
+        """Фильтры измерений из параметров запроса (ALL и пустые значения игнорируются)"""
+        filters = {}
+        for param, dim in FILTER_PARAMS.items():
+            values = sorted({v for v in params.get(param, []) if v and v != ALL_VALUE})
+            if values:
+                filters[dim] = values
+        return filters
+
+    def response(self, path, query):
+        """
+        (статус, тело bytes, ETag) для GET запроса; готовые ответы берутся из кэша
+        """
+        params = parse_qs(query, keep_blank_values=False)
+        filters = self.parse_filters(params)
+        extra = tuple(sorted((k, tuple(v)) for k, v in params.items() if k not in FILTER_PARAMS))
+        key = (path, tuple((dim, tuple(values)) for dim, values in filters.items()), extra)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats['hits'] += 1
+            return cached
+
+        self.stats['misses'] += 1
+        status, payload = self._build(path, filters, params)
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        if status != 200:
+            return status, body, None
+
+        result = (status, body, f'"{hashlib.sha1(body).hexdigest()[:20]}"')
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _build(self, path, filters, params):
+        """(статус, JSON payload) для пути запроса"""
+        if path == '/health':
+            return 200, {
+                'status': 'ok',
+                'respondents': self.index.n_respondents,
+                'created': self.index.store.manifest.get('created'),
+            }
+        if path in ('/views', '/views/'):
+            return 200, {'views': sorted(self.views)}
+
+        view = path[len('/views/'):] if path.startswith('/views/') else None
+        if view not in self.views:
+            return 404, {'error': f"Неизвестный путь {path}, список views: /views"}
+
+        try:
+            rows = self.views[view](view, filters, params)
+        except RequestError as e:
+            return e.status, {'error': str(e)}
+        except ValueError as e:
+            return 400, {'error': str(e)}
+
+        return 200, {'view': view, 'filters': filters, 'rows': rows}
+
+# ============================================================================
+# HTTP СЕРВЕР (ASYNCIO)
+# ============================================================================
+
+def etag_matches(header, etag):
+    """Совпадение If-None-Match (список через запятую, W/ префиксы, *)"""
+    candidates = [c.strip() for c in header.split(',')]
+    return '*' in candidates or etag in (c[2:] if c.startswith('W/') else c for c in candidates)
+
+def build_http_response(status, body=b'', etag=None, keep_alive=True):
+    headers = [
+        f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Unknown')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(body)}",
+        "Cache-Control: no-cache",
+        "Access-Control-Allow-Origin: *",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    if etag:
+        headers.append(f"ETag: {etag}")
+    return ('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body
+
+async def handle_connection(service, reader, writer):
+    """Обработка соединения: последовательные запросы keep-alive до закрытия"""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+
+            lines = head.decode('latin-1').split('\r\n')
+            try:
+                method, target, version = lines[0].split(' ', 2)
+            except ValueError:
+                writer.write(build_http_response(400, b'{"error": "bad request line"}', keep_alive=False))
+                break
+
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(':')
+                if name:
+                    headers[name.strip().lower()] = value.strip()
+
+            connection = headers.get('connection', '').lower()
+            keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+            # Тело запроса не используется, но должно быть вычитано
+            length = int(headers.get('content-length') or 0)
+            if length:
+                await reader.readexactly(length)
+
+            service.stats['requests'] += 1
+            if method != 'GET':
+                writer.write(build_http_response(405, b'{"error": "only GET"}', keep_alive=keep_alive))
+            else:
+                url = urlsplit(target)
+                try:
+                    status, body, etag = service.response(url.path, url.query)
+                except Exception as e:
+                    service.stats['errors'] += 1
+                    status, etag = 500, None
+                    body = json.dumps({'error': f"{type(e).__name__}: {e}"}).encode('utf-8')
+
+                if status == 200 and etag_matches(headers.get('if-none-match', ''), etag):
+                    service.stats['not_modified'] += 1
+                    writer.write(build_http_response(304, etag=etag, keep_alive=keep_alive))
+                else:
+                    writer.write(build_http_response(status, body, etag, keep_alive))
+
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    """
+    Запуск сервера до отмены задачи.
+
+    Args:
+        ready: callback(фактический порт) после начала прослушивания
+    """
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer), host, port
+    )
+    actual_port = server.sockets[0].getsockname()[1]
+    if ready:
+        ready(actual_port)
+    async with server:
+        await server.serve_forever()
+
+# ============================================================================
+# КОМАНДА SERVE
+# ============================================================================
+
+def run(args):
+    """Команда `serve` (tech_survey.cli)"""
+    store_path = args.store or FACT_STORE_DIR
+
+    print("\n" + "="*70)
+    print("🌐 СЕРВИС АГРЕГАТОВ (ЗАМЕНА VIEWS BIGQUERY)")
+    print("="*70)
+
+    try:
+        start = time.perf_counter()
+        index = load_query_index(store_path, warm=True)
+    except OSError as e:
+        print(f"\n❌ Хранилище фактов не найдено: {e}")
+        print("   Запустите: python -m tech_survey prepare")
+        return 1
+
+    service = AggregateService(index, cache_size=args.cache_size or DEFAULT_CACHE_SIZE)
+    print(f"Хранилище: {store_path} ({index.n_respondents:,} респондентов, "
+          f"индексы за {(time.perf_counter() - start) * 1000:.0f} мс)")
+    print(f"Views: {len(service.views)}")
+
+    def ready(port):
+        print(f"\n✓ Слушаю http://{args.host or DEFAULT_HOST}:{port}/views (Ctrl+C - остановка)")
+
+    try:
+        port = DEFAULT_PORT if args.port is None else args.port
+        asyncio.run(serve(service, args.host or DEFAULT_HOST, port, ready))
+    except KeyboardInterrupt:
+        pass
+
+    print(f"\n📊 Запросов: {service.stats['requests']:,}, из кэша: {service.stats['hits']:,}, "
+          f"304: {service.stats['not_modified']:,}")
+    return 0
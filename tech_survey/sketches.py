@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/sketches.py
+
+Объединяемые скетчи HyperLogLog для приближенного COUNT(DISTINCT ResponseId)
+по технологии × сегменту (Country × Age × EdLevel), создаются
+tech_survey/prepare.py рядом с точными счетчиками tech_cube.
+
+Скетч хранится для каждой непустой ячейки самого детального уровня
+(технология × страна × возраст × образование). Объединение любых сегментов,
+а также одного сегмента за несколько лет опроса - поэлементный максимум
+регистров, поэтому оценка для любого набора фильтров получается без
+повторного чтения исходных строк. Стандартная ошибка 1.04 / sqrt(2^p),
+для p = 14 около 0.8%.
+
+ResponseId хэшируется вместе с годом опроса: одинаковые ResponseId разных
+лет считаются разными респондентами.
+
+Регистры хранятся разреженно (CSR): для скетча - только ненулевые пары
+(номер регистра, ранг), поэтому размер ограничен числом пар
+респондент-технология, а не числом ячеек × 2^p.
+
+Структура каталога data/processed/sketches/:
+    manifest.json                 - год опроса, точность, словари измерений и технологий
+    respondents.npz               - скетчи респондентов по сегментам (знаменатель процентов)
+    <category>_<status>.npz       - скетчи технология × сегмент
+
+Массивы .npz: коды ключа (technology, Country, Age, EdLevel),
+offsets (CSR), register (uint16), rank (uint8).
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from tech_survey.query_index import gather_csr_rows
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+SKETCH_DIR = 'data/processed/sketches'
+SKETCH_VERSION = 1
+SKETCH_PRECISION = 14
+SURVEY_YEAR = 2024
+
+SKETCH_DIMENSIONS = ['Country', 'Age', 'EdLevel']
+
+# Скетчи респондентов (без технологии)
+RESPONDENTS_TABLE = 'respondents'
+
+# ============================================================================
+# HYPERLOGLOG
+# ============================================================================
+
+def hash_response_ids(response_ids, survey_year=SURVEY_YEAR):
+    """64-битный хэш (splitmix64) пары (год опроса, ResponseId)"""
+    x = np.asarray(response_ids, dtype=np.int64).astype(np.uint64)
+    x ^= np.uint64(survey_year) << np.uint64(40)
+    x += np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def _bit_length(values):
+    """Число значащих бит uint64 (через frexp по 32-битным половинам - без потерь точности)"""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+def hll_register_ranks(hashes, precision=SKETCH_PRECISION):
+    """
+    Номер регистра (старшие p бит) и ранг (позиция первой единицы
+    в оставшихся 64 - p битах, 1..65 - p) для каждого хэша
+    """
+    tail_bits = 64 - precision
+    registers = (hashes >> np.uint64(tail_bits)).astype(np.uint16)
+    tail = hashes & np.uint64((1 << tail_bits) - 1)
+    ranks = (tail_bits + 1 - _bit_length(tail)).astype(np.uint8)
+    return registers, ranks
+
+def estimate_cardinality(registers):
+    """Оценка числа различных элементов по плотному массиву регистров"""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int32)))
+
+    # Малые множества - линейный подсчет по пустым регистрам
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * m and zeros:
+        return m * np.log(m / zeros)
+    return float(raw)
+
+def relative_error(precision=SKETCH_PRECISION):
+    """Стандартная относительная ошибка оценки"""
+    return 1.04 / np.sqrt(1 << precision)
+
+def build_sparse_sketches(key_ids, hashes, precision=SKETCH_PRECISION):
+    """
+    Разреженные скетчи для элементов, сгруппированных по ключу.
+
+    Args:
+        key_ids: int64 номер скетча для каждого элемента
+        hashes: uint64 хэш каждого элемента
+
+    Returns:
+        (уникальные ключи, offsets, register uint16, rank uint8) -
+        регистры скетча keys[i]: register/rank[offsets[i]:offsets[i + 1]]
+    """
+    registers, ranks = hll_register_ranks(hashes, precision)
+    cells = np.asarray(key_ids, dtype=np.int64) * (1 << precision) + registers
+    return compact_cells(cells, ranks, precision)
+
+def compact_cells(cells, ranks, precision=SKETCH_PRECISION):
+    """
+    Разреженные скетчи из ячеек (ключ * 2^p + регистр, ранг), в том числе
+    с повторами: для каждой ячейки остается максимальный ранг (объединение HLL).
+
+    Returns:
+        (уникальные ключи, offsets, register uint16, rank uint8)
+    """
+    order = np.lexsort((ranks, cells))
+    cells, ranks = cells[order], ranks[order]
+    last = np.ones(len(cells), dtype=bool)
+    last[:-1] = cells[1:] != cells[:-1]
+    cells, ranks = cells[last], ranks[last]
+
+    keys, counts = np.unique(cells >> precision, return_counts=True)
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    return keys, offsets, (cells & ((1 << precision) - 1)).astype(np.uint16), ranks
+
+# ============================================================================
+# ЗАПИСЬ
+# ============================================================================
+
+def _save_json(data, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def _segment_codes(demo_df):
+    """Коды измерений по респондентам и словари значений"""
+    codes, labels = {}, {}
+    for dim in SKETCH_DIMENSIONS:
+        values = demo_df[dim].astype(str)
+        labels[dim] = sorted(values.unique())
+        codes[dim] = values.map({label: code for code, label in enumerate(labels[dim])}).to_numpy(np.int64)
+    return codes, labels
+
+def _combine_keys(columns, sizes):
+    """Номер ячейки из кодов измерений (смешанная система счисления)"""
+    key = np.zeros(len(columns[0]), dtype=np.int64)
+    for column, size in zip(columns, sizes):
+        key = key * size + column
+    return key
+
+def _split_keys(keys, sizes):
+    """Обратное к _combine_keys: коды измерений по номеру ячейки"""
+    columns = []
+    for size in reversed(sizes):
+        columns.append((keys % size).astype(np.int16))
+        keys = keys // size
+    return columns[::-1]
+
+def _save_table(path, key_names, key_columns, offsets, registers, ranks):
+    np.savez(
+        path,
+        **{f"key_{name}": column for name, column in zip(key_names, key_columns)},
+        offsets=offsets, register=registers, rank=ranks,
+    )
+
+def write_sketches(demo_df, tech_tables, output_dir=SKETCH_DIR,
+                   survey_year=SURVEY_YEAR, precision=SKETCH_PRECISION):
+    """
+    Запись скетчей по сегментам и технологиям × сегментам.
+
+    Args:
+        demo_df: таблица demographics
+        tech_tables: dict {(tech_type, status): unpivot DataFrame}
+
+    Returns:
+        dict manifest
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    dims = [dim for dim in SKETCH_DIMENSIONS if dim in demo_df.columns]
+    segment_codes, dim_labels = _segment_codes(demo_df[['ResponseId'] + dims])
+    dim_sizes = [len(dim_labels[dim]) for dim in dims]
+
+    demo_ids = demo_df['ResponseId'].to_numpy(np.int64)
+    demo_order = np.argsort(demo_ids)
+    demo_ids = demo_ids[demo_order]
+    segment_keys = _combine_keys([segment_codes[dim] for dim in dims], dim_sizes)[demo_order]
+
+    tables = {}
+
+    # Респонденты по сегментам
+    keys, offsets, registers, ranks = build_sparse_sketches(
+        segment_keys, hash_response_ids(demo_ids, survey_year), precision
+    )
+    _save_table(output_dir / f"{RESPONDENTS_TABLE}.npz", dims,
+                _split_keys(keys, dim_sizes), offsets, registers, ranks)
+    tables[RESPONDENTS_TABLE] = {'sketches': len(keys), 'registers': len(registers)}
+
+    # Технология × сегмент
+    technologies = {}
+    for (tech_type, status), tech_df in tech_tables.items():
+        if tech_df is None:
+            continue
+
+        labels = sorted(tech_df['Technology'].unique())
+        technologies.setdefault(tech_type, {})[status] = labels
+
+        response_ids = tech_df['ResponseId'].to_numpy(np.int64)
+        positions = np.minimum(np.searchsorted(demo_ids, response_ids), len(demo_ids) - 1)
+        known = demo_ids[positions] == response_ids
+
+        tech_codes = tech_df['Technology'].map(
+            {label: code for code, label in enumerate(labels)}
+        ).to_numpy(np.int64)[known]
+        key_ids = tech_codes * int(np.prod(dim_sizes)) + segment_keys[positions[known]]
+
+        keys, offsets, registers, ranks = build_sparse_sketches(
+            key_ids, hash_response_ids(response_ids[known], survey_year), precision
+        )
+        _save_table(output_dir / f"{tech_type}_{status}.npz", ['technology'] + dims,
+                    _split_keys(keys, [len(labels)] + dim_sizes), offsets, registers, ranks)
+        tables[f"{tech_type}_{status}"] = {'sketches': len(keys), 'registers': len(registers)}
+
+    manifest = {
+        'version': SKETCH_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'survey_year': survey_year,
+        'precision': precision,
+        'dimensions': {dim: dim_labels[dim] for dim in dims},
+        'technologies': technologies,
+        'tables': tables,
+    }
+    _save_json(manifest, output_dir / 'manifest.json')
+
+    return manifest
+
+def _extend_labels(old_labels, new_values):
+    """Объединенный словарь и массив перекодировки старых кодов"""
+    labels = sorted(set(old_labels).union(new_values))
+    lookup = {label: code for code, label in enumerate(labels)}
+    return labels, lookup, np.array([lookup[label] for label in old_labels], dtype=np.int64)
+
+def _stored_cells(table, key_names, remaps, sizes, precision):
+    """Ячейки (ключ * 2^p + регистр) и ранги сохраненной таблицы в новых кодах ключа"""
+    keys = _combine_keys([remaps[name][table[f"key_{name}"]] for name in key_names], sizes)
+    cells = np.repeat(keys, np.diff(table['offsets'])) * (1 << precision) + table['register']
+    return cells, table['rank']
+
+def append_sketches(demo_df, tech_tables, output_dir=SKETCH_DIR):
+    """
+    Добавление новых респондентов в существующие скетчи.
+
+    Объединение HLL - максимум рангов по регистру, поэтому результат
+    совпадает со скетчами, построенными по всем респондентам заново.
+    Исходные строки прежних респондентов не нужны: сохраненные регистры
+    перекодируются в расширенные словари и объединяются с регистрами новых.
+
+    Args:
+        demo_df: demographics только новых респондентов
+        tech_tables: dict {(tech_type, status): unpivot DataFrame новых респондентов}
+
+    Returns:
+        dict manifest
+    """
+    output_dir = Path(output_dir)
+    store = load_sketches(output_dir)
+    precision, survey_year = store.precision, store.survey_year
+    dims = list(store.dim_labels)
+
+    dim_labels, segment_codes, remaps = {}, {}, {}
+    for dim in dims:
+        values = demo_df[dim].astype(str)
+        dim_labels[dim], lookup, remaps[dim] = _extend_labels(store.dim_labels[dim], values.unique())
+        segment_codes[dim] = values.map(lookup).to_numpy(np.int64)
+    dim_sizes = [len(dim_labels[dim]) for dim in dims]
+
+    demo_ids = demo_df['ResponseId'].to_numpy(np.int64)
+    demo_order = np.argsort(demo_ids)
+    demo_ids = demo_ids[demo_order]
+    segment_keys = _combine_keys([segment_codes[dim] for dim in dims], dim_sizes)[demo_order]
+
+    def save_merged(name, key_names, sizes, stored, new_keys, new_ids):
+        registers, ranks = hll_register_ranks(hash_response_ids(new_ids, survey_year), precision)
+        cells = [new_keys * (1 << precision) + registers]
+        cell_ranks = [ranks]
+        if stored is not None:
+            old_cells, old_ranks = stored
+            cells.append(old_cells)
+            cell_ranks.append(old_ranks)
+
+        keys, offsets, registers, ranks = compact_cells(
+            np.concatenate(cells), np.concatenate(cell_ranks), precision
+        )
+        _save_table(output_dir / f"{name}.npz", key_names, _split_keys(keys, sizes), offsets, registers, ranks)
+        tables[name] = {'sketches': len(keys), 'registers': len(registers)}
+
+    tables = {}
+
+    # Респонденты по сегментам
+    save_merged(
+        RESPONDENTS_TABLE, dims, dim_sizes,
+        _stored_cells(store._table(RESPONDENTS_TABLE), dims, remaps, dim_sizes, precision),
+        segment_keys, demo_ids,
+    )
+
+    # Технология × сегмент
+    technologies = {category: dict(statuses) for category, statuses in store.manifest['technologies'].items()}
+    names = [name for name in store.manifest['tables'] if name != RESPONDENTS_TABLE]
+    names += [f"{tech_type}_{status}" for tech_type, status in tech_tables if f"{tech_type}_{status}" not in names]
+    for name in names:
+        tech_type, status = name.split('_', 1)
+        tech_df = tech_tables.get((tech_type, status))
+        response_ids = np.empty(0, np.int64) if tech_df is None else tech_df['ResponseId'].to_numpy(np.int64)
+        values = [] if tech_df is None else tech_df['Technology'].tolist()
+
+        old_labels = technologies.get(tech_type, {}).get(status, [])
+        labels, lookup, technology_remap = _extend_labels(old_labels, values)
+        technologies.setdefault(tech_type, {})[status] = labels
+        sizes = [len(labels)] + dim_sizes
+
+        positions = np.minimum(np.searchsorted(demo_ids, response_ids), len(demo_ids) - 1)
+        known = demo_ids[positions] == response_ids
+        tech_codes = np.fromiter((lookup[v] for v in values), dtype=np.int64, count=len(values))[known]
+        key_ids = tech_codes * int(np.prod(dim_sizes)) + segment_keys[positions[known]]
+
+        stored = None
+        if name in store.manifest['tables']:
+            stored = _stored_cells(
+                store._table(name), ['technology'] + dims,
+                {'technology': technology_remap, **remaps}, sizes, precision,
+            )
+        save_merged(name, ['technology'] + dims, sizes, stored, key_ids, response_ids[known])
+
+    manifest = {
+        'version': SKETCH_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'survey_year': survey_year,
+        'precision': precision,
+        'dimensions': dim_labels,
+        'technologies': technologies,
+        'tables': tables,
+    }
+    _save_json(manifest, output_dir / 'manifest.json')
+
+    return manifest
+
+# ============================================================================
+# ЧТЕНИЕ И ОЦЕНКА
+# ============================================================================
+
+class SketchStore:
+    """
+    Скетчи одного года опроса.
+
+    Фильтры - dict {измерение: значение или список значений}, как в query_index.
+    """
+
+    def __init__(self, path=SKETCH_DIR):
+        self.path = Path(path)
+
+        with open(self.path / 'manifest.json', 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+        self.precision = self.manifest['precision']
+        self.survey_year = self.manifest['survey_year']
+        self.dim_labels = self.manifest['dimensions']
+        self._tables = {}
+
+    def _table(self, name):
+        if name not in self._tables:
+            if name not in self.manifest['tables']:
+                raise ValueError(f"Нет скетчей {name}, доступны: {list(self.manifest['tables'])}")
+            with np.load(self.path / f"{name}.npz") as data:
+                self._tables[name] = {key: data[key] for key in data.files}
+        return self._tables[name]
+
+    def _selected(self, table, filters, technology=None, technology_labels=None):
+        """Маска скетчей, попадающих в фильтры"""
+        mask = np.ones(len(table['offsets']) - 1, dtype=bool)
+
+        if technology is not None:
+            codes = [technology_labels.index(t) for t in np.atleast_1d(technology) if t in technology_labels]
+            mask &= np.isin(table['key_technology'], codes)
+
+        for dim, values in (filters or {}).items():
+            if values is None:
+                continue
+            if dim not in self.dim_labels:
+                raise ValueError(f"Неизвестное измерение {dim}, доступны: {list(self.dim_labels)}")
+            labels = self.dim_labels[dim]
+            codes = [labels.index(v) for v in np.atleast_1d(values) if v in labels]
+            mask &= np.isin(table[f"key_{dim}"], codes)
+
+        return np.flatnonzero(mask)
+
+    def registers(self, category=None, status=None, technology=None, filters=None):
+        """
+        Плотный массив регистров объединения выбранных скетчей.
+
+        category=None - респонденты сегмента; technology=None - любая
+        технология категории (респонденты, выбравшие хоть одну).
+        """
+        if category is None:
+            table = self._table(RESPONDENTS_TABLE)
+            rows = self._selected(table, filters)
+        else:
+            table = self._table(f"{category}_{status}")
+            labels = self.manifest['technologies'].get(category, {}).get(status, [])
+            rows = self._selected(table, filters, technology, labels)
+
+        dense = np.zeros(1 << self.precision, dtype=np.uint8)
+        registers = gather_csr_rows(table['offsets'], table['register'], rows)
+        ranks = gather_csr_rows(table['offsets'], table['rank'], rows)
+        np.maximum.at(dense, registers, ranks)
+        return dense
+
+    def estimate(self, category=None, status=None, technology=None, filters=None):
+        """Приближенное число различных респондентов"""
+        return estimate_cardinality(self.registers(category, status, technology, filters))
+
+def load_sketches(path=SKETCH_DIR):
+    """Открытие скетчей одного года"""
+    return SketchStore(path)
+
+def estimate_union(stores, category=None, status=None, technology=None, filters=None):
+    """
+    Оценка по объединению нескольких хранилищ (например, разных лет опроса).
+
+    Returns:
+        (оценка, стандартная относительная ошибка)
+    """
+    precisions = {store.precision for store in stores}
+    if len(precisions) != 1:
+        raise ValueError(f"Скетчи с разной точностью не объединяются: {sorted(precisions)}")
+
+    merged = np.maximum.reduce([
+        store.registers(category, status, technology, filters) for store in stores
+    ])
+    return estimate_cardinality(merged), relative_error(precisions.pop())
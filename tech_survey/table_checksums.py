@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/table_checksums.py
+
+Контрольные суммы таблиц для проверки загрузки в BigQuery.
+
+Для каждой таблицы считается независимая от порядка строк сумма:
+- row_count - количество строк;
+- hash_sum  - сумма первых 32 бит MD5 ключа строки;
+- hash_xor  - XOR следующих 60 бит MD5 ключа строки.
+Ключ строки - значения ключевых столбцов через '|'. Одна и та же формула
+вычисляется локально (по CSV) и в BigQuery (одним агрегирующим запросом
+сразу по всем таблицам). Сумма и XOR складываются, поэтому контрольная
+сумма таблицы после дозаписи = комбинация прежней и дельты.
+"""
+
+import hashlib
+
+import pandas as pd
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+# Ключевые столбцы для контрольной суммы
+CHECKSUM_KEYS = {
+    'demographics': ['ResponseId'],
+    'tech_cube': ['Category', 'Status', 'Technology', 'Country', 'Age', 'EdLevel'],
+    'technology': ['ResponseId', 'Technology'],
+    'technology_responses': ['ResponseId', 'Category', 'Status', 'Technology'],
+    'technology_changes': ['ResponseId', 'Category', 'Technology'],
+    # Все <prefix>_bridge и <prefix>_values (DevType, Employment, ...)
+    'multiselect_bridge': ['ResponseId', 'ValueId'],
+    'multiselect_values': ['ValueId'],
+}
+
+KEY_SEPARATOR = '|'
+
+def get_checksum_keys(table_name):
+    """Ключевые столбцы для таблицы"""
+    if table_name not in CHECKSUM_KEYS and table_name.endswith(('_bridge', '_values')):
+        table_name = f"multiselect_{table_name.rsplit('_', 1)[1]}"
+    return CHECKSUM_KEYS.get(table_name, CHECKSUM_KEYS['technology'])
+
+# ============================================================================
+# ЛОКАЛЬНЫЙ РАСЧЕТ
+# ============================================================================
+
+def compute_checksum(df, key_columns):
+    """
+    Контрольная сумма DataFrame.
+
+    Значения приводятся к строкам так же, как CAST(... AS STRING) в BigQuery;
+    пропуски считаются пустой строкой (как COALESCE(..., '')).
+
+    Returns:
+        dict с ключами row_count, hash_sum, hash_xor
+    """
+    keys = None
+    for col in key_columns:
+        values = df[col]
+        if pd.api.types.is_float_dtype(values) and values.dropna().mod(1).eq(0).all():
+            # Целые числа с пропусками pandas читает как float
+            values = values.astype('Int64')
+        values = values.astype('string').fillna('')
+        keys = values if keys is None else keys + KEY_SEPARATOR + values
+
+    hash_sum = 0
+    hash_xor = 0
+    if keys is not None:
+        for key in keys:
+            digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+            hash_sum += int(digest[:8], 16)
+            hash_xor ^= int(digest[8:23], 16)
+
+    return {'row_count': len(df), 'hash_sum': hash_sum, 'hash_xor': hash_xor}
+
+def combine_checksums(first, second):
+    """
+    Контрольная сумма объединения двух наборов строк (например, таблицы
+    и дописанной к ней дельты) без пересчета по всем строкам
+    """
+    return {
+        'row_count': first['row_count'] + second['row_count'],
+        'hash_sum': first['hash_sum'] + second['hash_sum'],
+        'hash_xor': first['hash_xor'] ^ second['hash_xor'],
+    }
+
+def compute_file_checksum(csv_path, table_name):
+    """Контрольная сумма CSV файла подготовленной таблицы"""
+    key_columns = get_checksum_keys(table_name)
+    df = pd.read_csv(
+        csv_path,
+        usecols=key_columns,
+        keep_default_na=False,
+        na_values=[''],
+    )
+    return compute_checksum(df, key_columns)
+
+# ============================================================================
+# РАСЧЕТ В BIGQUERY
+# ============================================================================
+
+def _key_expression(key_columns):
+    parts = [f"COALESCE(CAST({col} AS STRING), '')" for col in key_columns]
+    if len(parts) == 1:
+        return parts[0]
+    separator = f", '{KEY_SEPARATOR}', "
+    return f"CONCAT({separator.join(parts)})"
+
+def build_checksum_query(tables):
+    """
+    Один запрос, считающий контрольные суммы всех таблиц.
+
+    Args:
+        tables: dict {table_name: полный table_id}
+
+    Returns:
+        SQL (UNION ALL по таблицам) со столбцами
+        table_name, row_count, hash_sum, hash_xor
+    """
+    selects = []
+    for table_name, table_id in tables.items():
+        key_expr = _key_expression(get_checksum_keys(table_name))
+        selects.append(
+            f"SELECT '{table_name}' AS table_name,\n"
+            f"  COUNT(*) AS row_count,\n"
+            f"  COALESCE(SUM(CAST(CONCAT('0x', SUBSTR(h, 1, 8)) AS INT64)), 0) AS hash_sum,\n"
+            f"  COALESCE(BIT_XOR(CAST(CONCAT('0x', SUBSTR(h, 9, 15)) AS INT64)), 0) AS hash_xor\n"
+            f"FROM (SELECT TO_HEX(MD5({key_expr})) AS h FROM `{table_id}`)"
+        )
+    return "\nUNION ALL\n".join(selects)
+
+def compare_checksums(local, remote):
+    """
+    Сравнение локальных и удаленных контрольных сумм.
+
+    Args:
+        local: dict {table_name: checksum}
+        remote: dict {table_name: checksum}
+
+    Returns:
+        dict {table_name: список несовпавших полей (пустой - таблица совпадает)}
+    """
+    result = {}
+    for table_name, expected in local.items():
+        actual = remote.get(table_name)
+        if actual is None:
+            result[table_name] = ['missing']
+            continue
+        result[table_name] = [
+            field for field in ('row_count', 'hash_sum', 'hash_xor')
+            if int(actual[field]) != int(expected[field])
+        ]
+    return result
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/table_writer.py
+
+Фоновая запись готовых таблиц в CSV (используется prepare.main;
+этапы pipeline пишут синхронно - см. pipeline.build_stages).
+
+Вычисление следующей таблицы не ждет записи предыдущей:
+1. submit() кладет таблицу в ограниченную очередь и сразу возвращает путь;
+2. потоки записи сериализуют таблицы (to_csv);
+3. очередь на max_pending таблиц - backpressure: если диск не успевает,
+   submit() блокируется, и вычисление не уходит вперед записи больше чем
+   на max_pending + workers таблиц (ссылки на DataFrame не накапливаются).
+
+stats показывает, сколько ожидания записи удалось скрыть: процессорное
+время записи (thread_time потоков - без ожидания GIL) минус время, которое
+основной поток провел в ожидании очереди и окончания записи. На одном ядре
+эта работа все равно конкурирует с вычислением - реальный выигрыш виден
+по общему времени в сравнении с workers=0.
+
+Использование:
+    with TableWriter(workers=2) as writer:
+        path = writer.submit(df, 'demographics.csv', 'data/processed')
+        ...  # следующая таблица считается, пока пишется эта
+    # после выхода из with все файлы записаны
+"""
+
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+# Потоков записи (0 - синхронная запись в submit). На одном
+# ядре фоновая запись только конкурирует с вычислением за процессор и GIL
+# (см. benchmarks/bench_table_writer.py), поэтому там по умолчанию 0
+DEFAULT_WRITERS = min(2, (os.cpu_count() or 1) - 1)
+# Таблиц в очереди, после которых submit() ждет освобождения места
+DEFAULT_MAX_PENDING = 4
+
+# ============================================================================
+# ФОНОВАЯ ЗАПИСЬ
+# ============================================================================
+
+class TableWriter:
+    """
+    Ограниченная очередь таблиц и потоки, записывающие их в CSV.
+
+    Переданный в submit() DataFrame не должен изменяться до окончания
+    записи (чтение из нескольких потоков безопасно). Ошибка записи
+    поднимается из close().
+
+    Args:
+        workers: потоков записи (0 - запись сразу в submit())
+        max_pending: таблиц в очереди (backpressure)
+    """
+
+    def __init__(self, workers=DEFAULT_WRITERS, max_pending=DEFAULT_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.results = {}
+        self.stats = {
+            'tables': 0,
+            'write_seconds': 0.0,
+            'write_cpu_seconds': 0.0,
+            'backpressure_seconds': 0.0,
+            'drain_seconds': 0.0,
+        }
+
+        self._order = []
+        self._errors = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._queue = queue.Queue(maxsize=max(max_pending, 1))
+        self._threads = [
+            threading.Thread(target=self._run, name=f"table-writer-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # При исключении в основном потоке ошибки записи его не заменяют
+        self.close(raise_errors=exc_type is None)
+        return False
+
+    # ------------------------------------------------------------------
+    # Запись
+    # ------------------------------------------------------------------
+
+    def submit(self, df, filename, output_dir):
+        """
+        Постановка таблицы в очередь записи
+
+        Returns:
+            путь к файлу (будет записан не позже close()) или None для пустой таблицы
+        """
+        if self._closed:
+            raise RuntimeError("TableWriter уже закрыт")
+        if df is None or len(df) == 0:
+            print(f"  ⚠️  Таблица пустая, пропускаем сохранение: {filename}")
+            return None
+
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        filepath = os.path.join(output_dir, filename)
+        self._order.append(filepath)
+
+        if self.workers == 0:
+            # Синхронная запись: основной поток ждет ее целиком
+            start = time.perf_counter()
+            self._write(df, filepath)
+            self.stats['backpressure_seconds'] += time.perf_counter() - start
+            return filepath
+
+        # Очередь заполнена - ждем потоки записи (backpressure)
+        start = time.perf_counter()
+        self._queue.put((df, filepath))
+        self.stats['backpressure_seconds'] += time.perf_counter() - start
+        print(f"  ⏳ В очереди на запись: {os.path.basename(filepath)} ({len(df):,} строк)")
+        return filepath
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                df, filepath = item
+                try:
+                    self._write(df, filepath)
+                except Exception as e:
+                    with self._lock:
+                        self._errors.append((filepath, e))
+            finally:
+                self._queue.task_done()
+
+    def _write(self, df, filepath):
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        df.to_csv(filepath, index=False, encoding='utf-8')
+        cpu_seconds = time.thread_time() - cpu_start
+        seconds = time.perf_counter() - start
+
+        with self._lock:
+            self.results[filepath] = {
+                'rows': len(df),
+                'columns': len(df.columns),
+                'size': os.path.getsize(filepath),
+                'seconds': seconds,
+            }
+            self.stats['tables'] += 1
+            self.stats['write_seconds'] += seconds
+            self.stats['write_cpu_seconds'] += cpu_seconds
+
+    # ------------------------------------------------------------------
+    # Завершение
+    # ------------------------------------------------------------------
+
+    def close(self, raise_errors=True):
+        """
+        Ожидание записи всех таблиц и остановка потоков
+
+        Returns:
+            stats (с hidden_seconds - скрытое ожидание записи)
+        """
+        if self._closed:
+            return self.stats
+        self._closed = True
+
+        start = time.perf_counter()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self._threads:
+            self.stats['drain_seconds'] = time.perf_counter() - start
+
+        waited = self.stats['backpressure_seconds'] + self.stats['drain_seconds']
+        self.stats['hidden_seconds'] = max(self.stats['write_cpu_seconds'] - waited, 0.0)
+
+        for filepath in self._order:
+            result = self.results.get(filepath)
+            if result:
+                print(f"  ✓ Сохранено: {os.path.basename(filepath)} - {result['rows']:,} строк × "
+                      f"{result['columns']}, {result['size'] / 1024:.1f} KB, {result['seconds']:.2f} сек")
+
+        if self._errors and raise_errors:
+            filepath, error = self._errors[0]
+            raise RuntimeError(f"Ошибка записи {filepath}: {type(error).__name__}: {error}") from error
+        return self.stats
@@ -0,0 +1,1047 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tech_survey/upload.py
+
+Скрипт для загрузки подготовленных данных в BigQuery
+"""
+
+import os
+import json
+import random
+import uuid
+from google.api_core import exceptions as api_exceptions
+from google.cloud import bigquery
+from google.cloud.exceptions import NotFound
+from dotenv import load_dotenv
+from pathlib import Path
+from datetime import datetime
+import time
+
+from tech_survey.bq_query import run_query, query_dataframe
+from tech_survey.cli import parse_command
+from tech_survey.prepare import CHANGES_TABLE, CONSOLIDATED_TABLE, MULTISELECT_COLUMNS
+from tech_survey.schema_validation import format_issue, read_csv_for_validation, validate_dataframe
+from tech_survey.table_checksums import (
+    compute_file_checksum, build_checksum_query, combine_checksums, compare_checksums, get_checksum_keys
+)
+
+# ============================================================================
+# НАСТРОЙКИ
+# ============================================================================
+
+# Загрузка переменных окружения
+load_dotenv()
+
+# Установка credentials
+CREDENTIALS_PATH = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+PROJECT_ID = os.getenv('GCP_PROJECT_ID')
+DATASET_ID = os.getenv('BIGQUERY_DATASET', 'tech_survey_data')
+
+# Путь к подготовленным данным
+DATA_DIR = 'data/processed'
+# Новые строки от prepare --append (загружаются upload --append)
+DELTA_DIR = os.path.join(DATA_DIR, 'delta')
+
+# Bridge таблицы столбцов с множественным выбором (prepare.MULTISELECT_COLUMNS):
+# <prefix>_bridge (ResponseId, ValueId) и словарь <prefix>_values (ValueId, Value)
+MULTISELECT_TABLES = list(MULTISELECT_COLUMNS.values())
+MULTISELECT_FILES = [
+    f"{prefix}_{suffix}.csv" for prefix in MULTISELECT_TABLES for suffix in ('bridge', 'values')
+]
+
+# Список файлов для загрузки
+FILES_TO_UPLOAD = [
+    'demographics.csv',
+    'language_haveworked.csv',
+    'language_wanttowork.csv',
+    'database_haveworked.csv',
+    'database_wanttowork.csv',
+    'platform_haveworked.csv',
+    'platform_wanttowork.csv',
+    'webframe_haveworked.csv',
+    'webframe_wanttowork.csv',
+    *MULTISELECT_FILES,
+    f'{CHANGES_TABLE}.csv',
+    'tech_cube.csv'
+]
+
+# Вариант с единой таблицей фактов (prepare.CONSOLIDATED_TABLE)
+# вместо 8 технологических таблиц (--consolidated)
+CONSOLIDATED_FILES_TO_UPLOAD = [
+    'demographics.csv',
+    f'{CONSOLIDATED_TABLE}.csv',
+    *MULTISELECT_FILES,
+    f'{CHANGES_TABLE}.csv',
+    'tech_cube.csv'
+]
+
+# Схемы таблиц
+TABLE_SCHEMAS = {
+    'demographics': [
+        bigquery.SchemaField("ResponseId", "INTEGER", mode="REQUIRED"),
+        bigquery.SchemaField("Country", "STRING", mode="NULLABLE"),
+        bigquery.SchemaField("Age", "STRING", mode="NULLABLE"),
+        bigquery.SchemaField("EdLevel", "STRING", mode="NULLABLE"),
+        bigquery.SchemaField("YearsCode", "STRING", mode="NULLABLE"),
+        bigquery.SchemaField("YearsCodePro", "STRING", mode="NULLABLE"),
+        bigquery.SchemaField("Employment", "STRING", mode="NULLABLE"),
+        bigquery.SchemaField("RemoteWork", "STRING", mode="NULLABLE"),
+        bigquery.SchemaField("DevType", "STRING", mode="NULLABLE"),
+        bigquery.SchemaField("OrgSize", "STRING", mode="NULLABLE"),
+        bigquery.SchemaField("Country_IsValid", "BOOLEAN", mode="NULLABLE"),
+        bigquery.SchemaField("Age_IsValid", "BOOLEAN", mode="NULLABLE"),
+        bigquery.SchemaField("EdLevel_IsValid", "BOOLEAN", mode="NULLABLE"),
+        bigquery.SchemaField("YearsCode_IsValid", "BOOLEAN", mode="NULLABLE"),
+        bigquery.SchemaField("YearsCodePro_IsValid", "BOOLEAN", mode="NULLABLE"),
+        bigquery.SchemaField("Employment_IsValid", "BOOLEAN", mode="NULLABLE"),
+        bigquery.SchemaField("RemoteWork_IsValid", "BOOLEAN", mode="NULLABLE"),
+        bigquery.SchemaField("DevType_IsValid", "BOOLEAN", mode="NULLABLE"),
+        bigquery.SchemaField("OrgSize_IsValid", "BOOLEAN", mode="NULLABLE"),
+        bigquery.SchemaField("CreatedAt", "TIMESTAMP", mode="NULLABLE"),
+    ],
+    'technology': [
+        bigquery.SchemaField("ResponseId", "INTEGER", mode="REQUIRED"),
+        bigquery.SchemaField("Technology", "STRING", mode="REQUIRED"),
+    ],
+    CONSOLIDATED_TABLE: [
+        bigquery.SchemaField("ResponseId", "INTEGER", mode="REQUIRED"),
+        bigquery.SchemaField("Category", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("Status", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("Technology", "STRING", mode="REQUIRED"),
+    ],
+    CHANGES_TABLE: [
+        bigquery.SchemaField("ResponseId", "INTEGER", mode="REQUIRED"),
+        bigquery.SchemaField("Category", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("Technology", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("Change", "STRING", mode="REQUIRED"),
+    ],
+    # Общие схемы всех <prefix>_bridge и <prefix>_values (см. get_table_schema)
+    'multiselect_bridge': [
+        bigquery.SchemaField("ResponseId", "INTEGER", mode="REQUIRED"),
+        bigquery.SchemaField("ValueId", "INTEGER", mode="REQUIRED"),
+    ],
+    'multiselect_values': [
+        bigquery.SchemaField("ValueId", "INTEGER", mode="REQUIRED"),
+        bigquery.SchemaField("Value", "STRING", mode="REQUIRED"),
+    ],
+    'tech_cube': [
+        bigquery.SchemaField("Category", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("Status", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("Technology", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("Country", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("Age", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("EdLevel", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("GroupingId", "INTEGER", mode="REQUIRED"),
+        bigquery.SchemaField("RespondentCount", "INTEGER", mode="REQUIRED"),
+        bigquery.SchemaField("SegmentRespondents", "INTEGER", mode="REQUIRED"),
+        bigquery.SchemaField("Percentage", "FLOAT", mode="NULLABLE"),
+    ]
+}
+
+# Кластеризация таблиц (фильтры дашборда читают только нужные блоки)
+TABLE_CLUSTERING = {
+    'tech_cube': ['Category', 'Status', 'Country', 'Age'],
+    CONSOLIDATED_TABLE: ['Category', 'Status', 'Technology'],
+    CHANGES_TABLE: ['Category', 'Change', 'Technology'],
+    # Фильтр по роли/занятости - соединение по ValueId
+    **{f"{prefix}_bridge": ['ValueId'] for prefix in MULTISELECT_TABLES},
+}
+
+# Агрегаты при --append перезаписываются целиком (их строки меняются, а не добавляются);
+# словари значений тоже: новые значения дописываются в конец словаря
+APPEND_REPLACED_TABLES = {'tech_cube', *(f"{prefix}_values" for prefix in MULTISELECT_TABLES)}
+
+# Checkpoint состояния загрузки (для --resume)
+CHECKPOINT_PATH = os.path.join(DATA_DIR, '.upload_checkpoint.json')
+
+# Повторы при временных ошибках (экспоненциальная задержка с jitter)
+UPLOAD_MAX_RETRIES = 5
+RETRY_BASE_DELAY = 2.0  # сек
+RETRY_MAX_DELAY = 60.0  # сек
+
+TRANSIENT_ERROR_TYPES = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.InternalServerError,
+    api_exceptions.BadGateway,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.GatewayTimeout,
+    ConnectionError,
+    TimeoutError,
+)
+
+# Причины ошибок BigQuery, после которых повтор имеет смысл
+TRANSIENT_ERROR_REASONS = {'backendError', 'internalError', 'rateLimitExceeded', 'quotaExceeded'}
+
+# ============================================================================
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ============================================================================
+
+def print_header(text):
+    """Печать заголовка"""
+    print("\n" + "="*70)
+    print(text)
+    print("="*70)
+
+def print_subheader(text):
+    """Печать подзаголовка"""
+    print("\n" + "─"*70)
+    print(text)
+    print("─"*70)
+
+# ============================================================================
+# ПОВТОРЫ И CHECKPOINT
+# ============================================================================
+
+def is_transient_error(error):
+    """Временная ли ошибка (сеть, 5xx, превышение rate limit / quota)"""
+    if isinstance(error, TRANSIENT_ERROR_TYPES):
+        return True
+    
+    reasons = {e.get('reason') for e in (getattr(error, 'errors', None) or []) if isinstance(e, dict)}
+    return bool(reasons & TRANSIENT_ERROR_REASONS)
+
+def get_retry_delay(attempt, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """Задержка перед повтором: экспоненциальный рост с full jitter"""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+def call_with_retry(func, max_retries=UPLOAD_MAX_RETRIES, sleep=time.sleep, on_retry=None):
+    """
+    Вызов func() с повторами при временных ошибках
+    
+    Args:
+        func: функция без аргументов
+        max_retries: максимум повторов (всего попыток - max_retries + 1)
+        sleep: функция ожидания (подменяется в тестах)
+        on_retry: callback(attempt, error, delay) перед каждым повтором
+    
+    Returns:
+        (результат func, число попыток)
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(), attempt + 1
+        except Exception as e:
+            if attempt >= max_retries or not is_transient_error(e):
+                raise
+            delay = get_retry_delay(attempt)
+            if on_retry:
+                on_retry(attempt + 1, e, delay)
+            sleep(delay)
+            attempt += 1
+
+def get_file_fingerprint(path):
+    """Отпечаток файла для проверки, что он не менялся с прошлого запуска"""
+    stat = os.stat(path)
+    return {'file_size': stat.st_size, 'file_mtime': stat.st_mtime}
+
+def load_checkpoint(checkpoint_path, dataset_id):
+    """Checkpoint прошлого запуска (None - нет или другой dataset)"""
+    if not os.path.exists(checkpoint_path):
+        return None
+    
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if checkpoint.get('dataset') != f"{PROJECT_ID}.{dataset_id}":
+        return None
+    return checkpoint
+
+def save_checkpoint(checkpoint, checkpoint_path):
+    """Атомарная запись checkpoint"""
+    Path(checkpoint_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, checkpoint_path)
+
+def is_table_completed(checkpoint, table_name, csv_path):
+    """Таблица загружена в прошлом запуске и файл с тех пор не менялся"""
+    if checkpoint is None:
+        return False
+    
+    state = checkpoint['tables'].get(table_name)
+    if not state or state.get('status') != 'done' or not os.path.exists(csv_path):
+        return False
+    
+    fingerprint = get_file_fingerprint(csv_path)
+    return all(state.get(key) == value for key, value in fingerprint.items())
+
+def check_credentials():
+    """Проверка credentials"""
+    print_header("🔐 ПРОВЕРКА CREDENTIALS")
+    
+    if not os.path.exists(CREDENTIALS_PATH):
+        raise FileNotFoundError(f"Credentials файл не найден: {CREDENTIALS_PATH}")
+    
+    print(f"✓ Credentials файл: {CREDENTIALS_PATH}")
+    
+    # Установка переменной окружения
+    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = CREDENTIALS_PATH
+    print(f"✓ Переменная окружения установлена")
+
+def init_bigquery_client():
+    """Инициализация BigQuery клиента"""
+    print_header("🔌 ПОДКЛЮЧЕНИЕ К BIGQUERY")
+    
+    print(f"Project ID: {PROJECT_ID}")
+    print(f"Dataset ID: {DATASET_ID}")
+    
+    try:
+        client = bigquery.Client(project=PROJECT_ID)
+        
+        # Проверка подключения (повторные запуски в пределах TTL берут ответ из кэша)
+        query = "SELECT 1 as test"
+        run_query(client, query)
+        
+        print("✓ Подключение успешно")
+        return client
+        
+    except Exception as e:
+        print(f"❌ Ошибка подключения: {e}")
+        raise
+
+def check_dataset_exists(client, dataset_id):
+    """Проверка существования dataset"""
+    print_subheader(f"📊 Проверка dataset: {dataset_id}")
+    
+    try:
+        dataset_ref = f"{PROJECT_ID}.{dataset_id}"
+        dataset = client.get_dataset(dataset_ref)
+        print(f"✓ Dataset существует: {dataset_ref}")
+        print(f"  Location: {dataset.location}")
+        print(f"  Created: {dataset.created}")
+        return True
+        
+    except NotFound:
+        print(f"❌ Dataset не найден: {dataset_ref}")
+        print("\nСоздайте dataset вручную:")
+        print("1. Откройте https://console.cloud.google.com/bigquery")
+        print(f"2. Создайте dataset с именем: {dataset_id}")
+        print("3. Location: US (или EU)")
+        return False
+
+def get_files_to_upload(consolidated=False):
+    """Список CSV для загрузки: 8 технологических таблиц или одна technology_responses"""
+    return CONSOLIDATED_FILES_TO_UPLOAD if consolidated else FILES_TO_UPLOAD
+
+def get_table_schema(table_name):
+    """Получение схемы для таблицы"""
+    if table_name in TABLE_SCHEMAS:
+        return TABLE_SCHEMAS[table_name]
+    elif table_name.endswith(('_bridge', '_values')):
+        return TABLE_SCHEMAS[f"multiselect_{table_name.rsplit('_', 1)[1]}"]
+    else:
+        return TABLE_SCHEMAS['technology']
+
+def validate_table_file(table_name, csv_path, df=None):
+    """
+    Локальная проверка CSV по схеме таблицы до отправки в BigQuery
+    (типы, REQUIRED, уникальность ключа - см. schema_validation)
+    
+    Args:
+        df: уже прочитанный read_csv_for_validation файл (чтобы не читать повторно)
+    
+    Returns:
+        список проблем (пустой - файл можно загружать)
+    """
+    if df is None:
+        df = read_csv_for_validation(csv_path)
+    issues = validate_dataframe(df, get_table_schema(table_name), get_checksum_keys(table_name))
+    
+    if issues:
+        print(f"  ❌ {table_name}: не соответствует схеме, проблем: {len(issues)}")
+        for issue in issues:
+            print(f"    - {format_issue(issue)}")
+    else:
+        print(f"  ✓ {table_name}: {len(df):,} строк соответствуют схеме")
+    return issues
+
+def validate_upload_files(files):
+    """
+    Проверка всех файлов перед загрузкой
+    
+    Returns:
+        dict {table_name: список проблем} только для файлов с проблемами
+    """
+    failed = {}
+    for filename in files:
+        table_name = filename.replace('.csv', '')
+        csv_path = os.path.join(DATA_DIR, filename)
+        if not os.path.exists(csv_path):
+            print(f"  ⚠️  {table_name}: файл не найден ({csv_path})")
+            continue
+        issues = validate_table_file(table_name, csv_path)
+        if issues:
+            failed[table_name] = issues
+    return failed
+
+def create_or_replace_table(client, dataset_id, table_name, schema):
+    """Создание или замена таблицы"""
+    table_id = f"{PROJECT_ID}.{dataset_id}.{table_name}"
+    
+    # Удаляем таблицу если существует
+    try:
+        client.delete_table(table_id)
+        print(f"  ⚠️  Существующая таблица удалена")
+    except NotFound:
+        pass
+    
+    # Создаем новую таблицу
+    table = bigquery.Table(table_id, schema=schema)
+    if table_name in TABLE_CLUSTERING:
+        table.clustering_fields = TABLE_CLUSTERING[table_name]
+    table = client.create_table(table)
+    print(f"  ✓ Таблица создана: {table_name}")
+    
+    return table
+
+def make_load_job_config(table_name, schema, append=False):
+    """Настройки load job для CSV (WRITE_APPEND при append, иначе WRITE_TRUNCATE)"""
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.CSV,
+        skip_leading_rows=1,  # Пропускаем заголовок
+        autodetect=False,  # Используем явную схему
+        schema=schema,
+        write_disposition=(
+            bigquery.WriteDisposition.WRITE_APPEND if append
+            else bigquery.WriteDisposition.WRITE_TRUNCATE  # Перезаписываем
+        ),
+        allow_quoted_newlines=True,  # Разрешаем переносы строк в кавычках
+        max_bad_records=10  # Максимум плохих строк
+    )
+    if table_name in TABLE_CLUSTERING:
+        job_config.clustering_fields = TABLE_CLUSTERING[table_name]
+    return job_config
+
+def load_csv_to_table(client, dataset_id, table_name, csv_path, schema):
+    """
+    Пересоздание таблицы и загрузка в нее CSV (исключения не перехватываются)
+    
+    Повтор всей последовательности безопасен: таблица пересоздается,
+    строки перезаписываются (WRITE_TRUNCATE).
+    
+    Returns:
+        (завершенный load job, таблица после загрузки)
+    """
+    table_id = f"{PROJECT_ID}.{dataset_id}.{table_name}"
+    create_or_replace_table(client, dataset_id, table_name, schema)
+    
+    with open(csv_path, "rb") as source_file:
+        job = client.load_table_from_file(
+            source_file,
+            table_id,
+            job_config=make_load_job_config(table_name, schema)
+        )
+    
+    # Ожидание завершения job
+    job.result()
+    
+    return job, client.get_table(table_id)
+
+def append_csv_to_table(client, dataset_id, table_name, csv_path, schema,
+                        max_retries=UPLOAD_MAX_RETRIES, sleep=time.sleep, on_retry=None):
+    """
+    Дозапись CSV в существующую таблицу (WRITE_APPEND) без риска дописать строки дважды
+    
+    Повтор всей последовательности, как в load_csv_to_table, здесь небезопасен:
+    если job уже записал строки, а ошибка пришла при ожидании результата
+    или чтении таблицы, повтор загрузил бы дельту еще раз. Поэтому:
+    - повторяется только отправка job с заранее заданным job_id; перед
+      повторной отправкой проверяется, не создан ли job прошлой попыткой;
+    - ожидание повторяется только пока job не завершен; после состояния
+      DONE ошибка job окончательная (повтор - новый запуск upload --append,
+      файл дельты при ошибке не удаляется).
+    
+    Returns:
+        ((завершенный load job, таблица после загрузки), число попыток отправки)
+    """
+    table_id = f"{PROJECT_ID}.{dataset_id}.{table_name}"
+    job_id = f"tech_survey_append_{table_name}_{uuid.uuid4().hex}"
+    job_config = make_load_job_config(table_name, schema, append=True)
+    submissions = []
+    
+    def submit():
+        if submissions:
+            # Ответ на прошлую отправку мог потеряться уже после создания job
+            try:
+                return client.get_job(job_id)
+            except NotFound:
+                pass
+        submissions.append(job_id)
+        try:
+            with open(csv_path, "rb") as source_file:
+                return client.load_table_from_file(
+                    source_file, table_id, job_config=job_config, job_id=job_id
+                )
+        except api_exceptions.Conflict:
+            return client.get_job(job_id)
+    
+    job, attempts = call_with_retry(submit, max_retries=max_retries, sleep=sleep, on_retry=on_retry)
+    
+    def wait():
+        try:
+            return job.result()
+        except Exception as e:
+            # Состояние job на сервере: не завершен - повтор ожидания,
+            # DONE без ошибки - строки записаны (сбой был только при опросе),
+            # DONE с ошибкой - окончательно, без повторов
+            state = client.get_job(job_id)
+            if state.state != 'DONE':
+                raise
+            if state.error_result:
+                raise RuntimeError(f"Load job {job_id} завершен с ошибкой: {state.error_result}") from e
+            return None
+    
+    call_with_retry(wait, max_retries=max_retries, sleep=sleep, on_retry=on_retry)
+    table, _ = call_with_retry(lambda: client.get_table(table_id), max_retries=max_retries, sleep=sleep)
+    
+    return (job, table), attempts
+
+def upload_csv_to_bigquery(client, dataset_id, table_name, csv_path,
+                           max_retries=UPLOAD_MAX_RETRIES, sleep=time.sleep, validate=True, append=False):
+    """
+    Загрузка CSV файла в BigQuery таблицу
+    
+    Временные ошибки повторяются с экспоненциальной задержкой (call_with_retry).
+    При validate=True файл сначала проверяется по схеме локально
+    (validate_table_file) и при проблемах не отправляется.
+    При append=True строки дописываются в существующую таблицу
+    (append_csv_to_table: повторяется только отправка job, не загрузка).
+    
+    Returns:
+        dict: success, attempts, error
+    """
+    print_subheader(f"📤 Загрузка: {table_name}")
+    
+    # Проверка существования файла
+    if not os.path.exists(csv_path):
+        print(f"  ❌ Файл не найден: {csv_path}")
+        return {'success': False, 'attempts': 0, 'error': 'File not found'}
+    
+    # Информация о файле
+    file_size = os.path.getsize(csv_path) / 1024  # KB
+    df = read_csv_for_validation(csv_path)
+    print(f"  Файл: {os.path.basename(csv_path)}")
+    print(f"  Размер: {file_size:.1f} KB")
+    print(f"  Строк: {len(df):,}")
+    print(f"  Столбцов: {len(df.columns)}")
+    
+    # Проверка по схеме до отправки (ошибки типов не должны стоить load job)
+    if validate and validate_table_file(table_name, csv_path, df):
+        return {'success': False, 'attempts': 0, 'error': 'Schema validation failed'}
+    
+    # Получение схемы
+    schema = get_table_schema(table_name)
+    
+    def report_retry(attempt, error, delay):
+        print(f"  ⚠️  Временная ошибка: {type(error).__name__}: {error}")
+        print(f"  🔁 Повтор {attempt}/{max_retries} через {delay:.1f} сек")
+    
+    # Загрузка данных
+    print(f"  🔄 {'Дозапись' if append else 'Загрузка'} данных в BigQuery...")
+    start_time = time.time()
+    
+    try:
+        if append:
+            (job, table), attempts = append_csv_to_table(
+                client, dataset_id, table_name, csv_path, schema,
+                max_retries=max_retries, sleep=sleep, on_retry=report_retry,
+            )
+        else:
+            (job, table), attempts = call_with_retry(
+                lambda: load_csv_to_table(client, dataset_id, table_name, csv_path, schema),
+                max_retries=max_retries,
+                sleep=sleep,
+                on_retry=report_retry,
+            )
+        
+        elapsed_time = time.time() - start_time
+        
+        print(f"  ✓ Загрузка завершена за {elapsed_time:.1f} сек (попыток: {attempts})")
+        print(f"  ✓ Загружено строк: {table.num_rows:,}")
+        
+        if job.errors:
+            print(f"  ⚠️  Ошибок при загрузке: {len(job.errors)}")
+            for error in job.errors[:5]:  # Показываем первые 5 ошибок
+                print(f"    - {error}")
+        
+        return {'success': True, 'attempts': attempts, 'error': None}
+        
+    except Exception as e:
+        print(f"  ❌ Ошибка загрузки: {e}")
+        
+        if hasattr(e, 'errors') and e.errors:
+            print(f"\n  Детали ошибок:")
+            for error in e.errors[:5]:
+                print(f"    {error}")
+        
+        return {'success': False, 'attempts': None, 'error': f"{type(e).__name__}: {e}"}
+
+def verify_uploaded_tables(client, dataset_id, local_checksums):
+    """
+    Проверка всех загруженных таблиц одним агрегирующим запросом
+    
+    Сравнивает количество строк и контрольные суммы ключей (см. table_checksums)
+    с посчитанными локально по CSV.
+    
+    Args:
+        local_checksums: dict {table_name: checksum}
+    
+    Returns:
+        dict {table_name: список несовпавших полей (пустой - таблица совпадает)}
+    """
+    print_header("🔍 ПРОВЕРКА ЗАГРУЖЕННЫХ ДАННЫХ")
+    
+    if not local_checksums:
+        print("⚠️  Нет таблиц для проверки")
+        return {}
+    
+    tables = {
+        table_name: f"{PROJECT_ID}.{dataset_id}.{table_name}"
+        for table_name in local_checksums
+    }
+    
+    # Без кэша: проверка должна читать текущие данные, и одного запроса
+    # достаточно (без запроса версий таблиц)
+    start_time = time.time()
+    remote_df, _ = call_with_retry(
+        lambda: query_dataframe(client, build_checksum_query(tables), use_cache=False)
+    )
+    elapsed_time = time.time() - start_time
+    
+    remote_checksums = {
+        row['table_name']: row for row in remote_df.to_dict('records')
+    }
+    mismatches = compare_checksums(local_checksums, remote_checksums)
+    
+    print(f"Проверено таблиц: {len(tables)} (1 запрос, {elapsed_time:.1f} сек)\n")
+    for table_name, fields in mismatches.items():
+        expected_rows = local_checksums[table_name]['row_count']
+        if not fields:
+            print(f"  ✓ {table_name}: {expected_rows:,} строк, контрольная сумма совпадает")
+        elif fields == ['missing']:
+            print(f"  ❌ {table_name}: таблица отсутствует в результате проверки")
+        else:
+            actual_rows = int(remote_checksums[table_name]['row_count'])
+            print(f"  ❌ {table_name}: несовпадение ({', '.join(fields)}), "
+                  f"строк {actual_rows:,} (ожидалось {expected_rows:,})")
+    
+    return mismatches
+
+def create_summary_report(results):
+    """Создание итогового отчета"""
+    print_header("📊 ИТОГОВЫЙ ОТЧЕТ")
+    
+    successful = [r for r in results if r['success']]
+    failed = [r for r in results if not r['success']]
+    
+    print(f"\nУспешно загружено: {len(successful)}/{len(results)}")
+    
+    if successful:
+        print("\n✓ Успешные загрузки:")
+        for result in successful:
+            print(f"  • {result['table_name']}: {result['rows']:,} строк")
+    
+    if failed:
+        print("\n❌ Неудачные загрузки:")
+        for result in failed:
+            print(f"  • {result['table_name']}: {result['error']}")
+    
+    # Общая статистика
+    total_rows = sum(r['rows'] for r in successful)
+    print(f"\n📊 Всего загружено строк: {total_rows:,}")
+    
+    return len(failed) == 0
+
+# ============================================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================================
+
+def run_upload(client, dataset_id, files=None, resume=False, checkpoint_path=CHECKPOINT_PATH,
+               max_retries=UPLOAD_MAX_RETRIES, sleep=time.sleep, validate=True):
+    """
+    Загрузка файлов с checkpoint после каждой таблицы и проверкой в конце
+    
+    Args:
+        client: bigquery.Client (или совместимая замена)
+        files: список CSV файлов (по умолчанию FILES_TO_UPLOAD)
+        resume: пропустить таблицы, загруженные в прошлом запуске
+        validate: проверить по схеме все загружаемые файлы до первой загрузки;
+            при проблемах ни одна таблица не загружается
+    
+    Returns:
+        список результатов по таблицам
+    """
+    files = FILES_TO_UPLOAD if files is None else files
+    
+    previous = load_checkpoint(checkpoint_path, dataset_id) if resume else None
+    if resume and previous is None:
+        print("⚠️  Checkpoint не найден, выполняется полная загрузка")
+    
+    checkpoint = {
+        'dataset': f"{PROJECT_ID}.{dataset_id}",
+        'started': previous['started'] if previous else datetime.now().isoformat(timespec='seconds'),
+        'tables': dict(previous['tables']) if previous else {},
+    }
+    
+    pending = [
+        filename for filename in files
+        if not is_table_completed(previous, filename.replace('.csv', ''), os.path.join(DATA_DIR, filename))
+    ]
+    if validate and pending:
+        print_subheader(f"🧪 Проверка по схеме: {len(pending)} файлов")
+        invalid = validate_upload_files(pending)
+        if invalid:
+            return [
+                {
+                    'table_name': table_name,
+                    'success': False,
+                    'rows': 0,
+                    'error': f"Schema validation failed, issues: {len(issues)}"
+                }
+                for table_name, issues in invalid.items()
+            ]
+    
+    results = []
+    local_checksums = {}
+    for filename in files:
+        # Определяем имя таблицы (без расширения .csv)
+        table_name = filename.replace('.csv', '')
+        csv_path = os.path.join(DATA_DIR, filename)
+        
+        # Таблица уже загружена в прошлом запуске
+        if is_table_completed(previous, table_name, csv_path):
+            state = checkpoint['tables'][table_name]
+            local_checksums[table_name] = state['checksum']
+            print(f"\n  ⏭️  {table_name}: уже загружена ({state['finished']}), пропускаем")
+            results.append({
+                'table_name': table_name,
+                'success': True,
+                'rows': state['checksum']['row_count'],
+                'error': None
+            })
+            continue
+        
+        checkpoint['tables'][table_name] = {'status': 'in_progress'}
+        save_checkpoint(checkpoint, checkpoint_path)
+        
+        # Загружаем файл
+        upload = upload_csv_to_bigquery(
+            client, dataset_id, table_name, csv_path, max_retries=max_retries, sleep=sleep, validate=False
+        )
+        
+        # Если загрузка успешна - считаем локальную контрольную сумму
+        if upload['success']:
+            local_checksums[table_name] = compute_file_checksum(csv_path, table_name)
+            checkpoint['tables'][table_name] = {
+                'status': 'done',
+                'attempts': upload['attempts'],
+                'finished': datetime.now().isoformat(timespec='seconds'),
+                'checksum': local_checksums[table_name],
+                **get_file_fingerprint(csv_path),
+            }
+            
+            results.append({
+                'table_name': table_name,
+                'success': True,
+                'rows': local_checksums[table_name]['row_count'],
+                'error': None
+            })
+        else:
+            checkpoint['tables'][table_name] = {'status': 'failed', 'error': upload['error']}
+            
+            results.append({
+                'table_name': table_name,
+                'success': False,
+                'rows': 0,
+                'error': upload['error'] or 'Upload failed'
+            })
+        
+        save_checkpoint(checkpoint, checkpoint_path)
+    
+    # Проверка загруженных данных
+    mismatches = verify_uploaded_tables(client, dataset_id, local_checksums)
+    for result in results:
+        fields = mismatches.get(result['table_name'])
+        if fields:
+            result['success'] = False
+            result['error'] = f"Checksum mismatch: {', '.join(fields)}"
+            # Таблицу нужно загрузить заново при --resume
+            checkpoint['tables'][result['table_name']] = {'status': 'failed', 'error': result['error']}
+    save_checkpoint(checkpoint, checkpoint_path)
+    
+    return results
+
+def run_append_upload(client, dataset_id, files=None, checkpoint_path=CHECKPOINT_PATH,
+                      max_retries=UPLOAD_MAX_RETRIES, sleep=time.sleep, validate=True):
+    """
+    Дозапись новых строк (DELTA_DIR, создается prepare --append) в таблицы BigQuery
+    
+    Таблицы фактов получают только дельту (WRITE_APPEND), агрегаты
+    APPEND_REPLACED_TABLES перезаписываются целиком. Ожидаемая контрольная
+    сумма таблицы - комбинация суммы из checkpoint прошлой загрузки и суммы
+    дельты, поэтому весь CSV заново не читается. Файл дельты удаляется сразу
+    после успешной дозаписи, чтобы повторный запуск не дописал его дважды.
+    
+    Returns:
+        список результатов по таблицам (таблицы без новых строк не включаются)
+    """
+    files = FILES_TO_UPLOAD if files is None else files
+    previous = load_checkpoint(checkpoint_path, dataset_id)
+    checkpoint = {
+        'dataset': f"{PROJECT_ID}.{dataset_id}",
+        'started': previous['started'] if previous else datetime.now().isoformat(timespec='seconds'),
+        'tables': dict(previous['tables']) if previous else {},
+    }
+    
+    # План: (таблица, файл для загрузки, полный CSV, дозапись?)
+    plan = []
+    for filename in files:
+        table_name = filename.replace('.csv', '')
+        full_path = os.path.join(DATA_DIR, filename)
+        if table_name in APPEND_REPLACED_TABLES:
+            plan.append((table_name, full_path, full_path, False))
+        elif os.path.exists(os.path.join(DELTA_DIR, filename)):
+            plan.append((table_name, os.path.join(DELTA_DIR, filename), full_path, True))
+        else:
+            print(f"  ⏭️  {table_name}: новых строк нет")
+    
+    if not any(append for *_, append in plan):
+        print(f"⚠️  Новых строк нет ({DELTA_DIR}/ пуст): python -m tech_survey prepare --append")
+        return []
+    
+    if validate:
+        print_subheader(f"🧪 Проверка по схеме: {len(plan)} файлов")
+        invalid = {}
+        for table_name, csv_path, _, _ in plan:
+            issues = validate_table_file(table_name, csv_path)
+            if issues:
+                invalid[table_name] = issues
+        if invalid:
+            return [
+                {
+                    'table_name': table_name,
+                    'success': False,
+                    'rows': 0,
+                    'error': f"Schema validation failed, issues: {len(issues)}"
+                }
+                for table_name, issues in invalid.items()
+            ]
+    
+    results = []
+    expected_checksums = {}
+    for table_name, csv_path, full_path, append in plan:
+        state = checkpoint['tables'].get(table_name) or {}
+        if append and state.get('status') == 'done':
+            # Таблица в BigQuery = прошлая загрузка + дельта
+            expected = combine_checksums(state['checksum'], compute_file_checksum(csv_path, table_name))
+        else:
+            expected = compute_file_checksum(full_path, table_name)
+        
+        upload = upload_csv_to_bigquery(
+            client, dataset_id, table_name, csv_path,
+            max_retries=max_retries, sleep=sleep, validate=False, append=append,
+        )
+        
+        if upload['success']:
+            if append:
+                os.remove(csv_path)
+            expected_checksums[table_name] = expected
+            checkpoint['tables'][table_name] = {
+                'status': 'done',
+                'attempts': upload['attempts'],
+                'finished': datetime.now().isoformat(timespec='seconds'),
+                'checksum': expected,
+                **get_file_fingerprint(full_path),
+            }
+            results.append({'table_name': table_name, 'success': True, 'rows': expected['row_count'], 'error': None})
+        else:
+            results.append({
+                'table_name': table_name,
+                'success': False,
+                'rows': 0,
+                'error': upload['error'] or 'Upload failed'
+            })
+        save_checkpoint(checkpoint, checkpoint_path)
+    
+    # Проверка: строки таблицы в BigQuery = все строки локального CSV
+    mismatches = verify_uploaded_tables(client, dataset_id, expected_checksums)
+    for result in results:
+        fields = mismatches.get(result['table_name'])
+        if fields:
+            result['success'] = False
+            result['error'] = f"Checksum mismatch: {', '.join(fields)}"
+            checkpoint['tables'][result['table_name']] = {'status': 'failed', 'error': result['error']}
+    save_checkpoint(checkpoint, checkpoint_path)
+    
+    return results
+
+def clear_delta(files):
+    """Удаление дельт таблиц, загруженных целиком (они уже в полной загрузке)"""
+    for filename in files:
+        delta_path = os.path.join(DELTA_DIR, filename)
+        if os.path.exists(delta_path):
+            os.remove(delta_path)
+
+def connect(client=None):
+    """Проверка credentials и подключение (пропускается, если клиент передан)"""
+    if client is not None:
+        return client
+    
+    # ===== ШАГ 1: ПРОВЕРКА CREDENTIALS =====
+    check_credentials()
+    
+    # ===== ШАГ 2: ПОДКЛЮЧЕНИЕ К BIGQUERY =====
+    return init_bigquery_client()
+
+def run(args, client=None):
+    """Команда `upload` (tech_survey.cli)"""
+    max_retries = UPLOAD_MAX_RETRIES if args.max_retries is None else args.max_retries
+    
+    print("\n" + "="*70)
+    print("🚀 ЗАГРУЗКА ДАННЫХ В BIGQUERY")
+    print("="*70)
+    print(f"Время начала: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    if args.resume:
+        print(f"Режим: продолжение по checkpoint ({CHECKPOINT_PATH})")
+    if args.append:
+        print(f"Режим: дозапись новых строк ({DELTA_DIR}/)")
+    
+    try:
+        client = connect(client)
+        
+        # ===== ШАГ 3: ПРОВЕРКА DATASET =====
+        if not check_dataset_exists(client, DATASET_ID):
+            print("\n❌ Сначала создайте dataset!")
+            return 1
+        
+        # ===== ШАГ 4: ЗАГРУЗКА ФАЙЛОВ И ПРОВЕРКА =====
+        print_header("📤 ЗАГРУЗКА ДАННЫХ")
+        files = get_files_to_upload(args.consolidated)
+        if args.append:
+            results = run_append_upload(client, DATASET_ID, files=files, max_retries=max_retries)
+        else:
+            results = run_upload(client, DATASET_ID, files=files, resume=args.resume, max_retries=max_retries)
+        
+        # ===== ШАГ 5: ИТОГОВЫЙ ОТЧЕТ =====
+        all_success = create_summary_report(results)
+        
+        # ===== ЗАВЕРШЕНИЕ =====
+        if all_success:
+            if not args.append:
+                clear_delta(files)
+            print_header("✅ ВСЕ ДАННЫЕ ЗАГРУЖЕНЫ УСПЕШНО!")
+            print(f"\n📊 Dataset: {PROJECT_ID}.{DATASET_ID}")
+            print(f"🌐 BigQuery Console: https://console.cloud.google.com/bigquery")
+            print(f"⏱️  Время завершения: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            
+            print("\n" + "="*70)
+            print("📝 СЛЕДУЮЩИЙ ШАГ:")
+            print("   Создание SQL Views для дашборда")
+            if args.consolidated:
+                print("   bigquery/sql_queries/create_views_consolidated.sql")
+            print("="*70)
+            
+            return 0
+        elif any(r['error'].startswith('Schema validation failed') for r in results if not r['success']):
+            print_header("⚠️  ДАННЫЕ НЕ СООТВЕТСТВУЮТ СХЕМЕ, ЗАГРУЗКА НЕ ВЫПОЛНЯЛАСЬ")
+            print("\n🔧 Исправьте подготовку данных и проверьте файлы:")
+            print(f"   python -m tech_survey validate{' --consolidated' if args.consolidated else ''}")
+            return 1
+        else:
+            consolidated_flag = ' --consolidated' if args.consolidated else ''
+            print_header("⚠️  ЗАГРУЗКА ЗАВЕРШЕНА С ОШИБКАМИ")
+            if args.append:
+                print("\n🔁 Дописать оставшиеся дельты:")
+                print(f"   python -m tech_survey upload --append{consolidated_flag}")
+                print("   (при несовпадении контрольных сумм - полная перезагрузка:")
+                print(f"   python -m tech_survey upload{consolidated_flag})")
+                return 1
+            print("\n🔁 Продолжить с места остановки:")
+            print(f"   python -m tech_survey upload --resume{consolidated_flag}")
+            return 1
+        
+    except Exception as e:
+        print_header("❌ КРИТИЧЕСКАЯ ОШИБКА!")
+        print(f"\n{type(e).__name__}: {e}")
+        
+        import traceback
+        print("\nПолный traceback:")
+        print(traceback.format_exc())
+        
+        return 1
+
+def run_validate(args):
+    """Команда `validate`: проверка CSV по TABLE_SCHEMAS без подключения к BigQuery"""
+    print("\n" + "="*70)
+    print("🧪 ПРОВЕРКА ДАННЫХ ПО СХЕМАМ BIGQUERY")
+    print("="*70)
+    print(f"Время начала: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    
+    files = [f"{table_name}.csv" for table_name in args.tables] or get_files_to_upload(args.consolidated)
+    
+    start_time = time.time()
+    failed = validate_upload_files(files)
+    elapsed_time = time.time() - start_time
+    
+    if failed:
+        print_header(f"❌ НЕ СООТВЕТСТВУЮТ СХЕМЕ: {', '.join(failed)}")
+        return 1
+    
+    print_header(f"✅ ВСЕ ФАЙЛЫ СООТВЕТСТВУЮТ СХЕМАМ ({elapsed_time:.1f} сек)")
+    return 0
+
+def run_verify(args, client=None):
+    """Команда `verify`: сверка таблиц в BigQuery с локальными CSV без загрузки"""
+    print("\n" + "="*70)
+    print("🔍 ПРОВЕРКА ДАННЫХ В BIGQUERY")
+    print("="*70)
+    print(f"Время начала: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    table_names = args.tables or [
+        filename.replace('.csv', '') for filename in get_files_to_upload(args.consolidated)
+    ]
+
+    local_checksums = {}
+    for table_name in table_names:
+        csv_path = os.path.join(DATA_DIR, f"{table_name}.csv")
+        if not os.path.exists(csv_path):
+            print(f"  ⚠️  {table_name}: файл не найден ({csv_path}), пропускаем")
+            continue
+        local_checksums[table_name] = compute_file_checksum(csv_path, table_name)
+
+    try:
+        client = connect(client)
+        mismatches = verify_uploaded_tables(client, DATASET_ID, local_checksums)
+    except Exception as e:
+        print_header("❌ ОШИБКА ПРОВЕРКИ!")
+        print(f"\n{type(e).__name__}: {e}")
+        return 1
+
+    failed = [table_name for table_name, fields in mismatches.items() if fields]
+    if failed or not local_checksums:
+        print_header("⚠️  ПРОВЕРКА НЕ ПРОЙДЕНА")
+        if failed:
+            print(f"\nНе совпадают: {', '.join(failed)}")
+            print("\n🔁 Загрузить заново:")
+            print(f"   python -m tech_survey upload --resume{' --consolidated' if args.consolidated else ''}")
+        return 1
+
+    print_header(f"✅ ВСЕ ТАБЛИЦЫ СОВПАДАЮТ ({len(mismatches)})")
+    return 0
+
+def main(argv=None, client=None):
+    """Основная функция"""
+    return run(parse_command('upload', argv), client=client)
+
+# ============================================================================
+# ТОЧКА ВХОДА
+# ============================================================================
+
+if __name__ == "__main__":
+    exit(main())
\ No newline at end of file
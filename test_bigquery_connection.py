@@ -3,6 +3,8 @@ import os
 from google.cloud import bigquery
 from dotenv import load_dotenv
 
+from tech_survey.bq_query import run_query, get_default_cache
+
 print("="*70)
 print("ПРОВЕРКА ПОДКЛЮЧЕНИЯ К BIGQUERY")
 print("="*70)
@@ -40,12 +42,14 @@ try:
     """
     
     print("🔄 Выполнение тестового запроса...")
-    query_job = client.query(query)
-    results = query_job.result()
+    results = run_query(client, query)
+    
+    for row in results.to_pylist():
+        print(f"\n✅ {row['message']}")
+        print(f"⏰ Время: {row['timestamp']}")
     
-    for row in results:
-        print(f"\n✅ {row.message}")
-        print(f"⏰ Время: {row.timestamp}")
+    if get_default_cache().stats['hits']:
+        print("💾 Результат взят из кэша (QUERY_CACHE_TTL=0 - выполнить заново)")
     
     print("\n" + "="*70)
     print("✅ ПОДКЛЮЧЕНИЕ К BIGQUERY УСПЕШНО!")
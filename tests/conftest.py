@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+tests/conftest.py
+
+Общие данные тестов: небольшой синтетический файл опроса в формате
+data/raw/survey_results.csv и запуск подготовки в отдельном каталоге.
+"""
+
+import contextlib
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tech_survey import prepare
+
+COUNTRIES = ['Germany', 'India', 'United States of America', 'France']
+AGES = ['18-24 years old', '25-34 years old', '35-44 years old']
+ED_LEVELS = ['Bachelor’s degree (B.A., B.S., B.Eng., etc.)', 'Master’s degree (M.A., M.S., M.Eng., MBA, etc.)']
+EMPLOYMENT = ['Employed, full-time', 'Student, part-time', 'Independent contractor, freelancer, or self-employed']
+DEV_TYPES = ['Developer, back-end', 'Developer, front-end', 'Data scientist', 'Student']
+TECHNOLOGIES = {
+    'language': ['Python', 'SQL', 'JavaScript', 'Go', 'Rust', 'C#'],
+    'database': ['PostgreSQL', 'MySQL', 'Redis', 'SQLite'],
+    'platform': ['AWS', 'Microsoft Azure', 'Google Cloud'],
+    'webframe': ['React', 'Django', 'FastAPI', 'Vue.js'],
+}
+
+def multi_value(rng, values, max_count, missing=0.1):
+    """Ответ с множественным выбором ('a;b;c') или None"""
+    if rng.random() < missing:
+        return None
+    count = rng.integers(1, max_count + 1)
+    return ';'.join(rng.choice(values, size=min(count, len(values)), replace=False))
+
+def make_survey(n=300, seed=0, first_id=1):
+    """Синтетический исходный файл опроса (столбцы, которые читает prepare)"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'ResponseId': np.arange(first_id, first_id + n)})
+    df['Country'] = rng.choice(COUNTRIES + [None], n)
+    df['Age'] = rng.choice(AGES, n)
+    df['EdLevel'] = rng.choice(ED_LEVELS + [None], n)
+    df['YearsCode'] = rng.integers(1, 30, n).astype(str)
+    df['YearsCodePro'] = rng.integers(1, 20, n).astype(str)
+    df['Employment'] = [multi_value(rng, EMPLOYMENT, 2, missing=0.05) for _ in range(n)]
+    df['RemoteWork'] = rng.choice(['Remote', 'Hybrid', 'In-person'], n)
+    df['DevType'] = [multi_value(rng, DEV_TYPES, 1) for _ in range(n)]
+    df['OrgSize'] = rng.choice(['2 to 9 employees', '100 to 499 employees'], n)
+    for source_column, (tech_type, _) in prepare.TECH_COLUMNS_MAP.items():
+        df[source_column] = [multi_value(rng, TECHNOLOGIES[tech_type], 4) for _ in range(n)]
+    return df
+
+def write_survey(df, path='data/raw/survey_results.csv'):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False)
+
+def quiet(func, *args, **kwargs):
+    """Вызов без вывода в консоль (подготовка печатает подробный отчет)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+def build_tables(survey):
+    """demographics и unpivot таблицы prepare по синтетическому опросу (в памяти)"""
+    demo_df = quiet(prepare.create_demographics_table, survey)
+    tech_tables = {}
+    for source_column, (tech_type, status) in prepare.TECH_COLUMNS_MAP.items():
+        tech_df = quiet(prepare.create_technology_unpivot_table, survey, source_column, tech_type, status)
+        if tech_df is not None:
+            tech_tables[(tech_type, status)] = tech_df
+    return demo_df, tech_tables
+
+@pytest.fixture
+def survey():
+    return make_survey()
+
+@pytest.fixture
+def tables(survey):
+    return build_tables(survey)
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Пустой рабочий каталог: пути prepare (data/raw, data/processed) относительные"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_confidence.py
+
+Доверительные интервалы долей (tech_survey/confidence.py): интервал
+Вильсона против формулы, посчитанной поэлементно, и интервалы сегментов
+хранилища фактов.
+
+Запуск: python -m pytest tests
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tech_survey.confidence import compute_confidence, wilson_interval, z_score
+from tech_survey.fact_store import load_fact_store, write_fact_store
+
+def wilson_closed_form(count, size, z):
+    """(p + z²/2n ± z·sqrt(p(1-p)/n + z²/4n²)) / (1 + z²/n)"""
+    p = count / size
+    center = p + z * z / (2 * size)
+    half = z * math.sqrt(p * (1 - p) / size + z * z / (4 * size * size))
+    denominator = 1 + z * z / size
+    return max((center - half) / denominator, 0.0), min((center + half) / denominator, 1.0)
+
+# ============================================================================
+# ФОРМУЛА
+# ============================================================================
+
+def test_z_score():
+    assert z_score(0.95) == pytest.approx(1.959964, abs=1e-6)
+    assert z_score(0.9) == pytest.approx(1.644854, abs=1e-6)
+
+@pytest.mark.parametrize('level', [0.9, 0.95, 0.99])
+def test_wilson_matches_closed_form(level):
+    counts, sizes = zip(*[(k, n) for n in (1, 2, 7, 30, 250, 10_000) for k in sorted({0, 1, n // 3, n - 1, n})])
+
+    lower, upper = wilson_interval(counts, sizes, level)
+
+    expected = [wilson_closed_form(k, n, z_score(level)) for k, n in zip(counts, sizes)]
+    np.testing.assert_allclose(lower, [low for low, _ in expected], rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(upper, [high for _, high in expected], rtol=1e-12, atol=1e-15)
+    assert (lower <= np.divide(counts, sizes)).all() and (np.divide(counts, sizes) <= upper).all()
+
+def test_wilson_edges():
+    lower, upper = wilson_interval([0, 5, 0], [5, 5, 0])
+
+    assert lower[0] == 0 and upper[0] > 0
+    assert upper[1] == 1 and lower[1] < 1
+    assert np.isnan(lower[2]) and np.isnan(upper[2])
+
+# ============================================================================
+# СЕГМЕНТЫ ХРАНИЛИЩА
+# ============================================================================
+
+@pytest.fixture
+def store(tmp_path, tables):
+    demo_df, tech_tables = tables
+    write_fact_store(demo_df, tech_tables, tmp_path / 'factstore')
+    return load_fact_store(tmp_path / 'factstore')
+
+def test_segment_wilson_bounds(store, tables):
+    demo_df, tech_tables = tables
+
+    result = compute_confidence(store, resamples=0, workers=2)
+
+    z = z_score(0.95)
+    expected = [wilson_closed_form(k, n, z) for k, n in zip(result['RespondentCount'], result['SegmentRespondents'])]
+    np.testing.assert_allclose(result['WilsonLower'], [round(low * 100, 2) for low, _ in expected], atol=1e-9)
+    np.testing.assert_allclose(result['WilsonUpper'], [round(high * 100, 2) for _, high in expected], atol=1e-9)
+    assert result['BootstrapLower'].isna().all()
+
+    # Итого: счетчики - число респондентов таблицы с технологией
+    total = result[(result['Country'] == 'ALL') & (result['Age'] == 'ALL') & (result['EdLevel'] == 'ALL')]
+    assert (total['SegmentRespondents'] == len(demo_df)).all()
+    for (tech_type, status), tech_df in tech_tables.items():
+        rows = total[(total['Category'] == tech_type) & (total['Status'] == status)]
+        counts = tech_df.groupby('Technology')['ResponseId'].nunique()
+        pd.testing.assert_series_equal(
+            rows.set_index('Technology')['RespondentCount'].sort_index(),
+            counts.sort_index(), check_names=False,
+        )
+
+def test_bootstrap_does_not_depend_on_workers(store):
+    one = compute_confidence(store, resamples=50, workers=1)
+    many = compute_confidence(store, resamples=50, workers=4)
+
+    pd.testing.assert_frame_equal(one, many)
+    assert (one['BootstrapLower'] <= one['Percentage']).all()
+    assert (one['Percentage'] <= one['BootstrapUpper']).all()
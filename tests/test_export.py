@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_export.py
+
+Экспорт таблиц (tech_survey/export.py) через локальный источник:
+все строки потоков записаны, очередь batch ограничена, при ошибке
+не остается временного файла.
+
+Запуск: python -m pytest tests
+"""
+
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from tech_survey import export
+from tech_survey.export import LocalArrowReader, export_table
+
+ROWS = 10_000
+
+@pytest.fixture
+def data_dir(tmp_path):
+    table = pa.table({'ResponseId': list(range(ROWS)), 'Technology': [f"tech{i % 7}" for i in range(ROWS)]})
+    pq.write_table(table, tmp_path / 'language_haveworked.parquet')
+    return tmp_path
+
+class CountingReader(LocalArrowReader):
+    """Считает batch, прочитанные потоками, но еще не записанные"""
+
+    def __init__(self, data_dir, fail_after=None, **kwargs):
+        super().__init__(data_dir, **kwargs)
+        self.fail_after = fail_after
+        self.read = 0
+        self.written = 0
+        self.max_pending = 0
+        self._lock = threading.Lock()
+
+    def read_stream(self, stream_name):
+        for batch in super().read_stream(stream_name):
+            with self._lock:
+                if self.fail_after is not None and self.read >= self.fail_after:
+                    raise ConnectionError('stream reset')
+                self.read += 1
+                self.max_pending = max(self.max_pending, self.read - self.written)
+            yield batch
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_export_writes_all_rows(data_dir, tmp_path, fmt):
+    output_path = tmp_path / 'out' / f"language_haveworked{export.EXPORT_FORMATS[fmt]}"
+
+    stats = export_table(LocalArrowReader(data_dir, batch_size=500), 'p.d.language_haveworked',
+                         str(output_path), fmt, max_streams=4)
+
+    assert stats['rows'] == ROWS and stats['streams'] == 4
+    table = pq.read_table(output_path) if fmt == 'parquet' else pa.ipc.open_file(output_path).read_all()
+    assert sorted(table.column('ResponseId').to_pylist()) == list(range(ROWS))
+    assert not (tmp_path / 'out' / f"{output_path.name}.tmp").exists()
+
+def test_export_queue_is_bounded(data_dir, tmp_path, monkeypatch):
+    reader = CountingReader(data_dir, batch_size=100)
+    open_writer = export._open_writer
+
+    def counting_writer(*args):
+        writer = open_writer(*args)
+        write_table = writer.write_table
+
+        def write(table):
+            write_table(table)
+            with reader._lock:
+                reader.written += 1
+
+        writer.write_table = write
+        return writer
+
+    monkeypatch.setattr(export, '_open_writer', counting_writer)
+    streams = 4
+
+    export_table(reader, 'p.d.language_haveworked', str(tmp_path / 'out.parquet'), max_streams=streams)
+
+    assert reader.read == reader.written == ROWS // 100
+    # Очередь + по одному batch, ожидающему места, в каждом потоке чтения + записываемый
+    assert reader.max_pending <= export.MAX_PENDING_BATCHES + streams + 1
+
+def test_export_error_removes_temporary_file(data_dir, tmp_path):
+    output_path = tmp_path / 'out.parquet'
+    reader = CountingReader(data_dir, fail_after=20, batch_size=100)
+
+    with pytest.raises(ConnectionError):
+        export_table(reader, 'p.d.language_haveworked', str(output_path), max_streams=4)
+
+    assert not output_path.exists()
+    assert not (tmp_path / 'out.parquet.tmp').exists()
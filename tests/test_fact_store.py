@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_fact_store.py
+
+Хранилище фактов (tech_survey/fact_store.py): пары (ResponseId, Technology),
+демография и биты множественного выбора после записи и открытия совпадают
+с исходными таблицами.
+
+Запуск: python -m pytest tests
+"""
+
+import numpy as np
+import pandas as pd
+
+from conftest import quiet
+from tech_survey import prepare
+from tech_survey.fact_store import bitset_pairs, build_csr, load_fact_store, write_fact_store
+
+def write_store(tmp_path, survey, demo_df, tech_tables):
+    multiselect = {}
+    for source_column, table_prefix in prepare.MULTISELECT_COLUMNS.items():
+        bridge_df, values_df = quiet(prepare.create_multiselect_tables, survey, source_column, table_prefix)
+        multiselect[source_column] = (bridge_df, values_df['Value'].tolist())
+    write_fact_store(demo_df, tech_tables, tmp_path / 'factstore', multiselect)
+    return load_fact_store(tmp_path / 'factstore'), multiselect
+
+def pairs(df, columns):
+    return sorted(map(tuple, df[columns].itertuples(index=False)))
+
+def test_csr_round_trip(tmp_path, survey, tables):
+    demo_df, tech_tables = tables
+    store, _ = write_store(tmp_path, survey, demo_df, tech_tables)
+
+    np.testing.assert_array_equal(store.respondents, np.sort(demo_df['ResponseId'].to_numpy()))
+    assert sorted(store.tables) == sorted(tech_tables)
+
+    for (tech_type, status), tech_df in tech_tables.items():
+        offsets, codes = store.table(tech_type, status)
+        labels = np.asarray(store.technologies[tech_type], dtype=object)
+        stored = pd.DataFrame({
+            'ResponseId': np.repeat(store.respondents, np.diff(offsets)),
+            'Technology': labels[np.asarray(codes)],
+        })
+        assert pairs(stored, ['ResponseId', 'Technology']) == pairs(tech_df, ['ResponseId', 'Technology'])
+
+        counts = store.technology_counts(tech_type, status)
+        assert dict(zip(labels, counts)) == {
+            **dict.fromkeys(labels, 0), **tech_df['Technology'].value_counts().to_dict()
+        }
+
+def test_respondent_axis_values(tmp_path, survey, tables):
+    demo_df, tech_tables = tables
+    store, multiselect = write_store(tmp_path, survey, demo_df, tech_tables)
+    demo_sorted = demo_df.sort_values('ResponseId')
+
+    for dim in store.dims:
+        assert store.dimension_values(dim).tolist() == demo_sorted[dim].astype(str).tolist()
+
+    for dim, (bridge_df, labels) in multiselect.items():
+        bits, stored_labels = store.multiselect[dim]
+        assert stored_labels == labels
+        positions, codes = bitset_pairs(bits, len(labels))
+        stored = pd.DataFrame({'ResponseId': store.respondents[positions], 'ValueId': codes})
+        assert pairs(stored, ['ResponseId', 'ValueId']) == pairs(bridge_df, ['ResponseId', 'ValueId'])
+
+    response_id = int(store.respondents[3])
+    tech_df = tech_tables[('language', 'haveworked')]
+    expected = sorted(tech_df.loc[tech_df['ResponseId'] == response_id, 'Technology'])
+    assert store.respondent_technologies(response_id, 'language', 'haveworked') == expected
+
+def test_build_csr_drops_pairs_without_respondent():
+    offsets, codes, dropped = build_csr(np.array([10, 20, 30]), [30, 10, 99, 30, 10], [2, 1, 0, 0, 1])
+
+    assert offsets.tolist() == [0, 2, 2, 4]
+    assert codes.tolist() == [1, 1, 0, 2]
+    assert dropped == 1
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_incremental.py
+
+Дозагрузка новых ответов (tech_survey/incremental.py, prepare --append):
+совпадение с полной подготовкой, сбой посередине шага и повторный запуск.
+
+Запуск: python -m pytest tests
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_survey, quiet, write_survey
+from tech_survey import fact_store, incremental, prepare
+from tech_survey.fact_store import load_fact_store
+from tech_survey.query_index import load_query_index
+
+FIRST_PART = 250
+
+# Респонденты, которых нет при первой подготовке: последние по ResponseId
+# (строки дописываются в конец таблиц) или из середины (слияние с сортировкой)
+NEW_ROWS = {
+    'tail': slice(FIRST_PART, None),
+    'middle': slice(100, 150),
+}
+
+@pytest.fixture
+def prepared(workdir):
+    """Полная подготовка первых FIRST_PART ответов, в исходном файле - все ответы"""
+    survey = make_survey()
+    write_survey(survey.iloc[:FIRST_PART])
+    assert quiet(prepare.main, writers=0) == 0
+    write_survey(survey)
+    return survey
+
+def prepare_full(survey, path, consolidated=False):
+    """Полная подготовка всех ответов в каталоге path (эталон для --append)"""
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        write_survey(survey)
+        assert quiet(prepare.main, consolidated=consolidated, writers=0) == 0
+    finally:
+        os.chdir(cwd)
+    return path / prepare.OUTPUT_DIR
+
+def assert_same_as_full(output_dir, full_dir):
+    """
+    Таблицы совпадают побайтно; demographics - без CreatedAt и порядка строк
+    (он повторяет исходный файл, новые строки дописываются в конец)
+    """
+    names = sorted(path.name for path in Path(full_dir).glob('*.csv'))
+    assert names == sorted(path.name for path in Path(output_dir).glob('*.csv'))
+    for name in names:
+        if name == 'demographics.csv':
+            continue
+        assert (Path(output_dir) / name).read_bytes() == (Path(full_dir) / name).read_bytes(), name
+
+    def demographics(directory):
+        df = pd.read_csv(Path(directory) / 'demographics.csv', keep_default_na=False)
+        return df.drop(columns='CreatedAt').sort_values('ResponseId').reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(demographics(output_dir), demographics(full_dir))
+
+# ============================================================================
+# СОВПАДЕНИЕ С ПОЛНОЙ ПОДГОТОВКОЙ
+# ============================================================================
+
+@pytest.mark.parametrize('new_rows', ['tail', 'middle'])
+def test_append_matches_full_prepare(workdir, tmp_path_factory, new_rows):
+    survey = make_survey()
+    new_ids = survey['ResponseId'].iloc[NEW_ROWS[new_rows]]
+    write_survey(survey[~survey['ResponseId'].isin(new_ids)])
+    assert quiet(prepare.main, consolidated=True, writers=0) == 0
+    write_survey(survey)
+
+    assert quiet(incremental.main, consolidated=True) == 0
+
+    full_dir = prepare_full(survey, tmp_path_factory.mktemp('full'), consolidated=True)
+    assert_same_as_full(prepare.OUTPUT_DIR, full_dir)
+    assert not list(Path(prepare.OUTPUT_DIR).glob('*.tmp'))
+    assert not os.path.exists(os.path.join(prepare.OUTPUT_DIR, incremental.JOURNAL_FILE))
+
+    # Дельта для upload --append - только строки новых респондентов
+    for path in Path(prepare.DELTA_DIR).glob('*.csv'):
+        delta = pd.read_csv(path, keep_default_na=False)
+        assert set(delta['ResponseId']) <= set(new_ids), path.name
+        full = pd.read_csv(full_dir / path.name, keep_default_na=False)
+        assert len(delta) == full['ResponseId'].isin(new_ids).sum(), path.name
+
+def test_append_does_not_read_or_copy_prepared_rows(prepared, monkeypatch):
+    """Новые ResponseId больше прежних: таблицы не сливаются и не копируются"""
+    monkeypatch.setattr(incremental, 'merge_rows', None)
+    monkeypatch.setattr(shutil, 'copyfile', None)
+
+    assert quiet(incremental.main) == 0
+
+def test_interrupted_journal_is_finished_by_rerun(prepared, monkeypatch, tmp_path_factory):
+    append_tail = incremental.append_tail
+    calls = []
+
+    def failing_append_tail(entry):
+        calls.append(entry['target'])
+        if len(calls) == 5:
+            raise OSError('disk full')
+        append_tail(entry)
+
+    monkeypatch.setattr(incremental, 'append_tail', failing_append_tail)
+    assert quiet(incremental.main) == 1
+    assert os.path.exists(os.path.join(prepare.OUTPUT_DIR, incremental.JOURNAL_FILE))
+
+    monkeypatch.setattr(incremental, 'append_tail', append_tail)
+    assert quiet(incremental.main) == 0
+
+    assert_same_as_full(prepare.OUTPUT_DIR, prepare_full(prepared, tmp_path_factory.mktemp('full')))
+    assert not list(Path(prepare.OUTPUT_DIR).glob('*.tmp'))
+
+# ============================================================================
+# СБОЙ ПРИ ДОЗАПИСИ FACTSTORE
+# ============================================================================
+
+def test_fact_store_write_failure_keeps_store_and_rerun_appends(prepared, monkeypatch):
+    save_json = fact_store._save_json
+
+    def failing_save_json(data, path):
+        if Path(path).name.startswith('technologies.json'):
+            raise OSError('disk full')
+        save_json(data, path)
+
+    monkeypatch.setattr(fact_store, '_save_json', failing_save_json)
+    assert quiet(incremental.main) == 1
+
+    # Хранилище осталось прежним и открывается
+    store = load_fact_store()
+    assert store.manifest['respondents'] == FIRST_PART
+    assert len(store.respondents) == FIRST_PART
+    assert load_query_index().top_n('language', 'haveworked', n=3)
+
+    monkeypatch.setattr(fact_store, '_save_json', save_json)
+    assert quiet(incremental.main) == 0
+
+    store = load_fact_store()
+    assert store.manifest['respondents'] == len(prepared)
+    np.testing.assert_array_equal(store.respondents, prepared['ResponseId'].to_numpy())
+    top = load_query_index().top_n('language', 'haveworked', n=None)
+    assert sum(row['RespondentCount'] for row in top) > 0
+
+def test_fact_store_with_inconsistent_arrays_is_rejected(prepared):
+    store_dir = fact_store.FACT_STORE_DIR
+    respondents = np.load(f"{store_dir}/respondents.npy")
+    np.save(f"{store_dir}/respondents.npy", np.concatenate([respondents, respondents[:5] + 10_000]))
+
+    with pytest.raises(ValueError, match='повреждено'):
+        load_fact_store()
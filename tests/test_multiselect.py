@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_multiselect.py
+
+Bridge таблицы множественного выбора (prepare.create_multiselect_tables):
+пары (ResponseId, Value) против explode средствами pandas, коды словаря
+и дополнение словаря прежней подготовки (prepare --append).
+
+Запуск: python -m pytest tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import quiet
+from tech_survey import prepare
+
+def explode_pairs(df, source_column):
+    """Эталон: split + explode, без пустых значений и повторов в ответе"""
+    values = df[['ResponseId', source_column]].dropna()
+    values = values.assign(Value=values[source_column].str.split(';')).explode('Value')
+    values['Value'] = values['Value'].str.strip()
+    values = values[values['Value'] != '']
+    return set(zip(values['ResponseId'], values['Value']))
+
+def bridge_pairs(bridge_df, values_df):
+    labels = values_df.set_index('ValueId')['Value']
+    return set(zip(bridge_df['ResponseId'], bridge_df['ValueId'].map(labels)))
+
+@pytest.fixture
+def messy_survey(survey):
+    """Синтетический опрос и ответы с пробелами, пустыми частями и повторами"""
+    extra = pd.DataFrame({
+        'ResponseId': [1001, 1002, 1003, 1004],
+        'DevType': [' Student ;Data scientist', 'Student;;Student', ';', None],
+        'Employment': ['Employed, full-time', None, 'Retired;  ', 'Retired'],
+    })
+    return pd.concat([survey, extra], ignore_index=True)
+
+@pytest.mark.parametrize('source_column', list(prepare.MULTISELECT_COLUMNS))
+def test_bridge_matches_explode(messy_survey, source_column):
+    bridge_df, values_df = quiet(
+        prepare.create_multiselect_tables, messy_survey, source_column, prepare.MULTISELECT_COLUMNS[source_column],
+    )
+
+    assert bridge_pairs(bridge_df, values_df) == explode_pairs(messy_survey, source_column)
+    assert not bridge_df.duplicated().any()
+    # Словарь в алфавитном порядке, коды - номера строк
+    assert values_df['Value'].tolist() == sorted(values_df['Value'])
+    np.testing.assert_array_equal(values_df['ValueId'], np.arange(len(values_df)))
+    # Сортировка по ResponseId, ValueId
+    assert bridge_df.equals(bridge_df.sort_values(['ResponseId', 'ValueId']).reset_index(drop=True))
+
+def test_previous_labels_keep_codes_and_new_values_go_last(messy_survey):
+    labels = ['Student', 'Developer, back-end']
+
+    bridge_df, values_df = quiet(prepare.create_multiselect_tables, messy_survey, 'DevType', 'devtype', labels)
+
+    values = values_df['Value'].tolist()
+    assert values[:2] == labels
+    assert values[2:] == sorted(set(values[2:]))
+    assert labels == ['Student', 'Developer, back-end']
+    assert bridge_pairs(bridge_df, values_df) == explode_pairs(messy_survey, 'DevType')
+
+def test_column_without_answers(survey):
+    survey = survey.assign(DevType=None)
+
+    assert quiet(prepare.create_multiselect_tables, survey, 'DevType', 'devtype') == (None, None)
+    assert quiet(prepare.create_multiselect_tables, survey.drop(columns='DevType'), 'DevType', 'devtype') == (None, None)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_pipeline.py
+
+Выполнение графа этапов (tech_survey/pipeline.py): пропуск неизмененных
+этапов и повторная загрузка таблиц после несовпадения контрольных сумм.
+
+Запуск: python -m pytest tests
+"""
+
+import json
+
+import pytest
+
+from tech_survey import pipeline
+from tech_survey.pipeline import Stage, StageFailed
+
+@pytest.fixture
+def paths(tmp_path):
+    return {'state_path': str(tmp_path / 'state.json'), 'log_dir': str(tmp_path / 'logs')}
+
+def read_state(paths):
+    with open(paths['state_path'], encoding='utf-8') as f:
+        return json.load(f)
+
+def make_stages(calls, verify_ok):
+    """Две загрузки и verify, которая не сходится для upload:b, пока verify_ok пуст"""
+    def make_upload(name):
+        def run(ctx):
+            calls.append(name)
+            return {'rows': 1}
+        return run
+
+    def run_verify(ctx):
+        calls.append('verify')
+        if not verify_ok:
+            raise StageFailed("Контрольные суммы не совпали: b", invalidate=['upload:b'])
+
+    return [
+        Stage('upload:a', make_upload('upload:a')),
+        Stage('upload:b', make_upload('upload:b')),
+        Stage('verify', run_verify, deps=['upload:a', 'upload:b']),
+    ]
+
+def test_unchanged_stages_are_skipped(paths):
+    calls = []
+    pipeline.run_pipeline(make_stages(calls, verify_ok=[True]), workers=1, **paths)
+    report = pipeline.run_pipeline(make_stages(calls, verify_ok=[True]), workers=1, **paths)
+
+    assert calls == ['upload:a', 'upload:b', 'verify']
+    assert {info['status'] for info in report.values()} == {'skipped'}
+
+def test_verify_failure_reruns_mismatched_uploads(paths):
+    calls = []
+    report = pipeline.run_pipeline(make_stages(calls, verify_ok=[]), workers=1, **paths)
+
+    assert report['verify']['status'] == 'failed'
+    state = read_state(paths)
+    assert state['upload:a']['status'] == 'done'
+    assert state['upload:b']['status'] == 'invalidated'
+
+    calls.clear()
+    report = pipeline.run_pipeline(make_stages(calls, verify_ok=[True]), workers=1, **paths)
+
+    assert calls == ['upload:b', 'verify']
+    assert report['upload:a']['status'] == 'skipped'
+    assert report['verify']['status'] == 'done'
+    assert read_state(paths)['upload:b']['status'] == 'done'
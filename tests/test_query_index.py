@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_query_index.py
+
+Топ-N по хранилищу фактов (tech_survey/query_index.py) против куба
+агрегатов prepare.create_technology_cube: для каждого сегмента куба
+те же счетчики и проценты.
+
+Запуск: python -m pytest tests
+"""
+
+import numpy as np
+import pytest
+
+from conftest import quiet
+from tech_survey import prepare
+from tech_survey.fact_store import write_fact_store
+from tech_survey.query_index import load_query_index, top_k_indices
+
+DIMENSIONS = prepare.CUBE_DIMENSIONS
+
+@pytest.fixture
+def index_and_cube(tmp_path, survey, tables):
+    demo_df, tech_tables = tables
+    bridge_df, values_df = quiet(prepare.create_multiselect_tables, survey, 'DevType', 'devtype')
+    write_fact_store(demo_df, tech_tables, tmp_path / 'factstore',
+                     {'DevType': (bridge_df, values_df['Value'].tolist())})
+    cube = quiet(prepare.create_technology_cube, demo_df, tech_tables)
+    return load_query_index(tmp_path / 'factstore'), cube
+
+def test_top_n_matches_cube_segments(index_and_cube):
+    index, cube = index_and_cube
+
+    segments = cube.groupby(['Category', 'Status', 'GroupingId'] + DIMENSIONS, sort=False)
+    for (category, status, _, *values), rows in segments:
+        filters = {dim: value for dim, value in zip(DIMENSIONS, values) if value != prepare.CUBE_ALL_VALUE}
+
+        top = index.top_n(category, status, n=None, filters=filters)
+
+        expected = {
+            row.Technology: (row.RespondentCount, row.Percentage)
+            for row in rows.itertuples(index=False)
+        }
+        assert {row['Technology']: (row['RespondentCount'], row['Percentage']) for row in top} == expected
+        counts = [row['RespondentCount'] for row in top]
+        assert counts == sorted(counts, reverse=True)
+        assert index.segment_size(filters) == rows['SegmentRespondents'].iloc[0]
+
+def test_top_n_limit_is_prefix_of_full_ranking(index_and_cube):
+    index, _ = index_and_cube
+    filters = {'Country': ['Germany', 'India']}
+
+    full = index.top_n('language', 'haveworked', n=None, filters=filters)
+
+    assert index.top_n('language', 'haveworked', n=3, filters=filters) == full[:3]
+
+def test_multiselect_filter_matches_bridge(index_and_cube, survey, tables):
+    index, _ = index_and_cube
+    _, tech_tables = tables
+    developers = survey.loc[survey['DevType'].fillna('').str.contains('Data scientist'), 'ResponseId']
+    tech_df = tech_tables[('database', 'wanttowork')]
+
+    top = index.top_n('database', 'wanttowork', n=None, filters={'DevType': 'Data scientist'})
+
+    expected = tech_df[tech_df['ResponseId'].isin(developers)]['Technology'].value_counts()
+    assert {row['Technology']: row['RespondentCount'] for row in top} == expected.to_dict()
+
+def test_top_k_indices_orders_ties_by_index():
+    values = np.array([5, 9, 5, 1, 9])
+
+    assert top_k_indices(values, 3).tolist() == [1, 4, 0]
+    assert top_k_indices(values).tolist() == [1, 4, 0, 2, 3]
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_schema_validation.py
+
+Проверка CSV по схеме перед загрузкой (tech_survey/schema_validation.py):
+неверные INTEGER и TIMESTAMP, пустые REQUIRED, повтор ключа и заголовок.
+
+Запуск: python -m pytest tests
+"""
+
+import pandas as pd
+import pytest
+from google.cloud import bigquery
+
+from tech_survey.schema_validation import format_issue, invalid_values_mask, validate_csv
+
+SCHEMA = [
+    bigquery.SchemaField('ResponseId', 'INTEGER', mode='REQUIRED'),
+    bigquery.SchemaField('Technology', 'STRING', mode='REQUIRED'),
+    bigquery.SchemaField('CreatedAt', 'TIMESTAMP'),
+]
+KEYS = ['ResponseId', 'Technology']
+
+def write_csv(tmp_path, rows, header='ResponseId,Technology,CreatedAt'):
+    path = tmp_path / 'language_haveworked.csv'
+    path.write_text('\n'.join([header] + rows) + '\n', encoding='utf-8')
+    return path
+
+def issues_by_check(issues):
+    return {issue['check']: issue for issue in issues}
+
+def test_valid_file_has_no_issues(tmp_path):
+    path = write_csv(tmp_path, [
+        '1,Python,2024-05-01 10:00:00',
+        '1,SQL,2024-05-01T10:00:00Z',
+        '-2,Go,',
+    ])
+
+    assert validate_csv(path, SCHEMA, KEYS) == (3, [])
+
+def test_bad_integer_timestamp_and_duplicate_key(tmp_path):
+    path = write_csv(tmp_path, [
+        '1,Python,2024-05-01 10:00:00',
+        '1.5,SQL,2024-05-01 10:00:00',
+        '99999999999999999999,Go,2024-05-01',
+        '3,Rust,yesterday',
+        '1,Python,2024-13-01 10:00',
+        ',C#,',
+    ])
+
+    rows, issues = validate_csv(path, SCHEMA, KEYS)
+    checks = issues_by_check(issues)
+
+    assert rows == 6
+    assert set(checks) == {'required', 'type', 'duplicate'}
+    integer = [issue for issue in issues if issue['check'] == 'type' and issue['column'] == 'ResponseId'][0]
+    assert (integer['count'], integer['rows'], integer['values']) == (
+        2, [3, 4], ['1.5', '99999999999999999999'],
+    )
+    timestamp = [issue for issue in issues if issue['check'] == 'type' and issue['column'] == 'CreatedAt'][0]
+    assert (timestamp['count'], timestamp['values']) == (2, ['yesterday', '2024-13-01 10:00'])
+    assert (checks['required']['column'], checks['required']['rows']) == ('ResponseId', [7])
+    assert (checks['duplicate']['rows'], checks['duplicate']['values']) == ([6], ['1|Python'])
+    assert 'повтор ключа' in format_issue(checks['duplicate'])
+
+def test_header_mismatch_stops_other_checks(tmp_path):
+    path = write_csv(tmp_path, ['x,Python,2024-05-01'], header='Technology,ResponseId,CreatedAt')
+
+    _, issues = validate_csv(path, SCHEMA, KEYS)
+
+    assert [issue['check'] for issue in issues] == ['columns']
+    assert 'порядок столбцов' in issues[0]['message']
+
+@pytest.mark.parametrize('value, field_type, invalid', [
+    ('9223372036854775807', 'INTEGER', False),
+    ('9223372036854775808', 'INTEGER', True),
+    ('-9223372036854775808', 'INTEGER', False),
+    ('-9223372036854775809', 'INTEGER', True),
+    ('+007', 'INTEGER', False),
+    ('12a', 'INTEGER', True),
+    ('2024-02-30', 'DATE', True),
+    ('2024-2-3 4:05', 'TIMESTAMP', False),
+    ('2024-02-30 10:00:00', 'TIMESTAMP', True),
+    ('03.02.2024 10:00', 'TIMESTAMP', True),
+    ('2024-02-03 10:00:00+03:00', 'TIMESTAMP', False),
+    ('anything', 'STRING', False),
+])
+def test_type_rules(value, field_type, invalid):
+    assert invalid_values_mask(pd.Series([value]), field_type).tolist() == [invalid]
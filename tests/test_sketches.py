@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_sketches.py
+
+Скетчи HyperLogLog (tech_survey/sketches.py): оценки в пределах
+заявленной ошибки 1.04 / sqrt(2^p) от точного числа респондентов.
+
+Запуск: python -m pytest tests
+"""
+
+import numpy as np
+import pytest
+
+from tech_survey.sketches import (
+    estimate_cardinality, estimate_union, hash_response_ids, hll_register_ranks, load_sketches,
+    relative_error, write_sketches,
+)
+
+# Допуск - 4 стандартные ошибки (хэш детерминирован, тест не случайный)
+TOLERANCE = 4
+
+def dense_registers(response_ids, precision, survey_year=2024):
+    registers, ranks = hll_register_ranks(hash_response_ids(response_ids, survey_year), precision)
+    dense = np.zeros(1 << precision, dtype=np.uint8)
+    np.maximum.at(dense, registers, ranks)
+    return dense
+
+@pytest.mark.parametrize('precision', [10, 14])
+@pytest.mark.parametrize('n', [500, 20_000, 200_000])
+def test_estimate_within_standard_error(precision, n):
+    estimate = estimate_cardinality(dense_registers(np.arange(1, n + 1), precision))
+
+    assert abs(estimate - n) / n <= TOLERANCE * relative_error(precision)
+
+def test_duplicates_do_not_change_estimate():
+    ids = np.arange(1, 5001)
+
+    assert estimate_cardinality(dense_registers(np.concatenate([ids, ids[::2]]), 14)) \
+        == estimate_cardinality(dense_registers(ids, 14))
+
+def test_store_estimates_match_exact_counts(tmp_path, tables):
+    demo_df, tech_tables = tables
+    write_sketches(demo_df, tech_tables, tmp_path / 'sketches')
+    store = load_sketches(tmp_path / 'sketches')
+    error = TOLERANCE * relative_error(store.precision)
+
+    def check(estimate, exact):
+        assert abs(estimate - exact) <= max(error * exact, 1)
+
+    check(store.estimate(), len(demo_df))
+    germany = demo_df.loc[demo_df['Country'] == 'Germany', 'ResponseId']
+    check(store.estimate(filters={'Country': 'Germany'}), len(germany))
+
+    for (tech_type, status), tech_df in tech_tables.items():
+        check(store.estimate(tech_type, status), tech_df['ResponseId'].nunique())
+        python = tech_df[(tech_df['Technology'] == 'Python') & tech_df['ResponseId'].isin(germany)]
+        if tech_type == 'language':
+            check(store.estimate(tech_type, status, 'Python', {'Country': 'Germany'}), len(python))
+
+def test_union_of_survey_years_counts_both(tmp_path, tables):
+    demo_df, tech_tables = tables
+    write_sketches(demo_df, tech_tables, tmp_path / '2023', survey_year=2023)
+    write_sketches(demo_df, tech_tables, tmp_path / '2024', survey_year=2024)
+
+    estimate, error = estimate_union([load_sketches(tmp_path / '2023'), load_sketches(tmp_path / '2024')])
+
+    # Одинаковые ResponseId разных лет - разные респонденты
+    assert abs(estimate - 2 * len(demo_df)) <= TOLERANCE * error * 2 * len(demo_df)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_table_checksums.py
+
+Контрольные суммы таблиц (tech_survey/table_checksums.py): текст запроса
+BigQuery, локальная формула на известных значениях и совпадение запроса,
+вычисленного фейковым клиентом по тексту SQL, с локальной суммой.
+
+Запуск: python -m pytest tests
+"""
+
+import io
+
+import pandas as pd
+import pytest
+from google.api_core import exceptions as api_exceptions
+from google.cloud import bigquery
+
+from tech_survey.fake_bigquery import FakeBigQueryClient
+from tech_survey.table_checksums import build_checksum_query, combine_checksums, compute_checksum
+
+DATASET = 'fake-project.tech_survey_data'
+
+LANGUAGE_SQL = (
+    "SELECT 'language_haveworked' AS table_name,\n"
+    "  COUNT(*) AS row_count,\n"
+    "  COALESCE(SUM(CAST(CONCAT('0x', SUBSTR(h, 1, 8)) AS INT64)), 0) AS hash_sum,\n"
+    "  COALESCE(BIT_XOR(CAST(CONCAT('0x', SUBSTR(h, 9, 15)) AS INT64)), 0) AS hash_xor\n"
+    "FROM (SELECT TO_HEX(MD5(CONCAT(COALESCE(CAST(ResponseId AS STRING), ''), '|', "
+    "COALESCE(CAST(Technology AS STRING), '')))) AS h FROM `p.d.language_haveworked`)"
+)
+
+LANGUAGE_CSV = "ResponseId,Technology\n1,Python\n2,Go\n2,\n"
+LANGUAGE_SCHEMA = [
+    bigquery.SchemaField('ResponseId', 'INTEGER', mode='REQUIRED'),
+    bigquery.SchemaField('Technology', 'STRING'),
+]
+
+@pytest.fixture
+def client():
+    client = FakeBigQueryClient(seed=1)
+    client.create_dataset(DATASET)
+    return client
+
+def load_csv(client, table_name, csv_text, schema):
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.CSV, skip_leading_rows=1, schema=schema,
+    )
+    client.load_table_from_file(
+        io.BytesIO(csv_text.encode('utf-8')), f"{DATASET}.{table_name}", job_config=job_config,
+    ).result()
+
+def query_checksums(client, sql):
+    return client.query(sql).result().to_dataframe().set_index('table_name').to_dict('index')
+
+# ============================================================================
+# ФОРМУЛА
+# ============================================================================
+
+def test_build_checksum_query_text():
+    assert build_checksum_query({'language_haveworked': 'p.d.language_haveworked'}) == LANGUAGE_SQL
+
+    sql = build_checksum_query({'demographics': 'p.d.demographics', 'language_haveworked': 'p.d.language_haveworked'})
+    assert sql.split('\nUNION ALL\n')[1] == LANGUAGE_SQL
+    assert "MD5(COALESCE(CAST(ResponseId AS STRING), ''))" in sql.split('\nUNION ALL\n')[0]
+
+def test_compute_checksum_known_values():
+    # md5('1') = c4ca4238 a0b923820dcc509 a6f75849b
+    assert compute_checksum(pd.DataFrame({'ResponseId': [1]}), ['ResponseId']) == {
+        'row_count': 1, 'hash_sum': 0xc4ca4238, 'hash_xor': 0xa0b923820dcc509,
+    }
+
+    df = pd.DataFrame({'ResponseId': [1, 2, 2], 'Technology': ['Python', 'Go', None]})
+    assert compute_checksum(df, ['ResponseId', 'Technology']) == {
+        'row_count': 3, 'hash_sum': 5853378421, 'hash_xor': 946693122350572376,
+    }
+
+def test_checksum_ignores_row_order_and_combines_appended_rows():
+    df = pd.DataFrame({'ResponseId': [1, 2, 2], 'Technology': ['Python', 'Go', None]})
+    keys = ['ResponseId', 'Technology']
+
+    assert compute_checksum(df.iloc[::-1], keys) == compute_checksum(df, keys)
+    assert combine_checksums(compute_checksum(df.iloc[:1], keys), compute_checksum(df.iloc[1:], keys)) \
+        == compute_checksum(df, keys)
+
+# ============================================================================
+# ЗАПРОС В ФЕЙКОВОМ КЛИЕНТЕ
+# ============================================================================
+
+def test_fake_query_matches_local_checksum(client):
+    load_csv(client, 'language_haveworked', LANGUAGE_CSV, LANGUAGE_SCHEMA)
+    load_csv(client, 'demographics', "ResponseId\n1\n2\n", LANGUAGE_SCHEMA[:1])
+
+    remote = query_checksums(client, build_checksum_query({
+        'language_haveworked': f"{DATASET}.language_haveworked",
+        'demographics': f"{DATASET}.demographics",
+    }))
+
+    local = pd.read_csv(io.StringIO(LANGUAGE_CSV), keep_default_na=False, na_values=[''])
+    assert remote['language_haveworked'] == compute_checksum(local, ['ResponseId', 'Technology'])
+    assert remote['demographics'] == compute_checksum(pd.DataFrame({'ResponseId': [1, 2]}), ['ResponseId'])
+
+def test_fake_query_of_empty_table(client):
+    client.create_table(bigquery.Table(f"{DATASET}.language_haveworked", schema=LANGUAGE_SCHEMA))
+
+    remote = query_checksums(client, build_checksum_query({'language_haveworked': f"{DATASET}.language_haveworked"}))
+
+    assert remote['language_haveworked'] == {'row_count': 0, 'hash_sum': 0, 'hash_xor': 0}
+
+def test_fake_query_follows_sql_not_local_formula(client):
+    """Другой разделитель или позиции SUBSTR в SQL дают другую сумму"""
+    load_csv(client, 'language_haveworked', LANGUAGE_CSV, LANGUAGE_SCHEMA)
+    expected = query_checksums(client, LANGUAGE_SQL.replace('p.d', DATASET))['language_haveworked']
+
+    changed = query_checksums(client, LANGUAGE_SQL.replace('p.d', DATASET).replace("'|'", "','"))
+    assert changed['language_haveworked']['row_count'] == expected['row_count']
+    assert changed['language_haveworked']['hash_sum'] != expected['hash_sum']
+
+    shifted = query_checksums(client, LANGUAGE_SQL.replace('p.d', DATASET).replace('SUBSTR(h, 1, 8)', 'SUBSTR(h, 2, 8)'))
+    assert shifted['language_haveworked']['hash_sum'] != expected['hash_sum']
+    assert shifted['language_haveworked']['hash_xor'] == expected['hash_xor']
+
+    # 16 шестнадцатеричных цифр не помещаются в INT64, как и в BigQuery
+    with pytest.raises(api_exceptions.BadRequest):
+        query_checksums(client, LANGUAGE_SQL.replace('p.d', DATASET).replace('SUBSTR(h, 9, 15)', 'SUBSTR(h, 9, 16)'))
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_tech_cube.py
+
+Куб агрегатов (prepare.create_technology_cube) против прямого подсчета
+pandas groupby по каждому уровню rollup.
+
+Запуск: python -m pytest tests
+"""
+
+from itertools import product
+
+import pandas as pd
+
+from conftest import quiet
+from tech_survey import prepare
+
+DIMENSIONS = prepare.CUBE_DIMENSIONS
+
+def expected_cube(demo_df, tech_tables):
+    """Уровни куба по отдельности: число респондентов и размер сегмента"""
+    facts = pd.concat(
+        [df.assign(Category=tech_type, Status=status) for (tech_type, status), df in tech_tables.items()],
+        ignore_index=True,
+    ).merge(demo_df[['ResponseId'] + DIMENSIONS], on='ResponseId')
+
+    levels = []
+    for mask in product([False, True], repeat=len(DIMENSIONS)):
+        grouped = [dim for dim, rolled_up in zip(DIMENSIONS, mask) if not rolled_up]
+        level = (
+            facts.groupby(['Category', 'Status', 'Technology'] + grouped)['ResponseId']
+            .nunique().rename('RespondentCount').reset_index()
+        )
+        if grouped:
+            sizes = demo_df.groupby(grouped).size().rename('SegmentRespondents').reset_index()
+            level = level.merge(sizes, on=grouped)
+        else:
+            level['SegmentRespondents'] = len(demo_df)
+        for dim, rolled_up in zip(DIMENSIONS, mask):
+            if rolled_up:
+                level[dim] = prepare.CUBE_ALL_VALUE
+        level['GroupingId'] = int(''.join('1' if rolled_up else '0' for rolled_up in mask), 2)
+        levels.append(level)
+
+    cube = pd.concat(levels, ignore_index=True)
+    cube['Percentage'] = (cube['RespondentCount'] / cube['SegmentRespondents'] * 100).round(2)
+    return cube
+
+def normalized(cube):
+    keys = ['GroupingId', 'Category', 'Status', 'Technology'] + DIMENSIONS
+    columns = keys + ['RespondentCount', 'SegmentRespondents', 'Percentage']
+    cube = cube[columns].sort_values(keys).reset_index(drop=True)
+    return cube.astype({'GroupingId': 'int64', 'RespondentCount': 'int64', 'SegmentRespondents': 'int64'})
+
+def test_cube_matches_groupby(tables):
+    demo_df, tech_tables = tables
+
+    cube = quiet(prepare.create_technology_cube, demo_df, tech_tables)
+
+    pd.testing.assert_frame_equal(normalized(cube), normalized(expected_cube(demo_df, tech_tables)))
+    assert set(cube['GroupingId']) == set(range(2 ** len(DIMENSIONS)))
+
+def test_cube_total_level_counts_respondents(tables):
+    demo_df, tech_tables = tables
+
+    cube = quiet(prepare.create_technology_cube, demo_df, tech_tables)
+    total = cube[cube['GroupingId'] == 2 ** len(DIMENSIONS) - 1]
+
+    for (tech_type, status), tech_df in tech_tables.items():
+        counts = tech_df.groupby('Technology')['ResponseId'].nunique()
+        level = total[(total['Category'] == tech_type) & (total['Status'] == status)]
+        assert dict(zip(level['Technology'], level['RespondentCount'])) == counts.to_dict()
+    assert (total['SegmentRespondents'] == len(demo_df)).all()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_technology_changes.py
+
+Таблица изменений стека (prepare.create_technology_changes) против
+внешнего соединения haveworked и wanttowork средствами pandas.
+
+Запуск: python -m pytest tests
+"""
+
+import pandas as pd
+
+from conftest import quiet
+from tech_survey import prepare
+
+MERGE_CHANGES = {'both': 'keep', 'left_only': 'drop', 'right_only': 'learn'}
+
+def merge_changes(tech_tables):
+    """Эталон: outer merge пар (ResponseId, Technology) по каждой категории"""
+    frames = []
+    for tech_type in dict.fromkeys(tech_type for tech_type, _ in prepare.TECH_COLUMNS_MAP.values()):
+        have_df = tech_tables[(tech_type, 'haveworked')][['ResponseId', 'Technology']]
+        want_df = tech_tables[(tech_type, 'wanttowork')][['ResponseId', 'Technology']]
+        answered = set(have_df['ResponseId']) & set(want_df['ResponseId'])
+
+        merged = have_df.merge(want_df, on=['ResponseId', 'Technology'], how='outer', indicator=True)
+        merged = merged[merged['ResponseId'].isin(answered)]
+        frames.append(pd.DataFrame({
+            'ResponseId': merged['ResponseId'],
+            'Category': tech_type,
+            'Technology': merged['Technology'],
+            'Change': merged['_merge'].astype(str).map(MERGE_CHANGES),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def test_changes_match_outer_merge(tables):
+    _, tech_tables = tables
+
+    changes = quiet(prepare.create_technology_changes, tech_tables)
+
+    assert list(changes.columns) == ['ResponseId', 'Category', 'Technology', 'Change']
+    key = ['ResponseId', 'Category', 'Technology']
+    expected = merge_changes(tech_tables).sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(
+        changes.sort_values(key).reset_index(drop=True), expected, check_dtype=False,
+    )
+    assert not changes.duplicated(key).any()
+    assert set(changes['Change']) == {'learn', 'keep', 'drop'}
+
+def test_changes_order_is_response_first(tables):
+    _, tech_tables = tables
+
+    changes = quiet(prepare.create_technology_changes, tech_tables)
+
+    categories = list(dict.fromkeys(tech_type for tech_type, _ in prepare.TECH_COLUMNS_MAP.values()))
+    order = pd.DataFrame({
+        'ResponseId': changes['ResponseId'],
+        'Category': changes['Category'].map(categories.index),
+        'Technology': changes['Technology'],
+    })
+    assert order.equals(order.sort_values(['ResponseId', 'Category', 'Technology']))
+
+def test_category_without_wanttowork_is_skipped(tables):
+    _, tech_tables = tables
+    tech_tables = {key: df for key, df in tech_tables.items() if key != ('database', 'wanttowork')}
+
+    changes = quiet(prepare.create_technology_changes, tech_tables)
+
+    assert 'database' not in set(changes['Category'])
+    assert set(changes['Category']) == {'language', 'platform', 'webframe'}
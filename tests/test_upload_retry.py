@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_upload_retry.py
+
+Повторы при временных ошибках и продолжение загрузки (--resume)
+в tech_survey/upload.py на фейковом клиенте BigQuery.
+
+Запуск: python -m pytest tests
+"""
+
+import json
+import os
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from tech_survey import upload
+from tech_survey.fake_bigquery import FakeBigQueryClient
+
+DATASET = 'tech_survey_data'
+
+LANGUAGE_CSV = "ResponseId,Technology\n1,Python\n1,SQL\n2,Go\n"
+DATABASE_CSV = "ResponseId,Technology\n1,PostgreSQL\n3,Redis\n"
+
+# ============================================================================
+# ОКРУЖЕНИЕ
+# ============================================================================
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Каталог подготовленных данных с двумя таблицами фактов"""
+    monkeypatch.setattr(upload, 'PROJECT_ID', 'fake-project')
+    monkeypatch.setattr(upload, 'DATA_DIR', str(tmp_path))
+    (tmp_path / 'language_haveworked.csv').write_text(LANGUAGE_CSV, encoding='utf-8')
+    (tmp_path / 'database_haveworked.csv').write_text(DATABASE_CSV, encoding='utf-8')
+    return tmp_path
+
+@pytest.fixture
+def client():
+    client = FakeBigQueryClient(project='fake-project', seed=1)
+    client.create_dataset(f"fake-project.{DATASET}")
+    return client
+
+@pytest.fixture
+def checkpoint_path(tmp_path):
+    return str(tmp_path / '.upload_checkpoint.json')
+
+def no_sleep(seconds):
+    pass
+
+def run_upload(client, checkpoint_path, files, **kwargs):
+    kwargs.setdefault('sleep', no_sleep)
+    return upload.run_upload(client, DATASET, files=files, checkpoint_path=checkpoint_path, **kwargs)
+
+def read_checkpoint(checkpoint_path):
+    with open(checkpoint_path, encoding='utf-8') as f:
+        return json.load(f)
+
+# ============================================================================
+# ВРЕМЕННЫЕ ОШИБКИ
+# ============================================================================
+
+@pytest.mark.parametrize('error, transient', [
+    (api_exceptions.ServiceUnavailable('503'), True),
+    (api_exceptions.TooManyRequests('429'), True),
+    (api_exceptions.InternalServerError('500'), True),
+    (api_exceptions.BadRequest('quota', errors=[{'reason': 'rateLimitExceeded'}]), True),
+    (api_exceptions.Forbidden('quota', errors=[{'reason': 'quotaExceeded'}]), True),
+    (api_exceptions.BadRequest('bad value', errors=[{'reason': 'invalid'}]), False),
+    (api_exceptions.NotFound('no table'), False),
+    (ConnectionError('reset'), True),
+    (ValueError('bug'), False),
+])
+def test_is_transient_error(error, transient):
+    assert upload.is_transient_error(error) is transient
+
+def test_call_with_retry_counts_attempts():
+    errors = [api_exceptions.ServiceUnavailable('503'), api_exceptions.TooManyRequests('429')]
+    retries, delays = [], []
+
+    def func():
+        if errors:
+            raise errors.pop(0)
+        return 'ok'
+
+    result, attempts = upload.call_with_retry(
+        func, max_retries=5, sleep=delays.append,
+        on_retry=lambda attempt, error, delay: retries.append((attempt, type(error).__name__)),
+    )
+
+    assert (result, attempts) == ('ok', 3)
+    assert retries == [(1, 'ServiceUnavailable'), (2, 'TooManyRequests')]
+    assert len(delays) == 2
+
+def test_call_with_retry_gives_up_after_max_retries():
+    calls = []
+
+    def func():
+        calls.append(1)
+        raise api_exceptions.ServiceUnavailable('503')
+
+    with pytest.raises(api_exceptions.ServiceUnavailable):
+        upload.call_with_retry(func, max_retries=2, sleep=no_sleep)
+    assert len(calls) == 3
+
+def test_call_with_retry_does_not_retry_permanent_errors():
+    calls = []
+
+    def func():
+        calls.append(1)
+        raise api_exceptions.BadRequest('bad value', errors=[{'reason': 'invalid'}])
+
+    with pytest.raises(api_exceptions.BadRequest):
+        upload.call_with_retry(func, max_retries=5, sleep=no_sleep)
+    assert len(calls) == 1
+
+# ============================================================================
+# ЗАГРУЗКА С ПОВТОРАМИ
+# ============================================================================
+
+def test_run_upload_retries_transient_failures(data_dir, client, checkpoint_path):
+    client.fail_next('load_job', count=2)
+
+    results = run_upload(client, checkpoint_path, ['language_haveworked.csv'])
+
+    assert [r['success'] for r in results] == [True]
+    assert client.stats['calls']['load_job'] == 3
+    assert len(client.table_frame(f"fake-project.{DATASET}.language_haveworked")) == 3
+
+    state = read_checkpoint(checkpoint_path)['tables']['language_haveworked']
+    assert state['status'] == 'done'
+    assert state['attempts'] == 3
+    assert state['checksum']['row_count'] == 3
+    assert state['file_size'] == os.path.getsize(data_dir / 'language_haveworked.csv')
+
+def test_run_upload_marks_table_failed_after_max_retries(data_dir, client, checkpoint_path):
+    client.fail_next('load_job', count=3)
+
+    results = run_upload(client, checkpoint_path, ['language_haveworked.csv'], max_retries=2)
+
+    assert [r['success'] for r in results] == [False]
+    assert 'ServiceUnavailable' in results[0]['error']
+    assert client.stats['calls']['load_job'] == 3
+
+    state = read_checkpoint(checkpoint_path)['tables']['language_haveworked']
+    assert state['status'] == 'failed'
+
+def test_run_upload_does_not_retry_permanent_failures(data_dir, client, checkpoint_path):
+    client.fail_next('load_job', api_exceptions.BadRequest('bad', errors=[{'reason': 'invalid'}]))
+
+    results = run_upload(client, checkpoint_path, ['language_haveworked.csv'])
+
+    assert [r['success'] for r in results] == [False]
+    assert client.stats['calls']['load_job'] == 1
+
+# ============================================================================
+# ПРОДОЛЖЕНИЕ ПО CHECKPOINT (--resume)
+# ============================================================================
+
+def test_resume_skips_completed_tables(data_dir, client, checkpoint_path):
+    files = ['language_haveworked.csv', 'database_haveworked.csv']
+    # language: 2 сбоя load job, затем успех; database: файла еще нет
+    client.fail_next('load_job', count=2)
+    database = data_dir / 'database_haveworked.csv'
+    database.rename(data_dir / 'database_haveworked.csv.bak')
+
+    first = run_upload(client, checkpoint_path, files)
+    assert [r['success'] for r in first] == [True, False]
+    tables = read_checkpoint(checkpoint_path)['tables']
+    assert tables['language_haveworked']['status'] == 'done'
+    assert tables['database_haveworked']['status'] == 'failed'
+
+    (data_dir / 'database_haveworked.csv.bak').rename(database)
+    loads_before = client.stats['calls']['load_table_from_file']
+
+    second = run_upload(client, checkpoint_path, files, resume=True)
+
+    assert [r['success'] for r in second] == [True, True]
+    # Загружена только database_haveworked
+    assert client.stats['calls']['load_table_from_file'] - loads_before == 1
+    tables = read_checkpoint(checkpoint_path)['tables']
+    assert tables['language_haveworked']['attempts'] == 3
+    assert tables['database_haveworked']['status'] == 'done'
+    assert tables['database_haveworked']['attempts'] == 1
+
+def test_resume_without_checkpoint_uploads_everything(data_dir, client, checkpoint_path):
+    results = run_upload(client, checkpoint_path, ['language_haveworked.csv'], resume=True)
+
+    assert [r['success'] for r in results] == [True]
+    assert client.stats['calls']['load_table_from_file'] == 1
+
+@pytest.mark.parametrize('change', ['size', 'mtime'])
+def test_resume_reloads_changed_file(data_dir, client, checkpoint_path, change):
+    files = ['language_haveworked.csv']
+    run_upload(client, checkpoint_path, files)
+    csv_path = data_dir / 'language_haveworked.csv'
+
+    if change == 'size':
+        csv_path.write_text(LANGUAGE_CSV + "4,Rust\n", encoding='utf-8')
+    else:
+        stat = os.stat(csv_path)
+        os.utime(csv_path, (stat.st_atime, stat.st_mtime + 10))
+
+    previous = upload.load_checkpoint(checkpoint_path, DATASET)
+    assert not upload.is_table_completed(previous, 'language_haveworked', str(csv_path))
+
+    results = run_upload(client, checkpoint_path, files, resume=True)
+
+    assert [r['success'] for r in results] == [True]
+    assert client.stats['calls']['load_table_from_file'] == 2
+    state = read_checkpoint(checkpoint_path)['tables']['language_haveworked']
+    assert state['file_size'] == os.path.getsize(csv_path)
+    assert state['file_mtime'] == os.stat(csv_path).st_mtime
+    expected_rows = 4 if change == 'size' else 3
+    assert len(client.table_frame(f"fake-project.{DATASET}.language_haveworked")) == expected_rows
+
+def test_checkpoint_of_other_dataset_is_ignored(data_dir, client, checkpoint_path):
+    run_upload(client, checkpoint_path, ['language_haveworked.csv'])
+
+    assert upload.load_checkpoint(checkpoint_path, DATASET) is not None
+    assert upload.load_checkpoint(checkpoint_path, 'other_dataset') is None